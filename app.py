@@ -1,26 +1,53 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session, send_file
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, flash, session, send_file, g, has_request_context
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 import os, sqlite3, hashlib, secrets, re
 import json
 import psutil, time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+import bisect, bz2, calendar, fnmatch, functools, itertools, lzma, mmap, zlib
+from collections import OrderedDict
+from watchdog.observers import Observer
+from watchdog.observers.polling import PollingObserver
+from watchdog.events import FileSystemEventHandler
+try:
+    import zstandard  # optional: .zst-Rotationen
+except ImportError:
+    zstandard = None
+try:
+    import brotli     # optional: Brotli-Kompression der API-Antworten (sonst gzip)
+except ImportError:
+    brotli = None
+try:
+    import fcntl      # Leader-Sperre und Cache-Abgleich mehrerer Worker (nur POSIX)
+except ImportError:
+    fcntl = None
 
 # ─── TRANSLATIONS ─────────────────────────────────────────────
-TRANSLATIONS_DIR = "/app/translations"
+TRANSLATIONS_DIR    = "/app/translations"
+TRANSLATIONS_RELOAD = os.environ.get("LOVI_DEV", "") == "1"  # Entwicklung: bei Änderung neu laden
+
+_translations = {}  # pfad → (mtime, daten)
 
 def load_translation(lang="de"):
+    """Übersetzung aus dem Speicher; die Datei wird nur beim ersten Zugriff gelesen."""
     path = os.path.join(TRANSLATIONS_DIR, f"{lang}.json")
+    cached = _translations.get(path)
+    if cached is not None and not TRANSLATIONS_RELOAD:
+        return cached[1]
     if not os.path.exists(path):
-        path = os.path.join(TRANSLATIONS_DIR, "en.json")
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+        return load_translation("en") if lang != "en" else {}
+    mtime = os.path.getmtime(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, "r", encoding="utf-8") as f:
+            cached = (mtime, json.load(f))
+        _translations[path] = cached
+    return cached[1]
 
 def get_user_lang():
     if current_user.is_authenticated:
-        conn = get_db()
-        row = conn.execute("SELECT language FROM users WHERE id = ?",
-                           (current_user.id,)).fetchone()
-        conn.close()
-        return row["language"] if row and row["language"] else "en"
+        return current_user.language or "en"
     return "de"
 
 def get_login_lang():
@@ -38,18 +65,112 @@ GITHUB_USER = "zockerlusche"
 GITHUB_REPO = "lovi-profiles"
 GITHUB_BASE = f"https://raw.githubusercontent.com/{GITHUB_USER}/{GITHUB_REPO}/main"
 
+DB_POOL_SIZE   = int(os.environ.get("LOVI_DB_POOL", 8))  # max. freie Verbindungen im Pool
+DB_TIMEOUT     = 10    # Sekunden warten, bevor "database is locked" gemeldet wird
+DB_STATEMENTS  = 256   # Prepared-Statement-Cache pro Verbindung
+
+class _PoolConnection(sqlite3.Connection):
+    """sqlite3.Connection mit Merkmalen für den Pool (Pfad und Generation)."""
+    path       = None
+    generation = 0
+
+class DBPool:
+    """
+    LIFO-Pool für SQLite-Verbindungen. Verbindungen bleiben offen und behalten
+    damit ihren Statement-Cache; WAL erlaubt Lesen parallel zu einem Schreiber.
+    Ist der Pool leer, wird eine neue Verbindung geöffnet – es wird nie gewartet.
+    """
+    def __init__(self, size, timeout=DB_TIMEOUT):
+        self.size       = size
+        self.timeout    = timeout
+        self.idle       = []
+        self.generation = 0
+        self.lock       = threading.Lock()
+
+    def _connect(self, path):
+        conn = sqlite3.connect(path, timeout=self.timeout, factory=_PoolConnection,
+                               check_same_thread=False, cached_statements=DB_STATEMENTS)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.path, conn.generation = path, self.generation
+        return conn
+
+    def acquire(self, path):
+        with self.lock:
+            while self.idle:
+                conn = self.idle.pop()
+                if conn.path == path and conn.generation == self.generation:
+                    return conn
+                conn.close()
+        return self._connect(path)
+
+    def release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()  # vergessenes commit() darf keine Sperre halten
+        except sqlite3.Error:
+            conn.close()
+            return
+        with self.lock:
+            if conn.generation == self.generation and len(self.idle) < self.size:
+                self.idle.append(conn)
+                return
+        conn.close()
+
+    def reset(self):
+        """Alle Verbindungen verwerfen (z.B. bevor die DB-Datei ersetzt wird)."""
+        with self.lock:
+            self.generation += 1
+            idle, self.idle = self.idle, []
+        for conn in idle:
+            conn.close()
+
+_db_pool = DBPool(DB_POOL_SIZE)
+
+class PooledConnection:
+    """Hülle um eine Pool-Verbindung: close() gibt sie an ihren Pool zurück."""
+    def __init__(self, conn, pool=None):
+        self._conn = conn
+        self._pool = pool or _db_pool
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+    def close(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.release(conn)
+
 def get_db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    conn = PooledConnection(_db_pool.acquire(DB_PATH))
+    if has_request_context():
+        # Routen, die close() vergessen, geben die Verbindung im Teardown zurück
+        g.setdefault("_db_conns", []).append(conn)
     return conn
 
+@app.teardown_request
+def release_db(exc=None):
+    for conn in g.pop("_db_conns", ()):
+        conn.close()
+
 def is_rotating_log(filename):
-    """Erkennt rotierende Log-Dateien wie radarr.debug.0.txt oder app.log.1"""
+    """Erkennt rotierende Log-Dateien wie radarr.debug.0.txt, app.log.1 oder app.log.2.gz"""
     basename = os.path.basename(filename)
-    # Muster: endet auf .N.ext oder .ext.N
+    if archive_ext(basename):
+        return True
+    # Muster: endet auf .N.ext, .ext.N oder .ext-JJJJMMTT (logrotate dateext)
     if re.search(r'\.\d+\.(log|txt)$', basename):
         return True
-    if re.search(r'\.(log|txt)\.\d+$', basename):
+    if re.search(r'\.(log|txt)(\.\d+|-\d{8})$', basename):
         return True
     return False
 
@@ -81,8 +202,15 @@ def init_db():
         log_path_hint TEXT DEFAULT '',
         help_setup  TEXT DEFAULT '',
         help_mount  TEXT DEFAULT '',
+        timestamp_pattern TEXT DEFAULT '',
+        continuation TEXT DEFAULT '',
         created_at  TEXT DEFAULT (datetime('now'))
     )''')
+    # Ältere Datenbanken: später hinzugekommene Spalten nachrüsten
+    columns = {r[1] for r in c.execute("PRAGMA table_info(profiles)")}
+    for column in ("timestamp_pattern", "continuation"):
+        if column not in columns:
+            c.execute(f"ALTER TABLE profiles ADD COLUMN {column} TEXT DEFAULT ''")
 
     c.execute('''CREATE TABLE IF NOT EXISTS log_assignments (
         id         INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -92,13 +220,19 @@ def init_db():
         FOREIGN KEY (profile_id) REFERENCES profiles(id)
     )''')
 
-    c.execute('''CREATE TABLE IF NOT EXISTS log_stats (
-        id          INTEGER PRIMARY KEY AUTOINCREMENT,
-        filename    TEXT NOT NULL,
-        sampled_at  TEXT DEFAULT (datetime('now')),
-        error_count INTEGER DEFAULT 0,
-        warn_count  INTEGER DEFAULT 0
-    )''')
+    # Zeitreihen: ein Bucket pro Datei, Stufe (Bucket-Größe in s) und Startzeit
+    c.execute('''CREATE TABLE IF NOT EXISTS metrics (
+        filename TEXT NOT NULL,
+        tier     INTEGER NOT NULL,
+        bucket   INTEGER NOT NULL,
+        errors   INTEGER DEFAULT 0,
+        warns    INTEGER DEFAULT 0,
+        PRIMARY KEY (filename, tier, bucket)
+    ) WITHOUT ROWID''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_metrics_tier ON metrics (tier, bucket)")
+    # Ersetzt durch metrics. Die alten Samples ("Treffer in den letzten 500 Zeilen") sind
+    # keine Zählungen pro Bucket und würden die Sparklines verfälschen – nicht übernehmen.
+    c.execute("DROP TABLE IF EXISTS log_stats")
 
     c.execute('''CREATE TABLE IF NOT EXISTS notification_settings (
         id              INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -120,6 +254,13 @@ def init_db():
         error_count INTEGER DEFAULT 0
     )''')
 
+    c.execute('''CREATE TABLE IF NOT EXISTS alert_cursors (
+        filename   TEXT PRIMARY KEY,
+        inode      INTEGER DEFAULT 0,
+        offset     INTEGER DEFAULT 0,
+        updated_at TEXT DEFAULT (datetime('now'))
+    )''')
+
     # NEU: Tabelle für ausgeblendete Log-Dateien
     c.execute('''CREATE TABLE IF NOT EXISTS log_hidden (
         id       INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -134,258 +275,3130 @@ def init_db():
         c.execute("INSERT INTO users (username, password, is_admin, must_change_pw) VALUES (?, ?, 1, 1)",
                   ("admin", pw_hash))
 
-    c.execute("DELETE FROM profiles WHERE source='builtin'")
+    builtin_profiles = [
+        ("Standard",
+         "General format – detects INFO/WARN/ERROR",
+         "LoVi", "1.1", "builtin",
+         "ERROR,CRITICAL,FATAL", "WARN,WARNING", "INFO", "DEBUG,TRACE",
+         "/logs/myapp/app.log",
+         "Compatible with: Most Python, Node.js, Java apps\nVersion hint: Universal – works with almost any structured log.\n\nStep 1 – Find your log path:\nMost apps write to /config/logs/ inside the container.\nCheck your app docs or run: docker exec CONTAINERNAME find /config -name '*.log'\n\nStep 2 – Add volume to the APP's docker-compose.yml:\n  volumes:\n    - /opt/docker/APPNAME/config:/config        # already exists\n    - /opt/docker/APPNAME/config/logs:/logs/APPNAME  # ADD THIS\n\nStep 3 – Add the same path to LOVI's docker-compose.yml:\n  services:\n    lovi:\n      volumes:\n        - /opt/logs:/logs                              # already exists\n        - /opt/docker/APPNAME/config/logs:/logs/APPNAME  # ADD THIS\n\nStep 4 – Recreate BOTH containers (not just restart!):\n  cd /opt/docker/YOURSTACK && docker-compose up -d APPNAME\n  cd /opt/docker/logviewer && docker-compose up -d lovi\n\nStep 5 – Assign in LoVi:\n  Settings -> Assign -> select log file -> Profile: Standard\n\n⚠ A recreate causes ~5s downtime. App config and data are NOT affected.",
+         "-v /opt/docker/APPNAME/config/logs:/logs/APPNAME",
+         ""),  # keine Folgezeilen-Regeln: Gruppierung nur über eigene Profile (opt-in)
+    ]
+
+    # Nach Name aktualisieren statt neu anlegen: die id bleibt stabil, Zuweisungen bleiben gültig
+    for p in builtin_profiles:
+        c.execute('''INSERT INTO profiles
+            (name, description, author, version, source,
+             level_error, level_warn, level_info, level_debug,
+             log_path_hint, help_setup, help_mount, continuation)
+            VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)
+            ON CONFLICT(name) DO UPDATE SET
+                description=excluded.description, author=excluded.author, version=excluded.version,
+                level_error=excluded.level_error, level_warn=excluded.level_warn,
+                level_info=excluded.level_info, level_debug=excluded.level_debug,
+                log_path_hint=excluded.log_path_hint, help_setup=excluded.help_setup,
+                help_mount=excluded.help_mount, continuation=excluded.continuation
+            WHERE profiles.source='builtin' ''', p)
+    names = [p[0] for p in builtin_profiles]
+    c.execute(f"DELETE FROM profiles WHERE source='builtin' AND name NOT IN ({','.join('?' * len(names))})",
+              names)
+    # Früher bekam Standard bei jedem Start eine neue id – verwaiste Zuweisungen wieder anhängen
+    c.execute("""UPDATE log_assignments SET profile_id = (SELECT id FROM profiles WHERE name='Standard')
+        WHERE profile_id NOT IN (SELECT id FROM profiles)""")
+
+    conn.commit()
+    conn.close()
+    invalidate_profiles()
+
+def hash_password(pw):
+    return hashlib.sha256(pw.encode()).hexdigest()
+
+# ─── FLASK-LOGIN ─────────────────────────────────────────────
+login_manager = LoginManager()
+login_manager.init_app(app)
+login_manager.login_view = "login"
+login_manager.login_message = ""
+login_manager.login_message_category = "info"
+
+class User(UserMixin):
+    def __init__(self, id, username, is_admin, must_change_pw, language=None):
+        self.id             = id
+        self.username       = username
+        self.is_admin       = is_admin
+        self.must_change_pw = must_change_pw
+        self.language       = language
+
+@login_manager.user_loader
+def load_user(user_id):
+    row = get_user_row(user_id)
+    if row:
+        return User(row["id"], row["username"], row["is_admin"], row["must_change_pw"], row["language"])
+    return None
+
+# ─── CACHES ──────────────────────────────────────────────────
+# Selten geänderte Tabellen im Speicher. Routen, die sie ändern, rufen danach
+# die passende invalidate_*-Funktion auf.
+_users          = {}    # user_id → Zeile als dict
+_profiles       = None  # profile_id → Zeile als dict
+_file_profiles  = None  # filename → profile_id (aus log_assignments)
+_hidden_files   = None  # frozenset der ausgeblendeten Dateien
+_profiles_gen   = 0     # zählt invalidate_profiles()-Aufrufe
+_cache_lock     = threading.Lock()
+
+CACHE_SYNC_FILE = "lovi.caches"   # neben lovi.db: {cache-name: generation}
+
+class CacheSync:
+    """
+    Hält die Caches mehrerer Worker-Prozesse (gunicorn) gleich. invalidate_*()
+    zählt die Generation des Caches in CACHE_SYNC_FILE hoch; jeder Prozess prüft
+    vor jedem Request mit einem stat(), ob die Datei neu ist, und leert dann die
+    Caches, deren Generation gestiegen ist. Ohne weitere Worker kostet das nur
+    den stat().
+    """
+    def __init__(self):
+        self.handlers = {}      # name → lokale Invalidierung
+        self.gens     = {}      # name → zuletzt angewendete Generation
+        self.seen     = None    # (inode, mtime) der Datei beim letzten poll()
+        self.local    = threading.local()
+        self.lock     = threading.Lock()
+
+    def path(self):
+        return os.path.join(os.path.dirname(DB_PATH), CACHE_SYNC_FILE)
+
+    def register(self, name, handler):
+        self.handlers[name] = handler
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def bump(self, name):
+        """Den anderen Prozessen melden, dass der Cache name ungültig ist."""
+        if fcntl is None or getattr(self.local, "applying", False):
+            return  # ohne flock gibt es nur einen Prozess; poll() meldet nicht zurück
+        path = self.path()
+        try:
+            with open(path + ".lock", "a") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                gens = self._read(path)
+                gens[name] = gens.get(name, 0) + 1
+                tmp = f"{path}.{os.getpid()}"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(gens, f)
+                os.replace(tmp, path)  # neuer Inode → poll() der anderen sieht die Änderung sicher
+        except OSError:
+            return  # Datenverzeichnis fehlt noch (vor init_db)
+        with self.lock:
+            # hier schon lokal geleert – nicht beim nächsten poll() noch einmal
+            self.gens[name] = max(self.gens.get(name, 0), gens[name])
+
+    def poll(self):
+        try:
+            st = os.stat(self.path())
+        except OSError:
+            return
+        key = (st.st_ino, st.st_mtime_ns)
+        if key == self.seen:
+            return
+        with self.lock:
+            if key == self.seen:
+                return
+            first, self.seen = self.seen is None, key
+            gens    = self._read(self.path())
+            changed = [name for name, gen in gens.items() if gen > self.gens.get(name, 0)]
+            self.gens.update(gens)
+        if first:
+            return  # frisch gestartet: alle Caches sind ohnehin leer
+        self.local.applying = True
+        try:
+            for name in changed:
+                handler = self.handlers.get(name)
+                if handler:
+                    handler()
+        finally:
+            self.local.applying = False
+
+_cache_sync = CacheSync()
+
+@app.before_request
+def sync_caches():
+    _cache_sync.poll()
+
+def get_user_row(user_id):
+    user_id = int(user_id)
+    row = _users.get(user_id)
+    if row is None:
+        conn = get_db()
+        found = conn.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
+        conn.close()
+        if not found:
+            return None
+        row = _users[user_id] = dict(found)
+    return row
+
+def invalidate_user(user_id=None):
+    """Nach Änderungen an der users-Tabelle aufrufen (ohne user_id: alle)."""
+    if user_id is None:
+        _users.clear()
+    else:
+        _users.pop(int(user_id), None)
+    _cache_sync.bump("users")  # andere Worker leeren alle
+
+def get_profiles():
+    """Alle Profile als {id: dict}, sortiert nach id."""
+    global _profiles
+    with _cache_lock:
+        if _profiles is None:
+            conn = get_db()
+            _profiles = {r["id"]: dict(r) for r in conn.execute("SELECT * FROM profiles ORDER BY id").fetchall()}
+            conn.close()
+        return _profiles
+
+def get_file_profiles():
+    """Zuweisungen als {filename: profile_id}."""
+    global _file_profiles
+    with _cache_lock:
+        if _file_profiles is None:
+            conn = get_db()
+            _file_profiles = {r["filename"]: r["profile_id"] for r in
+                              conn.execute("SELECT filename, profile_id FROM log_assignments").fetchall()}
+            conn.close()
+        return _file_profiles
+
+def invalidate_profiles():
+    """Nach Änderungen an Profilen oder Zuweisungen aufrufen."""
+    global _profiles, _file_profiles, _profiles_gen
+    with _cache_lock:
+        _profiles      = None
+        _file_profiles = None
+        _profiles_gen += 1
+    invalidate_classifiers()
+    _cache_sync.bump("profiles")
+
+def get_hidden_files():
+    global _hidden_files
+    with _cache_lock:
+        if _hidden_files is None:
+            conn = get_db()
+            _hidden_files = frozenset(row["filename"] for row in
+                                      conn.execute("SELECT filename FROM log_hidden").fetchall())
+            conn.close()
+        return _hidden_files
+
+def invalidate_hidden():
+    """Nach Änderungen an log_hidden aufrufen."""
+    global _hidden_files
+    with _cache_lock:
+        _hidden_files = None
+    _cache_sync.bump("hidden")
+
+# ─── LOG FUNKTIONEN ──────────────────────────────────────────
+
+def is_log_file(filename):
+    ext = archive_ext(filename)
+    if ext:
+        filename = filename[:-len(ext)]
+    return filename.endswith(".log") or filename.endswith(".txt") or is_rotating_log(filename)
+
+# ─── LOG INDEX ───────────────────────────────────────────────
+# Hält den LOG_DIR-Baum im Speicher, statt bei jedem Request os.walk() zu machen.
+# watchdog liefert Änderungen per inotify; geht das nicht (Limit erreicht, NFS),
+# wird auf periodisches Polling umgeschaltet. LOVI_POLLING=1 erzwingt Polling.
+LOG_POLL_INTERVAL = int(os.environ.get("LOVI_POLL_INTERVAL", 10))
+FORCE_POLLING     = os.environ.get("LOVI_POLLING", "") == "1"
+
+class LogIndex(FileSystemEventHandler):
+    def __init__(self, root):
+        self.root     = root
+        self.entries  = {}    # rel_path → {"size", "mtime", "rotating"}
+        self.version  = 0     # erhöht sich, wenn Dateien dazukommen/verschwinden
+        self.lock     = threading.Lock()
+        self.activity = threading.Condition()  # weckt Live-Tail-Streams bei Änderungen
+        self.writes   = 0     # zählt Schreib-Events (unter activity)
+        self.observer = None
+        self._sorted  = {}    # include_rotating → sortierte Liste
+
+    def start(self):
+        self.rescan()
+        observer = None
+        if not FORCE_POLLING:
+            try:
+                observer = Observer()
+                observer.schedule(self, self.root, recursive=True)
+                observer.start()
+            except OSError as e:
+                app.logger.warning(f"inotify not available ({e}) – falling back to polling")
+                observer = None
+        if observer is None:
+            observer = PollingObserver(timeout=LOG_POLL_INTERVAL)
+            observer.schedule(self, self.root, recursive=True)
+            observer.start()
+        self.observer = observer
+
+    def _rel(self, path):
+        return os.path.relpath(path, self.root)
+
+    def _changed(self):
+        self.version += 1
+        self._sorted = {}
+
+    def _stat_entry(self, path):
+        st = os.stat(path)
+        return {"size": st.st_size, "mtime": st.st_mtime, "rotating": is_rotating_log(path)}
+
+    def rescan(self, subdir=None):
+        """Liest den Baum (oder einen Teilbaum) komplett neu ein."""
+        top   = subdir or self.root
+        found = {}
+        for root, dirs, filenames in os.walk(top):
+            for f in filenames:
+                if is_log_file(f):
+                    path = os.path.join(root, f)
+                    try:
+                        found[self._rel(path)] = self._stat_entry(path)
+                    except OSError:
+                        continue
+        with self.lock:
+            if subdir is None:
+                self.entries = found
+            else:
+                self.entries.update(found)
+            self._changed()
+
+    def _update(self, path):
+        if not is_log_file(path):
+            return
+        rel = self._rel(path)
+        if rel.startswith(".."):
+            return
+        try:
+            entry = self._stat_entry(path)
+        except OSError:
+            return self._remove(path)
+        with self.lock:
+            is_new = rel not in self.entries
+            self.entries[rel] = entry
+            if is_new:
+                self._changed()
+        with self.activity:
+            self.writes += 1
+            self.activity.notify_all()
+
+    def wait_for_activity(self, timeout):
+        """Blockiert bis irgendeine Log-Datei geschrieben wurde (oder timeout)."""
+        with self.activity:
+            self.activity.wait(timeout)
+
+    def wait_for_writes(self, seen, timeout):
+        """Wie wait_for_activity, verpasst aber keine Events seit dem Stand seen."""
+        with self.activity:
+            if self.writes == seen:
+                self.activity.wait(timeout)
+            return self.writes
+
+    def _remove(self, path, is_directory=False):
+        rel = self._rel(path)
+        with self.lock:
+            if is_directory:
+                prefix = rel + os.sep
+                gone = [f for f in self.entries if f.startswith(prefix)]
+            else:
+                gone = [rel] if rel in self.entries else []
+            for f in gone:
+                del self.entries[f]
+            if gone:
+                self._changed()
+
+    def on_created(self, event):
+        if event.is_directory:
+            self.rescan(event.src_path)
+        else:
+            self._update(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._update(event.src_path)
+
+    def on_deleted(self, event):
+        self._remove(event.src_path, event.is_directory)
+
+    def on_moved(self, event):
+        self._remove(event.src_path, event.is_directory)
+        if event.is_directory:
+            self.rescan(event.dest_path)
+        else:
+            self._update(event.dest_path)
+
+    def files(self, include_rotating=False):
+        with self.lock:
+            cached = self._sorted.get(include_rotating)
+            if cached is None:
+                cached = sorted(f for f, e in self.entries.items()
+                                if include_rotating or not e["rotating"])
+                self._sorted[include_rotating] = cached
+            return cached
+
+    def meta(self, filename):
+        return self.entries.get(filename)
+
+_log_index      = None
+_log_index_lock = threading.Lock()
+
+def get_log_index():
+    """Startet den Index beim ersten Zugriff (sobald LOG_DIR existiert)."""
+    global _log_index
+    if _log_index is None:
+        with _log_index_lock:
+            if _log_index is None:
+                if not os.path.isdir(LOG_DIR):
+                    return None
+                index = LogIndex(LOG_DIR)
+                index.start()
+                _log_index = index
+    return _log_index
+
+def get_log_files(include_hidden=False, include_rotating=False):
+    """
+    Gibt alle Log-Dateien zurück (aus dem In-Memory-Index).
+    include_hidden=False  → ausgeblendete Dateien weglassen
+    include_rotating=False → rotierende Logs (z.B. radarr.debug.0.txt) weglassen
+    """
+    index = get_log_index()
+    if index is None:
+        return []
+    files = index.files(include_rotating)
+
+    if not include_hidden:
+        hidden = get_hidden_files()
+        if hidden:
+            files = [f for f in files if f not in hidden]
+
+    return list(files)
+
+def send_alert_mail(settings, alerts):
+    """Sendet eine zusammengefasste Alert-Mail. alerts = [(filename, error_count), ...]"""
+    import smtplib
+    from email.mime.text import MIMEText
+    from email.mime.multipart import MIMEMultipart
+    count = len(alerts)
+    subject = f"[LoVi Alert] {count} log file{'s' if count > 1 else ''} with new ERRORs"
+    body = "LoVi detected new ERROR entries:\n\n"
+    for filename, error_count in alerts:
+        body += f"  {filename:<40} -> {error_count} new ERRORs\n"
+    body += f"\nCheck interval: last {settings['threshold_mins']} minutes"
+    body += "\n\n-- LoVi Log Viewer"
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = subject
+    msg["From"]    = settings["smtp_from"]
+    msg["To"]      = settings["smtp_to"]
+    msg.attach(MIMEText(body, "plain"))
+    with smtplib.SMTP(settings["smtp_host"], settings["smtp_port"]) as server:
+        server.starttls()
+        server.login(settings["smtp_user"], settings["smtp_pass"])
+        server.sendmail(settings["smtp_from"], settings["smtp_to"], msg.as_string())
+
+def _hint_table(profiles):
+    """log_path_hint → {dateiname: [(hint_dir, profil), ...]} in Profil-Reihenfolge."""
+    table = {}
+    for profile in profiles:
+        hint = (profile["log_path_hint"] or "").strip()
+        if not hint:
+            continue
+        # Matche am Ende des Pfades (basename oder Teilpfad)
+        hint_parts = hint.replace("\\", "/").split("/")
+        hint_dir   = hint_parts[-2] if len(hint_parts) >= 2 else ""
+        table.setdefault(hint_parts[-1], []).append((hint_dir, profile))
+    return table
+
+def auto_assign_by_hint(conn):
+    """Weist Log-Dateien automatisch einem Profil zu wenn log_path_hint passt. Rückgabe: Anzahl neuer Zuweisungen."""
+    hints = _hint_table(get_profiles().values())
+    if not hints:
+        return 0
+    assigned = {r["filename"] for r in conn.execute("SELECT filename FROM log_assignments").fetchall()}
+    rows = []
+    for filename in get_log_files(include_hidden=True, include_rotating=False):
+        if filename in assigned:
+            continue
+        file_parts = filename.replace("\\", "/").split("/")
+        candidates = hints.get(file_parts[-1])
+        if not candidates:
+            continue
+        # Auch Verzeichnis prüfen wenn vorhanden
+        file_dir = file_parts[-2] if len(file_parts) >= 2 else ""
+        for hint_dir, profile in candidates:
+            if not hint_dir or hint_dir in file_dir:
+                rows.append((filename, profile["id"], profile["name"]))
+                break
+    if rows:
+        conn.executemany("""INSERT INTO log_assignments (filename, profile_id, label)
+            VALUES (?, ?, ?)
+            ON CONFLICT(filename) DO NOTHING""", rows)
+    return len(rows)
+
+_auto_assign_seen = None  # (index.version, Profil-Generation) beim letzten Lauf
+_auto_assign_lock = threading.Lock()
+
+def auto_assign_if_changed():
+    """auto_assign_by_hint nur, wenn Dateien dazugekommen sind oder sich Profile geändert haben."""
+    global _auto_assign_seen
+    index = get_log_index()
+    if index is None:
+        return 0
+    if (index.version, _profiles_gen) == _auto_assign_seen:
+        return 0
+    with _auto_assign_lock:
+        version = index.version
+        if (version, _profiles_gen) == _auto_assign_seen:
+            return 0
+        conn = get_db()
+        added = auto_assign_by_hint(conn)
+        conn.commit()
+        conn.close()
+        if added:
+            invalidate_profiles()
+        _auto_assign_seen = (version, _profiles_gen)
+    return added
+
+# ─── ALERTING ────────────────────────────────────────────────
+ALERT_DEBOUNCE = 2                  # Sekunden warten, damit ein Burst gesammelt ankommt
+ALERT_IDLE     = 60                 # spätestens so oft prüfen (Zeitfenster läuft ab)
+ALERT_MAX_READ = 8 * 1024 * 1024    # max. neue Bytes pro Datei und Durchlauf
+
+def _utc_epoch(sqlite_ts):
+    import datetime
+    return datetime.datetime.fromisoformat(sqlite_ts).replace(tzinfo=datetime.timezone.utc).timestamp()
+
+class AlertEngine:
+    """
+    Zählt nur neu angehängte ERROR-Events (ein Stacktrace = ein Fehler). Pro Datei
+    steht in alert_cursors, bis zu welchem Byte gelesen wurde; die Fehler der letzten
+    threshold_mins Minuten liegen als gleitendes Fenster im Speicher.
+    """
+    def __init__(self):
+        self.cursors   = None   # filename → [inode, offset]
+        self.windows   = {}     # filename → deque[(zeitpunkt, anzahl)]
+        self.last_sent = {}     # filename → Zeitpunkt des letzten Alerts
+        self.heads     = {}     # filename → head_time des letzten Events (Folgezeilen über Reads hinweg)
+        self.enabled   = None   # None = Stand aus der DB übernehmen
+        self.lock      = threading.Lock()
+
+    def reset(self):
+        """Zustand neu aus der DB laden (z.B. nach Backup-Import)."""
+        with self.lock:
+            self.cursors, self.enabled = None, None
+            self.windows.clear()
+            self.heads.clear()
+
+    def _load(self, conn):
+        self.cursors = {r["filename"]: [r["inode"], r["offset"]] for r in
+                        conn.execute("SELECT filename, inode, offset FROM alert_cursors").fetchall()}
+        self.last_sent = {r["filename"]: _utc_epoch(r["sent_at"]) for r in conn.execute(
+            "SELECT filename, MAX(sent_at) AS sent_at FROM notification_log GROUP BY filename").fetchall()}
+
+    def _new_errors(self, filename, cursor):
+        """Liest die Bytes ab dem Cursor, gibt die Anzahl neuer ERRORs zurück."""
+        data = read_new_bytes(os.path.join(LOG_DIR, filename), cursor, ALERT_MAX_READ)
+        events = EventAssembler(get_event_rules(filename), get_classifier(filename))
+        events.head_time = self.heads.get(filename)
+        errors = events.count(data, ("error",))["error"]  # Folgezeilen zählen nicht extra
+        self.heads[filename] = events.head_time
+        return errors
+
+    def check(self):
+        """Ein Durchlauf: neue Bytes lesen, Fenster pflegen, ggf. eine Sammel-Mail senden."""
+        with self.lock:
+            conn = get_db()
+            try:
+                self._check(conn)
+            finally:
+                conn.close()
+
+    def _check(self, conn):
+        row = conn.execute("SELECT * FROM notification_settings WHERE id=1").fetchone()
+        enabled = bool(row and row["enabled"])
+        if self.cursors is None:
+            self._load(conn)
+        was_enabled, self.enabled = self.enabled, enabled
+        if not enabled:
+            return
+        settings = dict(row)
+        now      = time.time()
+        window   = settings["threshold_mins"] * 60
+        assigned = get_file_profiles()
+        files    = [f for f in get_log_files() if f in assigned]
+        dirty    = []
+
+        for filename in files:
+            cursor = self.cursors.get(filename)
+            if cursor is None or was_enabled is False:
+                # Unbekannte Datei oder Alerts gerade eingeschaltet → ab jetzt zählen
+                try:
+                    st = os.stat(os.path.join(LOG_DIR, filename))
+                except OSError:
+                    continue
+                self.cursors[filename] = [st.st_ino, st.st_size]
+                self.windows.pop(filename, None)
+                dirty.append(filename)
+                continue
+            before = list(cursor)
+            try:
+                errors = self._new_errors(filename, cursor)
+            except OSError:
+                continue
+            if cursor != before:
+                dirty.append(filename)
+            events = self.windows.setdefault(filename, deque())
+            if errors:
+                events.append((now, errors))
+            while events and events[0][0] < now - window:
+                events.popleft()
+
+        if dirty:
+            conn.executemany("""INSERT INTO alert_cursors (filename, inode, offset) VALUES (?,?,?)
+                ON CONFLICT(filename) DO UPDATE SET inode=excluded.inode, offset=excluded.offset,
+                updated_at=datetime('now')""",
+                [(f, *self.cursors[f]) for f in dirty])
+            conn.commit()
+
+        alerts = []  # Liste der betroffenen Dateien für zusammengefasste Mail
+        for filename in files:
+            count = sum(n for _t, n in self.windows.get(filename, ()))
+            if count < settings["threshold_count"]:
+                continue
+            if now - self.last_sent.get(filename, 0) < settings["cooldown_mins"] * 60:
+                continue
+            alerts.append((filename, count))
+        if not alerts:
+            return
+        try:
+            send_alert_mail(settings, alerts)
+        except Exception as e:
+            app.logger.error(f"Mail error: {e}")
+            return
+        for filename, error_count in alerts:
+            conn.execute("INSERT INTO notification_log (filename, error_count) VALUES (?,?)",
+                         (filename, error_count))
+            self.last_sent[filename] = now
+            self.windows[filename].clear()  # gemeldete Fehler zählen nicht erneut
+        conn.commit()
+
+_alert_engine = AlertEngine()
+
+def read_new_bytes(filepath, cursor, max_read):
+    """
+    Vollständige Zeilen ab cursor = [inode, offset] als ein Block (ohne den letzten
+    Umbruch, b"" wenn nichts Neues); der Cursor wird weitergesetzt. Rotation/Kürzung
+    beginnt von vorn, größere Rückstände als max_read nur das Ende.
+    """
+    st = os.stat(filepath)
+    inode, offset = cursor
+    if st.st_ino != inode or st.st_size < offset:
+        offset = 0  # rotiert oder abgeschnitten → neue Datei von vorn
+    cursor[0] = st.st_ino
+    if st.st_size == offset:
+        cursor[1] = offset
+        return b""
+    skip_partial = False
+    if st.st_size - offset > max_read:
+        offset, skip_partial = st.st_size - max_read, True
+    with open(filepath, "rb") as f:
+        f.seek(offset)
+        data = f.read(st.st_size - offset)
+    end = data.rfind(b"\n")
+    if end < 0:
+        # noch keine vollständige Zeile – außer der Puffer ist schon voll
+        cursor[1] = st.st_size if len(data) >= max_read else offset
+        return b""
+    cursor[1] = offset + end + 1
+    start = data.find(b"\n") + 1 if skip_partial else 0
+    return data[start:end] if start <= end else b""
+
+def notifications_changed():
+    """Nach Änderungen an notification_settings: Einschalten setzt die Cursor sofort ans Dateiende."""
+    if _leader.held:
+        _alert_engine.check()
+    _cache_sync.bump("notifications")  # sonst erledigt das der Leader-Prozess
+
+def check_notifications():
+    """Prüft nur assigned Log-Dateien – nur NEUE ERRORs im Zeitfenster – eine zusammengefasste Mail."""
+    _alert_engine.check()
+
+def alert_worker():
+    """Background Thread – prüft kurz nach jeder Dateiänderung, sonst alle ALERT_IDLE Sekunden."""
+    seen = None
+    while True:
+        try:
+            _cache_sync.poll()
+            check_notifications()
+        except Exception as e:
+            app.logger.error(f"Alert worker error: {e}")
+        index = get_log_index()
+        if index is None:
+            time.sleep(ALERT_IDLE)
+            continue
+        seen = index.wait_for_writes(seen, ALERT_IDLE)
+        time.sleep(ALERT_DEBOUNCE)
+
+# ─── METRIKEN ────────────────────────────────────────────────
+METRICS_INTERVAL = 60                # Sekunden zwischen Durchläufen (kleinste Auflösung: 1 Min)
+METRICS_MAX_READ = 8 * 1024 * 1024   # max. neue Bytes pro Datei und Durchlauf
+METRIC_TIERS     = {                 # Bucket-Größe → Aufbewahrung (Sekunden)
+    60:    2 * 3600,
+    900:   48 * 3600,
+    3600:  30 * 86400,
+    86400: 365 * 86400,
+}
+SPARKLINE_TIER   = 900
+SPARKLINE_POINTS = 96                # 96 x 15 Min = 24h
+
+class MetricsCollector:
+    """
+    Zählt ERRORs/WARNs der neu angehängten Events pro Datei und Minute und addiert
+    sie beim Schreiben direkt in alle Stufen (1 Min, 15 Min, 1 h, 1 Tag).
+    """
+    def __init__(self):
+        self.cursors    = {}   # filename → [inode, offset]; neue Dateien starten am Ende
+        self.heads      = {}   # filename → head_time des letzten Events (Folgezeilen über Reads hinweg)
+        self.pending    = {}   # (filename, minute) → [errors, warns]
+        self.last_prune = 0
+        self.lock       = threading.Lock()
+
+    def collect(self):
+        minute = int(time.time() // 60 * 60)
+        files  = get_log_files()
+        with self.lock:
+            for filename in files:
+                filepath = os.path.join(LOG_DIR, filename)
+                cursor = self.cursors.get(filename)
+                try:
+                    if cursor is None:
+                        st = os.stat(filepath)
+                        self.cursors[filename] = [st.st_ino, st.st_size]
+                        continue
+                    data = read_new_bytes(filepath, cursor, METRICS_MAX_READ)
+                except OSError:
+                    continue
+                if not data:
+                    continue
+                events = EventAssembler(get_event_rules(filename), get_classifier(filename))
+                events.head_time = self.heads.get(filename)
+                counts = events.count(data)  # Folgezeilen zählen nicht extra
+                errors, warns = counts["error"], counts["warn"]
+                self.heads[filename] = events.head_time
+                if errors or warns:
+                    counts = self.pending.setdefault((filename, minute), [0, 0])
+                    counts[0] += errors
+                    counts[1] += warns
+            for filename in set(self.cursors) - set(files):
+                del self.cursors[filename]
+                self.heads.pop(filename, None)
+
+    def flush(self):
+        now = time.time()
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        prune = now - self.last_prune >= 3600
+        if not pending and not prune:
+            return
+        conn = get_db()
+        conn.executemany("""INSERT INTO metrics (filename, tier, bucket, errors, warns) VALUES (?,?,?,?,?)
+            ON CONFLICT(filename, tier, bucket) DO UPDATE SET
+            errors = errors + excluded.errors, warns = warns + excluded.warns""",
+            [(filename, tier, minute // tier * tier, errors, warns)
+             for (filename, minute), (errors, warns) in pending.items()
+             for tier in METRIC_TIERS])
+        if prune:
+            for tier, keep in METRIC_TIERS.items():
+                conn.execute("DELETE FROM metrics WHERE tier=? AND bucket<?", (tier, int(now - keep)))
+            self.last_prune = now
+        conn.commit()
+        conn.close()
+        invalidate_sparklines()
+
+_metrics = MetricsCollector()
+_sparklines = None  # (aktueller Bucket, {filename: [{"e", "w"}, ...]})
+
+def get_sparklines():
+    """24h-Verlauf (15-Min-Buckets) aller Dateien aus einer einzigen Abfrage."""
+    global _sparklines
+    now_bucket = int(time.time() // SPARKLINE_TIER * SPARKLINE_TIER)
+    cached = _sparklines
+    if cached is not None and cached[0] == now_bucket:
+        return cached[1]
+    first = now_bucket - (SPARKLINE_POINTS - 1) * SPARKLINE_TIER
+    conn = get_db()
+    rows = conn.execute("SELECT filename, bucket, errors, warns FROM metrics WHERE tier=? AND bucket>=?",
+                        (SPARKLINE_TIER, first)).fetchall()
+    conn.close()
+    series = {}
+    for r in rows:
+        points = series.get(r["filename"])
+        if points is None:
+            points = series[r["filename"]] = [{"e": 0, "w": 0} for _ in range(SPARKLINE_POINTS)]
+        points[(r["bucket"] - first) // SPARKLINE_TIER] = {"e": r["errors"], "w": r["warns"]}
+    _sparklines = (now_bucket, series)
+    return series
+
+def invalidate_sparklines():
+    global _sparklines
+    _sparklines = None
+    _cache_sync.bump("sparklines")
+
+EMPTY_SPARKLINE = [{"e": 0, "w": 0}] * SPARKLINE_POINTS
+
+def metrics_worker():
+    """Background Thread – zählt jede Minute die neuen ERRORs/WARNs aller Log-Dateien."""
+    while True:
+        try:
+            _cache_sync.poll()
+            _metrics.collect()
+            _metrics.flush()
+        except Exception as e:
+            app.logger.error(f"Metrics worker error: {e}")
+        time.sleep(METRICS_INTERVAL)
+
+# ─── ARCHIVE (komprimierte Rotationen) ───────────────────────
+# Komprimierte Logs werden wie normale Dateien über entpackte Byte-Offsets gelesen.
+# Für .gz merkt sich ein Index alle ARCHIVE_CHECKPOINT Bytes den Zustand des
+# Decompressors; ein seek() entpackt dann höchstens ab dem vorherigen Punkt.
+# bz2/xz/zst-Decompressoren lassen sich nicht kopieren → dort ab Dateianfang.
+ARCHIVE_CHECKPOINT     = 8 * 1024 * 1024  # entpackte Bytes zwischen zwei Einstiegspunkten
+ARCHIVE_BACKLOG        = 1024 * 1024      # bereits entpackte Bytes hinter der Leseposition behalten
+ARCHIVE_READ           = 256 * 1024       # komprimierte Bytes pro Lesevorgang
+ARCHIVE_CACHE          = 32               # Archive, deren Index im Speicher bleibt
+ARCHIVE_SEGMENT_POINTS = 2                # Einstiegspunkte pro Such-Segment (2 x 8 MB)
+
+ARCHIVE_EXTS = {".gz": lambda: zlib.decompressobj(wbits=31),
+                ".bz2": bz2.BZ2Decompressor,
+                ".xz": lzma.LZMADecompressor}
+if zstandard is not None:
+    ARCHIVE_EXTS[".zst"] = lambda: zstandard.ZstdDecompressor().decompressobj()
+
+def archive_ext(filename):
+    ext = os.path.splitext(filename)[1]
+    return ext if ext in ARCHIVE_EXTS else None
+
+def _inflate(decomp, data, ext):
+    """Füttert data in den Decompressor; mehrere Streams (z.B. gzip-Member) hintereinander."""
+    out = []
+    while data:
+        if getattr(decomp, "eof", False):
+            decomp = ARCHIVE_EXTS[ext]()
+        out.append(decomp.decompress(data))
+        data = decomp.unused_data if getattr(decomp, "eof", False) else b""
+    return decomp, b"".join(out)
+
+class ArchiveIndex:
+    """Entpackte Größe und Einstiegspunkte [(entpackt, komprimiert, decompressor)] eines Archivs."""
+    def __init__(self, path, ext):
+        self.path   = path
+        self.ext    = ext
+        self.size   = 0
+        self.points = [(0, 0, None)]   # None = frischer Decompressor ab Dateianfang
+        self.offsets = [0]
+
+    def build(self):
+        decomp    = ARCHIVE_EXTS[self.ext]()
+        copyable  = hasattr(decomp, "copy")
+        upos = cpos = 0
+        next_point = ARCHIVE_CHECKPOINT
+        with open(self.path, "rb") as f:
+            while True:
+                chunk = f.read(ARCHIVE_READ)
+                if not chunk:
+                    break
+                try:
+                    decomp, out = _inflate(decomp, chunk, self.ext)
+                except (zlib.error, OSError, EOFError, lzma.LZMAError) as e:
+                    app.logger.warning(f"Archive {self.path} truncated at {cpos}: {e}")
+                    break
+                cpos += len(chunk)
+                upos += len(out)
+                if copyable and upos >= next_point:
+                    self.points.append((upos, cpos, decomp.copy()))
+                    self.offsets.append(upos)
+                    next_point = upos + ARCHIVE_CHECKPOINT
+        self.size = upos
+        return self
+
+    def point_before(self, pos):
+        return self.points[bisect.bisect_right(self.offsets, pos) - 1]
+
+class ArchiveReader:
+    """Lesbar wie open(path, "rb"): seek/tell/read auf entpackten Offsets."""
+    def __init__(self, index):
+        self.index   = index
+        self.f       = open(index.path, "rb")
+        self.pos     = 0
+        self.decomp  = None
+        self.buf     = b""   # entpackte Daten ab buf_pos
+        self.buf_pos = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.f.close()
+
+    def tell(self):
+        return self.pos
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        base = {os.SEEK_SET: 0, os.SEEK_CUR: self.pos, os.SEEK_END: self.index.size}[whence]
+        self.pos = max(0, min(base + offset, self.index.size))
+        return self.pos
+
+    def _restart(self, pos):
+        upos, cpos, decomp = self.index.point_before(pos)
+        self.decomp  = decomp.copy() if decomp is not None else ARCHIVE_EXTS[self.index.ext]()
+        self.f.seek(cpos)
+        self.buf, self.buf_pos = b"", upos
+
+    def _fill(self, until):
+        """Entpackt weiter, bis buf bis zum Offset until reicht (oder das Archiv endet)."""
+        parts = [self.buf]
+        have  = self.buf_pos + len(self.buf)
+        while have < until:
+            chunk = self.f.read(ARCHIVE_READ)
+            if not chunk:
+                break
+            self.decomp, out = _inflate(self.decomp, chunk, self.index.ext)
+            parts.append(out)
+            have += len(out)
+            if have - self.buf_pos > 2 * ARCHIVE_BACKLOG and have < self.pos:
+                # Beim Vorspulen nur die letzten ARCHIVE_BACKLOG Bytes behalten
+                data = b"".join(parts)
+                cut  = max(0, min(len(data) - ARCHIVE_BACKLOG, self.pos - ARCHIVE_BACKLOG - self.buf_pos))
+                self.buf_pos += cut
+                parts = [data[cut:]]
+        self.buf = b"".join(parts)
+
+    def read(self, n=-1):
+        end = self.index.size if n is None or n < 0 else min(self.pos + n, self.index.size)
+        if end <= self.pos:
+            return b""
+        if self.decomp is None or self.pos < self.buf_pos or \
+                self.index.point_before(self.pos)[0] > self.buf_pos + len(self.buf):
+            self._restart(self.pos)
+        self._fill(end)
+        data = self.buf[self.pos - self.buf_pos:end - self.buf_pos]
+        self.pos += len(data)
+        # Speicher begrenzen: nur ARCHIVE_BACKLOG vor der Leseposition behalten
+        cut = self.pos - ARCHIVE_BACKLOG - self.buf_pos
+        if cut > 0:
+            self.buf, self.buf_pos = self.buf[cut:], self.buf_pos + cut
+        return data
+
+_archives      = OrderedDict()   # pfad → ((inode, mtime, size), ArchiveIndex), LRU
+_archives_lock = threading.Lock()
+_archive_locks = {}              # pfad → Lock, damit nur einer den Index baut
+
+def get_archive(filepath):
+    """Index eines Archivs (beim ersten Zugriff einmal komplett entpacken)."""
+    st  = os.stat(filepath)
+    key = (st.st_ino, st.st_mtime, st.st_size)
+    with _archives_lock:
+        cached = _archives.get(filepath)
+        if cached is not None and cached[0] == key:
+            _archives.move_to_end(filepath)
+            return cached[1]
+        build_lock = _archive_locks.setdefault(filepath, threading.Lock())
+    with build_lock:
+        with _archives_lock:
+            cached = _archives.get(filepath)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+        index = ArchiveIndex(filepath, archive_ext(filepath)).build()
+        with _archives_lock:
+            _archives[filepath] = (key, index)
+            _archives.move_to_end(filepath)
+            while len(_archives) > ARCHIVE_CACHE:
+                old, _ = _archives.popitem(last=False)
+                _archive_locks.pop(old, None)
+        return index
+
+def open_log(filepath):
+    """Öffnet eine Log-Datei binär; Archive werden transparent entpackt."""
+    if archive_ext(filepath):
+        return ArchiveReader(get_archive(filepath))
+    return open(filepath, "rb")
+
+def log_size(filepath):
+    """Größe in (entpackten) Bytes."""
+    if archive_ext(filepath):
+        return get_archive(filepath).size
+    return os.path.getsize(filepath)
+
+# ─── LOG LESEN ───────────────────────────────────────────────
+TAIL_BLOCK_SIZE = 64 * 1024
+
+def tail_lines(filepath, n, end=None, block_size=TAIL_BLOCK_SIZE):
+    """
+    Liest die letzten n Zeilen einer Datei, rückwärts ab EOF (oder ab Byte-Offset
+    end) in festen Blöcken. Speicherbedarf hängt von n ab, nicht von der Dateigröße.
+    Gibt [(byte_offset, rohzeile_bytes), ...] in Dateireihenfolge zurück.
+    """
+    if n <= 0:
+        return []
+    found = []  # rückwärts gesammelt
+    with open_log(filepath) as f:
+        if end is None:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+        pos  = end
+        head = b""  # unvollständiger Zeilenanfang aus dem vorherigen Block
+        first_block = True
+        while pos > 0 and len(found) < n:
+            size = min(block_size, pos)
+            pos -= size
+            f.seek(pos)
+            data  = f.read(size) + head
+            parts = data.split(b"\n")
+            line_end = pos + len(data)
+            if first_block:
+                # Abschließender Zeilenumbruch erzeugt keine eigene Zeile
+                if data.endswith(b"\n"):
+                    parts.pop()
+                    line_end -= 1
+                first_block = False
+            head = parts[0]
+            for part in reversed(parts[1:]):
+                start = line_end - len(part)
+                found.append((start, part))
+                line_end = start - 1
+                if len(found) >= n:
+                    break
+        if pos == 0 and len(found) < n and not first_block:
+            found.append((0, head))
+    found.reverse()
+    return found
+
+# ─── ZEITSTEMPEL ─────────────────────────────────────────────
+# Zeitstempel werden als Wanduhrzeit gelesen (Zeitzonen-Angaben ignoriert) und mit
+# calendar.timegm in Sekunden umgerechnet – Vergleiche passen, solange Log und
+# Abfrage dieselbe Uhr meinen. Profile können ein eigenes Format in strftime-Syntax
+# mitbringen (timestamp_pattern, z.B. "%d.%m.%Y %H:%M:%S"); ohne Format werden die
+# gängigen Formate unten automatisch erkannt.
+_MONTHS = {m: i for i, m in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), 1)}
+
+TIMESTAMP_FORMATS = (
+    # 2026-10-17 03:14:15 / 2026-10-17T03:14 / 2026/10/17 03:14:15 (Radarr, Python, Jellyfin, Nginx-Error, …)
+    (re.compile(r'(\d{4})[-/](\d{2})[-/](\d{2})[T ](\d{2}):(\d{2})(?::(\d{2}))?'),
+     lambda m: (int(m[1]), int(m[2]), int(m[3]), int(m[4]), int(m[5]), int(m[6] or 0))),
+    # 17/Oct/2026:03:14:17 (Nginx/Traefik Access-Log)
+    (re.compile(r'(\d{2})/([A-Za-z]{3})/(\d{4}):(\d{2}):(\d{2}):(\d{2})'),
+     lambda m: (int(m[3]), _MONTHS.get(m[2].lower(), 0), int(m[1]), int(m[4]), int(m[5]), int(m[6]))),
+    # Oct 17 03:14:15 (Syslog, ohne Jahr)
+    (re.compile(r'\b([A-Z][a-z]{2}) +(\d{1,2}) (\d{2}):(\d{2}):(\d{2})'),
+     lambda m: (None, _MONTHS.get(m[1].lower(), 0), int(m[2]), int(m[3]), int(m[4]), int(m[5]))),
+)
+
+def _wallclock(year, month, day, hour, minute, second):
+    """Sekunden für eine Wanduhrzeit; ohne Jahr das aktuelle (oder das vorige, falls sonst in der Zukunft)."""
+    try:
+        if year is not None:
+            return calendar.timegm((year, month, day, hour, minute, second))
+        now  = time.time()
+        year = time.gmtime(now).tm_year
+        ts   = calendar.timegm((year, month, day, hour, minute, second))
+        return ts if ts <= now + 86400 else calendar.timegm((year - 1, month, day, hour, minute, second))
+    except (ValueError, OverflowError):
+        return None
+
+def _valid_date(month, day, hour, minute, second):
+    return 1 <= month <= 12 and 1 <= day <= 31 and hour < 24 and minute < 60 and second < 62
+
+def parse_timestamp(text):
+    """Erster erkannter Zeitstempel in text als Sekunden (Wanduhrzeit), sonst None."""
+    for pattern, fields in TIMESTAMP_FORMATS:
+        m = pattern.search(text)
+        if m:
+            year, *rest = fields(m)
+            if _valid_date(*rest):
+                return _wallclock(year, *rest)
+    return None
+
+# strftime-Direktive → Regex-Gruppe
+_STRFTIME = {
+    "Y": r"(?P<Y>\d{4})",        "y": r"(?P<y>\d{2})",
+    "m": r"(?P<m>\d{1,2})",      "d": r"(?P<d>\d{1,2})",      "b": r"(?P<b>[A-Za-z]{3})",
+    "H": r"(?P<H>\d{1,2})",      "I": r"(?P<I>\d{1,2})",      "p": r"(?P<p>[AaPp][Mm])",
+    "M": r"(?P<M>\d{2})",        "S": r"(?P<S>\d{2})",        "f": r"\d{1,9}",
+    "z": r"(?:Z|[+-]\d{2}:?\d{2})", "a": r"[A-Za-z]{3}",     "s": r"(?P<s>\d{9,11})",
+    "%": "%",
+}
+
+class TimestampParser:
+    def __init__(self, pattern=""):
+        """pattern in strftime-Syntax; leer = Formate automatisch erkennen. ValueError bei ungültigem Format."""
+        self.pattern = pattern or ""
+        self.regex   = None
+        if not self.pattern:
+            return
+        parts, i = [], 0
+        while i < len(self.pattern):
+            ch = self.pattern[i]
+            if ch == "%":
+                directive = self.pattern[i + 1:i + 2]
+                if directive not in _STRFTIME:
+                    raise ValueError(f"Unbekannte Direktive %{directive}")
+                parts.append(_STRFTIME[directive])
+                i += 2
+                continue
+            parts.append(r"\s+" if ch.isspace() else re.escape(ch))
+            i += 1
+        try:
+            self.regex = re.compile("".join(parts))
+        except re.error as e:
+            raise ValueError(str(e))
+        groups = self.regex.groupindex
+        if "s" not in groups and not ("d" in groups and ("m" in groups or "b" in groups)):
+            raise ValueError("Format braucht ein Datum (%d und %m/%b) oder %s")
+
+    def stamped(self, text):
+        """Enthält text einen Zeitstempel? (nur Mustersuche, ohne Umrechnung)"""
+        if self.regex is None:
+            return any(pattern.search(text) for pattern, _fields in TIMESTAMP_FORMATS)
+        return self.regex.search(text) is not None
+
+    def parse(self, text):
+        if self.regex is None:
+            return parse_timestamp(text)
+        m = self.regex.search(text)
+        if not m:
+            return None
+        g = m.groupdict()
+        if g.get("s"):
+            return int(g["s"])
+        year  = int(g["Y"]) if g.get("Y") else (2000 + int(g["y"]) if g.get("y") else None)
+        month = int(g["m"]) if g.get("m") else _MONTHS.get(g["b"].lower(), 0)
+        hour  = int(g.get("H") or g.get("I") or 0)
+        if g.get("p"):
+            hour = hour % 12 + (12 if g["p"].lower() == "pm" else 0)
+        rest = (month, int(g["d"]), hour, int(g.get("M") or 0), int(g.get("S") or 0))
+        return _wallclock(year, *rest) if _valid_date(*rest) else None
+
+AUTO_TIMESTAMPS = TimestampParser()
+
+_ts_parsers = {}   # profile_id → TimestampParser (geleert von invalidate_classifiers)
+
+def get_timestamp_parser(filename):
+    """Zeitstempel-Format aus dem Profil der Datei (rotierte Generationen: Profil der aktuellen Datei)."""
+    assigned   = get_file_profiles()
+    profile_id = assigned.get(filename)
+    if profile_id is None:
+        profile_id = assigned.get(rotation_base(filename)[0])
+    if profile_id is None:
+        return AUTO_TIMESTAMPS
+    with _classifier_lock:
+        parser = _ts_parsers.get(profile_id)
+        if parser is None:
+            row = get_profiles().get(profile_id)
+            try:
+                parser = TimestampParser((row or {}).get("timestamp_pattern") or "")
+            except ValueError as e:
+                app.logger.warning(f"Invalid timestamp pattern in profile {profile_id}: {e}")
+                parser = AUTO_TIMESTAMPS
+            _ts_parsers[profile_id] = parser
+        return parser
+
+# ─── EVENTS (MEHRZEILIG) ─────────────────────────────────────
+# Stacktraces (Python, .NET bei Sonarr/Radarr, Java) bestehen aus vielen Zeilen,
+# gehören aber zu einem Ereignis. Das Profil legt in `continuation` fest, woran
+# eine Folgezeile zu erkennen ist (kommagetrennt):
+#   notimestamp      kein Zeitstempel am Zeilenanfang, obwohl die Kopfzeile einen hat
+#   indent           beginnt mit Leerzeichen/Tab
+#   prefix:<text>    beginnt mit <text>, z.B. "prefix:   at " oder "prefix:Caused by"
+# Folgezeilen werden an das offene Event gehängt und tragen dessen Level; leer = jede
+# Zeile ist ein eigenes Event. Pro Event bleiben höchstens EVENT_MAX_LINES Zeilen bzw.
+# EVENT_MAX_BYTES im Speicher, der Rest wird nur gezählt ("skipped").
+EVENT_MAX_LINES  = 500
+EVENT_MAX_BYTES  = 64 * 1024
+EVENT_STAMP_HEAD = 48     # Zeitstempel muss in den ersten Zeichen der Zeile stehen
+EVENT_BACKFILL   = 64     # Zeilen pro Nachladeschritt bis zur Kopfzeile
+EVENT_HOLD       = 1.0    # Sekunden, die der Live-Tail ein offenes Event zurückhält
+
+class EventRules:
+    def __init__(self, spec, parser):
+        """spec = "notimestamp,prefix:   at " (wie in profiles.continuation)"""
+        self.parser      = parser
+        self.notimestamp = self.indent = False
+        prefixes = []
+        for part in (spec or "").split(","):
+            rule = part.lstrip()
+            if rule.startswith("prefix:") and len(rule) > len("prefix:"):
+                prefixes.append(rule[len("prefix:"):])
+            elif rule.strip() == "notimestamp":
+                self.notimestamp = True
+            elif rule.strip() == "indent":
+                self.indent = True
+            elif rule.strip():
+                raise ValueError(f"Unbekannte Regel: {rule.strip()}")
+        self.prefixes = tuple(prefixes)
+        self.enabled  = bool(self.notimestamp or self.indent or self.prefixes)
+
+    def structural(self, line):
+        """Folgezeile schon an der Form erkennbar (indent/prefix)?"""
+        return bool(self.prefixes and line.startswith(self.prefixes) or
+                    self.indent and line[:1] in (" ", "\t"))
+
+    def stamped(self, line):
+        return not self.notimestamp or self.parser.stamped(line[:EVENT_STAMP_HEAD])
+
+    def may_continue(self, line):
+        """Könnte line Folgezeile eines früheren Events sein (ohne dessen Kopf zu kennen)?"""
+        return self.enabled and (self.structural(line) or not self.stamped(line))
+
+NO_EVENT_RULES = EventRules("", AUTO_TIMESTAMPS)
+
+class EventAssembler:
+    """
+    Streaming-Stufe zwischen Zeilen und Anzeige: push() nimmt die nächste Zeile
+    und liefert das Event, das sie abschließt (oder None); flush() gibt das offene
+    Event heraus. Zwischen zwei push() darf beliebig viel Zeit liegen, ein Event
+    kann also über mehrere Tail-Reads wachsen.
+    """
+    def __init__(self, rules, classifier):
+        self.rules      = rules
+        self.classifier = classifier
+        self.head_time  = None    # hatte die letzte Kopfzeile einen Zeitstempel (None = keine gesehen)
+        self.head_level = None
+        self.event      = None    # offenes Event
+        self.started    = False   # hat der letzte push() ein neues Event begonnen (kein Waisenstück)?
+        self._parts     = []
+        self._size      = 0
+        self._skipped   = 0
+
+    def head(self, line):
+        """Level, falls line ein neues Event beginnt, sonst None. Ohne Puffer – reicht zum Zählen."""
+        rules = self.rules
+        if rules.enabled and self.head_time is not None:
+            if rules.structural(line):
+                return None
+            stamped = rules.stamped(line)
+            if self.head_time and not stamped:
+                return None
+        else:
+            stamped = rules.stamped(line) if rules.enabled else True
+        self.head_time  = stamped
+        self.head_level = self.classifier.classify(line)
+        return self.head_level
+
+    def count(self, data, levels=("error", "warn")):
+        """
+        Wie head() für jede Zeile von data (vollständige Zeilen als Bytes), zählt aber
+        nur die Kopfzeilen der levels und dekodiert dafür nur Zeilen, in denen eines
+        ihrer Keywords stehen könnte. Gibt {level: anzahl} zurück; head_level ist
+        danach unbestimmt.
+        """
+        counts, rules, pos = dict.fromkeys(levels, 0), self.rules, 0
+        # Solange die letzte Kopfzeile keinen Zeitstempel hatte, hängt head() von jeder
+        # Zeile ab; ab der ersten mit Zeitstempel ist jede Zeile für sich entscheidbar.
+        while rules.enabled and not self.head_time and pos < len(data):
+            end = data.find(b"\n", pos)
+            end = len(data) if end < 0 else end
+            line = data[pos:end].decode("utf-8", errors="replace").rstrip()
+            if line:
+                level = self.head(line)
+                if level in counts:
+                    counts[level] += 1
+            pos = end + 1
+        starts = self.classifier.candidates(data, levels, pos)
+        if starts is None:  # Nicht-ASCII-Keywords → jede Zeile
+            starts, i = [pos], data.find(b"\n", pos)
+            while i >= 0:
+                starts.append(i + 1)
+                i = data.find(b"\n", i + 1)
+        for start in starts:
+            end = data.find(b"\n", start)
+            line = data[start:end if end >= 0 else len(data)].decode("utf-8", errors="replace").rstrip()
+            if not line or rules.enabled and (rules.structural(line) or not rules.stamped(line)):
+                continue  # leer oder Folgezeile
+            level = self.classifier.classify(line)
+            if level in counts:
+                counts[level] += 1
+        return counts
+
+    def push(self, text, **meta):
+        level = self.head(text)
+        self.started = False
+        if level is None and self.event is not None:
+            if len(self._parts) < EVENT_MAX_LINES and self._size + len(text) <= EVENT_MAX_BYTES:
+                self._parts.append(text)
+                self._size += len(text) + 1
+            else:
+                self._skipped += 1
+            return None
+        self.started = level is not None
+        done = self.flush()
+        # Folgezeile eines bereits ausgegebenen Events: eigenes Event mit dessen Level
+        self.event  = dict(meta, level=level or self.head_level)
+        self._parts = [text]
+        self._size  = len(text)
+        return done
+
+    def flush(self):
+        event = self.event
+        if event is None:
+            return None
+        event["text"] = "\n".join(self._parts)
+        if self._skipped:
+            event["skipped"] = self._skipped
+        self.event, self._parts, self._size, self._skipped = None, [], 0, 0
+        return event
+
+    def pending(self):
+        """Offenes Event als Kopie (ohne es abzuschließen)."""
+        if self.event is None:
+            return None
+        event = dict(self.event, text="\n".join(self._parts))
+        if self._skipped:
+            event["skipped"] = self._skipped
+        return event
+
+def assemble_events(lines, rules, classifier):
+    """lines = [(text, meta-dict), ...] → Events; das letzte wird mit abgeschlossen."""
+    asm, events = EventAssembler(rules, classifier), []
+    for text, meta in lines:
+        done = asm.push(text, **meta)
+        if done:
+            events.append(done)
+    done = asm.flush()
+    if done:
+        events.append(done)
+    return events
+
+def _event_start(raws, rules):
+    """Index der letzten Zeile in raws, die sicher ein Event beginnt (None = keine)."""
+    for i in range(len(raws) - 1, -1, -1):
+        line = raws[i].decode("utf-8", errors="replace").rstrip()
+        if line and not rules.may_continue(line):
+            return i
+    return None
+
+_event_rules = {}   # profile_id → EventRules (geleert von invalidate_classifiers)
+
+def get_event_rules(filename):
+    """Folgezeilen-Regeln aus dem Profil der Datei (rotierte Generationen: Profil der aktuellen Datei)."""
+    assigned   = get_file_profiles()
+    profile_id = assigned.get(filename)
+    if profile_id is None:
+        profile_id = assigned.get(rotation_base(filename)[0])
+    if profile_id is None:
+        return NO_EVENT_RULES
+    with _classifier_lock:
+        rules = _event_rules.get(profile_id)
+    if rules is None:
+        row    = get_profiles().get(profile_id) or {}
+        parser = get_timestamp_parser(filename)
+        try:
+            rules = EventRules(row.get("continuation") or "", parser)
+        except ValueError as e:
+            app.logger.warning(f"Invalid continuation rules in profile {profile_id}: {e}")
+            rules = NO_EVENT_RULES
+        with _classifier_lock:
+            _event_rules[profile_id] = rules
+    return rules
+
+# ─── ZEILENINDEX ─────────────────────────────────────────────
+# Dünner Index pro Log-Datei für wahlfreien Zugriff: etwa alle LINE_INDEX_STEP
+# Bytes ein Eintrag (Offset eines Zeilenanfangs, Zeilennummer, erster Zeitstempel
+# ab dort). Seiten per Zeilennummer und "springe zu 03:14" brauchen damit nur eine
+# Binärsuche und einen kurzen Lesevorgang. Der Index wird einmal gebaut, danach nur
+# um die neu angehängten Bytes verlängert und in lovi-search.db gesichert (Schlüssel
+# ist Gerät + Inode, damit er das Umbenennen app.log → app.log.1 übersteht und
+# getrennte Volumes sich nicht in die Quere kommen).
+# Aufbauen und große Rückstände aufholen macht nur der Hintergrund-Thread des Leaders
+# (line_index_worker); Requests verlängern höchstens um LINE_INDEX_SYNC Bytes und
+# weichen sonst aus (tail_lines, Binärsuche über die Datei oder 503 mit Retry-After).
+LINE_INDEX_STEP  = 64 * 1024   # Bytes zwischen zwei Einträgen
+LINE_INDEX_BLOCK = 1024 * 1024 # Lesegröße beim Aufbau
+LINE_INDEX_CACHE = 64          # Dateien, deren Index im Speicher bleibt
+LINE_INDEX_HEAD  = 256         # max. Bytes der ersten Zeile für den Inode-Abgleich
+LINE_INDEX_SYNC  = 8 * 1024 * 1024    # so viele fehlende Bytes holt ein Request selbst nach
+LINE_INDEX_SAVE  = 64 * 1024 * 1024   # beim Aufbau nach so vielen Bytes Zwischenstand sichern
+LINE_INDEX_RETRY = 5                  # Sekunden (Retry-After), solange ein Index gebaut wird
+TIMESTAMP_PROBE  = 8           # Zeilen ab einem Eintrag, in denen ein Zeitstempel gesucht wird
+
+def _line_time(raw, parser):
+    return parser.parse(raw[:LINE_INDEX_HEAD].decode("utf-8", errors="replace"))
+
+def _probe_time(data, start, parser):
+    """Erster Zeitstempel in den nächsten Zeilen ab start (Fortsetzungszeilen haben oft keinen)."""
+    end = start
+    for _ in range(TIMESTAMP_PROBE):
+        end = data.find(b"\n", start)
+        if end < 0:
+            return None
+        ts = _line_time(data[start:end], parser)
+        if ts is not None:
+            return ts
+        start = end + 1
+    return None
+
+def _head_crc(data):
+    """Prüfsumme der ersten Zeile – erkennt einen wiederverwendeten Inode."""
+    nl = data.find(b"\n", 0, LINE_INDEX_HEAD)
+    return zlib.crc32(data[:nl + 1 if nl >= 0 else LINE_INDEX_HEAD])
+
+class LineIndexPending(Exception):
+    """Der Zeilenindex der Datei wird noch im Hintergrund gebaut."""
+
+class LineIndex:
+    def __init__(self, key, parser):
+        self.key     = key       # (st_dev, st_ino)
+        self.parser  = parser    # TimestampParser aus dem Profil; Formatwechsel → neuer Index
+        self.head    = None
+        self.offsets = [0]       # Byte-Offsets von Zeilenanfängen, aufsteigend
+        self.lines   = [0]       # Zeilennummer (0-basiert) am jeweiligen Offset
+        self.times   = [None]    # erster Zeitstempel ab dem Offset (oder None)
+        self.end     = 0         # bis hierhin indexiert – immer ein Zeilenanfang
+        self.total   = 0         # Zeilen in [0, end)
+        self.saved   = 0         # so viele Einträge stehen schon in der DB
+        self.lock    = threading.Lock()   # Listen ändern / Einstieg suchen
+        self.growing = threading.Lock()   # nur ein extend() gleichzeitig
+        self._stamps = None
+
+    def extend(self, f, size):
+        """Indexiert die vollständigen Zeilen zwischen end und size (eine unfertige letzte Zeile wartet)."""
+        pos, carry = self.end, b""
+        f.seek(pos)
+        while pos + len(carry) < size:
+            chunk = f.read(min(LINE_INDEX_BLOCK, size - pos - len(carry)))
+            if not chunk:
+                break
+            data  = carry + chunk
+            cut   = data.rfind(b"\n") + 1
+            carry = data[cut:]
+            if cut:
+                self._scan(data[:cut] if carry else data, pos)
+                pos += cut
+
+    def _scan(self, data, base):
+        """Pro Eintrag nur ein find/count über data, kein Zeilen-Split."""
+        head = time0 = None
+        if base == 0:
+            head, time0 = _head_crc(data), _probe_time(data, 0, self.parser)
+        offsets, lines, times = [], [], []
+        line_no, counted = self.total, 0
+        next_mark = self.offsets[-1] + LINE_INDEX_STEP
+        while next_mark < base + len(data):
+            nl = data.find(b"\n", max(counted, next_mark - base))
+            if nl < 0 or nl + 1 == len(data):
+                break
+            line_no += data.count(b"\n", counted, nl + 1)
+            counted  = nl + 1
+            offsets.append(base + counted)
+            lines.append(line_no)
+            times.append(_probe_time(data, counted, self.parser))
+            next_mark = base + counted + LINE_INDEX_STEP
+        with self.lock:
+            if base == 0:
+                self.head, self.times[0] = head, time0
+            self.offsets += offsets
+            self.lines   += lines
+            self.times   += times
+            self.total    = line_no + data.count(b"\n", counted)
+            self.end      = base + len(data)
+            self._stamps  = None
+
+    def _entry(self, i):
+        return self.offsets[i], self.lines[i]
+
+    def page_before(self, f, end, n):
+        """
+        Bis zu n Zeilen vor Byte-Offset end (ein Zeilenanfang oder das Dateiende).
+        Liest ab dem Eintrag, vor dem sicher n Zeilen liegen – also etwa
+        n Zeilen + 2 x LINE_INDEX_STEP, egal wie groß die Datei ist.
+        """
+        if end <= 0 or n <= 0:
+            return []
+        with self.lock:
+            i = bisect.bisect_right(self.offsets, end) - 1
+            j = max(0, bisect.bisect_right(self.lines, self.lines[i] - n, 0, i + 1) - 1)
+            start = self.offsets[j]
+        f.seek(start)
+        data  = f.read(end - start)
+        parts = data.split(b"\n")
+        if data.endswith(b"\n"):
+            parts.pop()
+        found, pos = [], start
+        for part in parts:
+            found.append((pos, part))
+            pos += len(part) + 1
+        return found[-n:]
+
+    def iter_lines(self, f, line, size):
+        """(offset, zeilennummer, rohzeile) ab Zeile line bis Byte size, vorwärts."""
+        with self.lock:
+            pos, no = self._entry(bisect.bisect_right(self.lines, line) - 1)
+        f.seek(pos)
+        read_to, buf = pos, b""
+        while buf is not None:
+            chunk = f.read(min(TAIL_BLOCK_SIZE, size - read_to)) if read_to < size else b""
+            read_to += len(chunk)
+            if chunk:
+                parts = (buf + chunk).split(b"\n")
+                buf   = parts.pop()
+            else:
+                parts, buf = ([buf] if buf else []), None
+            for part in parts:
+                if no >= line:
+                    yield pos, no, part
+                pos += len(part) + 1
+                no  += 1
+
+    def page_at(self, f, line, n, size):
+        return list(itertools.islice(self.iter_lines(f, line, size), n))
+
+    def first_time(self):
+        return next((ts for ts in self.times if ts is not None), None)
+
+    def line_at_time(self, f, ts, size):
+        """
+        (Zeilennummer, Byte-Offset) der ersten Zeile mit Zeitstempel >= ts;
+        (total, end), wenn alle älter sind; None, wenn die Datei keine Zeitstempel hat.
+        """
+        with self.lock:
+            if self._stamps is None:
+                last, stamps = float("-inf"), []
+                for t in self.times:   # Lücken auffüllen, Uhr-Sprünge glätten → sortiert
+                    last = max(last, t) if t is not None else last
+                    stamps.append(last)
+                self._stamps = stamps
+            if self._stamps[-1] == float("-inf"):
+                return None
+            _pos, start = self._entry(max(0, bisect.bisect_left(self._stamps, ts) - 1))
+        for pos, no, raw in self.iter_lines(f, start, size):
+            t = _line_time(raw, self.parser)
+            if t is not None and t >= ts:
+                return no, pos
+        return self.total, self.end
+
+def _read_head(filepath):
+    with open_log(filepath) as f:
+        return _head_crc(f.read(LINE_INDEX_HEAD))
+
+def _load_line_index(key, parser, newer_than=-1):
+    """Gesicherter Index zu key – None, wenn keiner da ist oder er nicht über newer_than hinausreicht."""
+    conn = get_search_db()
+    try:
+        row = conn.execute("""SELECT head, end_offset, total, pattern FROM line_index_files
+                              WHERE dev=? AND inode=?""", key).fetchone()
+        if row is None or row["pattern"] != parser.pattern or row["end_offset"] <= newer_than:
+            return None
+        index = LineIndex(key, parser)
+        index.head, index.end, index.total = row["head"], row["end_offset"], row["total"]
+        rows = conn.execute("SELECT offset, line, ts FROM line_index WHERE dev=? AND inode=? ORDER BY offset",
+                            key).fetchall()
+        if not rows:
+            return None
+        index.offsets = [r["offset"] for r in rows]
+        index.lines   = [r["line"] for r in rows]
+        index.times   = [r["ts"] for r in rows]
+        index.saved   = len(rows)
+        return index
+    except sqlite3.OperationalError:
+        return None  # Tabellen (noch) nicht da – nur im Speicher
+    finally:
+        conn.close()
+
+def _save_line_index(index):
+    conn = get_search_db()
+    try:
+        dev, inode = index.key
+        if index.saved == 0:
+            conn.execute("DELETE FROM line_index WHERE dev=? AND inode=?", index.key)
+            _prune_line_indexes(conn)
+        with index.lock:
+            new = [(dev, inode, o, l, t) for o, l, t in zip(index.offsets[index.saved:],
+                   index.lines[index.saved:], index.times[index.saved:])]
+            files_row = (dev, inode, index.head, index.end, index.total, index.parser.pattern)
+        conn.executemany("INSERT OR REPLACE INTO line_index (dev, inode, offset, line, ts) VALUES (?,?,?,?,?)",
+                         new)
+        conn.execute("""INSERT OR REPLACE INTO line_index_files (dev, inode, head, end_offset, total, pattern)
+                        VALUES (?,?,?,?,?,?)""", files_row)
+        conn.commit()
+        index.saved += len(new)
+    except sqlite3.OperationalError as e:
+        app.logger.warning(f"Line index not saved: {e}")
+    finally:
+        conn.close()
+
+def _prune_line_indexes(conn):
+    """Indizes von Inodes, die zu keiner Log-Datei mehr gehören, entfernen."""
+    log_index = get_log_index()
+    if log_index is None:
+        return
+    alive = set()
+    for f in log_index.files(include_rotating=True):
+        try:
+            st = os.stat(os.path.join(LOG_DIR, f))
+        except OSError:
+            continue
+        alive.add((st.st_dev, st.st_ino))
+    for row in conn.execute("SELECT dev, inode FROM line_index_files").fetchall():
+        key = (row["dev"], row["inode"])
+        if key not in alive:
+            conn.execute("DELETE FROM line_index WHERE dev=? AND inode=?", key)
+            conn.execute("DELETE FROM line_index_files WHERE dev=? AND inode=?", key)
+
+_line_indexes      = OrderedDict()   # pfad → LineIndex, LRU
+_line_indexes_lock = threading.Lock()
+
+def get_line_index(filepath, build=False):
+    """
+    Zeilenindex einer Datei: aus dem Speicher oder aus der DB, um neue Bytes verlängert.
+    Fehlen mehr als LINE_INDEX_SYNC Bytes, gibt es None – den Rest baut der
+    Hintergrund-Thread (build=True), der seinen Fortschritt laufend sichert.
+    """
+    st     = os.stat(filepath)
+    key    = (st.st_dev, st.st_ino)
+    size   = log_size(filepath)
+    parser = get_timestamp_parser(os.path.relpath(filepath, LOG_DIR))
+    with _line_indexes_lock:
+        index = _line_indexes.get(filepath)
+        if index is not None:
+            _line_indexes.move_to_end(filepath)
+    stale = index is None or index.key != key or size < index.end or index.parser.pattern != parser.pattern
+    if stale or (not build and size - index.end > LINE_INDEX_SYNC):
+        # Zu weit zurück → vielleicht hat der Hintergrund-Thread inzwischen mehr gesichert
+        loaded = _load_line_index(key, parser, -1 if stale else index.end)
+        if loaded is not None and size >= loaded.end and loaded.head == _read_head(filepath):
+            index = loaded
+        elif stale:
+            index = LineIndex(key, parser)  # neu, rotiert/abgeschnitten oder Inode wiederverwendet
+        with _line_indexes_lock:
+            _line_indexes[filepath] = index
+            _line_indexes.move_to_end(filepath)
+            while len(_line_indexes) > LINE_INDEX_CACHE:
+                _line_indexes.popitem(last=False)
+    if not build and size - index.end > LINE_INDEX_SYNC:
+        return None
+    if size > index.end:
+        with index.growing, open_log(filepath) as f:
+            while size > index.end:
+                end = index.end
+                index.extend(f, min(size, end + LINE_INDEX_SAVE))
+                if index.end == end:
+                    index.extend(f, size)  # eine Zeile länger als LINE_INDEX_SAVE
+                if index.end == end:
+                    break
+                _save_line_index(index)
+    return index
+
+def line_index_worker():
+    """Background Thread (Leader) – baut und verlängert die Zeilenindizes aller Log-Dateien."""
+    done = {}  # filename → (dev, inode, size) beim letzten Durchlauf
+    while True:
+        try:
+            _cache_sync.poll()
+            files = get_log_files(include_hidden=True, include_rotating=True)
+            for filename in set(done) - set(files):
+                del done[filename]
+            for filename in files:
+                filepath = os.path.join(LOG_DIR, filename)
+                try:
+                    st = os.stat(filepath)
+                    if done.get(filename) == (st.st_dev, st.st_ino, st.st_size):
+                        continue
+                    get_line_index(filepath, build=True)
+                    done[filename] = (st.st_dev, st.st_ino, st.st_size)
+                except OSError:
+                    continue
+        except Exception as e:
+            app.logger.error(f"Line index error: {e}")
+        index = get_log_index()
+        if index is not None:
+            index.wait_for_activity(timeout=30)
+            time.sleep(2)  # Schreib-Bursts bündeln
+        else:
+            time.sleep(30)
+
+def _bisect_time(f, ts, size, parser):
+    """
+    Ersatz für line_at_time, solange der Index noch gebaut wird: Binärsuche über
+    Byte-Positionen (je eine Zeitstempel-Probe), dann zeilenweise ab der letzten
+    älteren Probe. Byte-Offset der ersten Zeile mit Zeitstempel >= ts (size, wenn
+    alle älter sind); None, wenn an einer Probe kein Zeitstempel steht.
+    """
+    lo, hi = 0, size
+    while hi - lo > LINE_INDEX_STEP:
+        mid = (lo + hi) // 2
+        f.seek(mid)
+        data  = f.read(LINE_INDEX_STEP)
+        start = data.find(b"\n") + 1
+        t = _probe_time(data, start, parser) if start else None
+        if t is None:
+            return None
+        if t < ts:
+            lo = mid + start
+        else:
+            hi = mid
+    f.seek(lo)
+    pos, buf = lo, b""
+    while True:
+        chunk = f.read(LINE_INDEX_BLOCK)
+        parts = (buf + chunk).split(b"\n")
+        buf   = parts.pop() if chunk else b""
+        for raw in parts:
+            t = _line_time(raw, parser)
+            if t is not None and t >= ts:
+                return pos
+            pos += len(raw) + 1
+        if not chunk:
+            return size
+
+# ─── ROTATIONSKETTE ──────────────────────────────────────────
+# Ein "logisches Log" pro Anwendung: die aktuelle Datei und ihre rotierten
+# Generationen (app.log ← app.log.1 ← app.log.2.gz …), rückwärts seitenweise
+# lesbar. Cursor "<inode>:<offset>" wie bei SSE – der Inode bleibt beim
+# Umbenennen (app.log → app.log.1) gleich, ein Cursor überlebt also die Rotation.
+# Rotierte Generationen lesen ihre Seiten über den Zeilenindex, die aktuelle Datei
+# (wächst noch) rückwärts per tail_lines.
+CHAIN_PAGE_MAX   = 50000       # max. Zeilen pro Seite (große Fenster: ?format=compact + Kompression)
+
+_ROTATED = (
+    (re.compile(r'^(.*)\.(\d+)(\.(?:log|txt))$'),  lambda m: (m.group(1) + m.group(3), int(m.group(2)))),   # radarr.0.txt
+    (re.compile(r'^(.*\.(?:log|txt))\.(\d+)$'),    lambda m: (m.group(1), int(m.group(2)))),                # app.log.1
+    (re.compile(r'^(.*\.(?:log|txt))-(\d{8})$'),   lambda m: (m.group(1), -int(m.group(2)))),               # app.log-20261017
+)
+
+def rotation_base(filename):
+    """(aktuelle Datei der Kette, Sortierschlüssel) – kleinerer Schlüssel = neuere Generation."""
+    ext  = archive_ext(filename)
+    name = filename[:-len(ext)] if ext else filename
+    for pattern, split in _ROTATED:
+        m = pattern.match(name)
+        if m:
+            base, gen = split(m)
+            return base, (1, gen)
+    return filename, (0, 0)
+
+_chains      = {}     # aktuelle Datei → [Generationen, neueste zuerst]
+_chains_ver  = None
+_chains_lock = threading.Lock()
+
+def _full_chain(filename):
+    """Alle Generationen der Kette, zu der filename gehört, neueste zuerst."""
+    global _chains, _chains_ver
+    index = get_log_index()
+    if index is None:
+        return []
+    with _chains_lock:
+        if _chains_ver != index.version:
+            _chains_ver = index.version
+            groups = {}
+            for f in index.files(include_rotating=True):
+                base, order = rotation_base(f)
+                groups.setdefault(base, []).append((order, f))
+            _chains = {base: [f for _order, f in sorted(gens)] for base, gens in groups.items()}
+        return _chains.get(rotation_base(filename)[0], [])
+
+def rotation_chain(filename):
+    """Generationen ab filename, neueste zuerst (nur filename, wenn nichts rotiert ist)."""
+    chain = _full_chain(filename)
+    if filename not in chain:
+        return [filename]
+    return chain[chain.index(filename):]
+
+def newer_generation(filename):
+    """Die nächstneuere Generation (None für die aktuelle Datei)."""
+    chain = _full_chain(filename)
+    i = chain.index(filename) if filename in chain else 0
+    return chain[i - 1] if i > 0 else None
+
+def chain_page(filename, n, cursor=None):
+    """
+    Bis zu n Zeilen vor cursor im logischen Log von filename, über
+    Generationsgrenzen hinweg (cursor=None → ab dem Ende der neuesten Generation).
+    Gibt ([(generation, offset, rohzeile_bytes), ...] in Lesereihenfolge, cursor_davor)
+    zurück; cursor_davor ist None am Anfang der Kette. (None, None), wenn der
+    Cursor zu keiner vorhandenen Generation passt.
+    """
+    gens = []
+    for gen in rotation_chain(filename):
+        try:
+            gens.append((gen, os.stat(os.path.join(LOG_DIR, gen))))
+        except OSError:
+            continue
+    if not gens:
+        return [], None
+    if cursor is None:
+        k, offset = 0, log_size(os.path.join(LOG_DIR, gens[0][0]))
+    else:
+        inode, offset = _parse_event_id(cursor)
+        k = next((i for i, (_gen, st) in enumerate(gens) if st.st_ino == inode), None)
+        if k is None:
+            return None, None
+        offset = min(offset, log_size(os.path.join(LOG_DIR, gens[k][0])))
+    out = []
+    while True:
+        gen, st = gens[k]
+        filepath = os.path.join(LOG_DIR, gen)
+        index = get_line_index(filepath) if is_rotating_log(gen) else None
+        if index is not None:
+            with open_log(filepath) as f:
+                page = index.page_before(f, offset, n - len(out))
+        else:
+            page = tail_lines(filepath, n - len(out), end=offset)  # wächst noch oder Index im Aufbau
+        out[:0] = [(gen, offset, raw) for offset, raw in page]
+        if page and page[0][0] > 0:
+            return out, f"{st.st_ino}:{page[0][0]}"
+        k += 1
+        if k == len(gens):
+            return out, None
+        offset = log_size(os.path.join(LOG_DIR, gens[k][0]))
+        if len(out) >= n:
+            return out, f"{gens[k][1].st_ino}:{offset}"
+
+def find_time(filename, ts):
+    """
+    (Generation, Zeilennummer, Byte-Offset) des ersten Eintrags ab Zeitpunkt ts im
+    logischen Log. Geht die Kette von neu nach alt durch, bis eine Generation nicht
+    später beginnt; übersprungene Generationen werden nur über ihren Index angefasst.
+    LineIndexPending, solange einer der nötigen Indizes noch gebaut wird.
+    """
+    gens = [gen for gen in rotation_chain(filename) if os.path.exists(os.path.join(LOG_DIR, gen))]
+    if not gens:
+        return filename, 0, 0
+    for gen in gens:
+        filepath = os.path.join(LOG_DIR, gen)
+        index = get_line_index(filepath)
+        if index is None:
+            raise LineIndexPending(gen)
+        first = index.first_time()
+        if first is not None and first <= ts:
+            with open_log(filepath) as f:
+                line, offset = index.line_at_time(f, ts, index.end)
+            newer = newer_generation(gen)
+            if line >= index.total and newer is not None and newer in gens:
+                return newer, 0, 0  # liegt in der Lücke zwischen zwei Generationen
+            return gen, line, offset
+    return gens[-1], 0, 0  # älter als alles Vorhandene
+
+def byte_range(filename, since=None, until=None):
+    """
+    Byte-Bereich [lo, hi) einer Datei mit den Zeilen, deren Zeitstempel in
+    [since, until) liegt (None = offen). Ohne Zeitstempel in der Datei: alles.
+    Solange der Zeilenindex noch gebaut wird, per Binärsuche direkt in der Datei.
+    """
+    filepath = os.path.join(LOG_DIR, filename)
+    size = log_size(filepath)
+    if since is None and until is None:
+        return 0, size
+    index = get_line_index(filepath)
+    lo, hi = 0, size
+    if index is None:
+        parser = get_timestamp_parser(filename)
+        with open_log(filepath) as f:
+            if since is not None:
+                lo = _bisect_time(f, since, size, parser)
+                if lo is None:
+                    return 0, size
+            if until is not None:
+                hi = _bisect_time(f, until, size, parser)
+                if hi is None:
+                    return 0, size
+        return lo, max(lo, hi)
+    with open_log(filepath) as f:
+        if since is not None:
+            found = index.line_at_time(f, since, index.end)
+            if found is None:
+                return 0, size
+            lo = found[1] if found[1] < index.end else size
+        if until is not None:
+            found = index.line_at_time(f, until, index.end)
+            hi = found[1] if found[1] < index.end else size
+    return lo, max(lo, hi)
+
+# ─── LEVEL-KLASSIFIKATION ────────────────────────────────────
+# Pro Profil ein vorkompilierter Klassifizierer aus level_error/warn/info/debug.
+# Priorität wie bisher: error > warn > info > debug, ohne Groß/Klein.
+# Eine `in`-Kette ist in CPython schneller als ein Alternations-Regex, daher werden
+# die Keywords nur einmal normalisiert und reduziert: Keywords, die ein kürzeres
+# Keyword desselben Levels enthalten ("[Error]" ⊃ "ERROR"), können nie zusätzlich
+# treffen und fliegen raus.
+# Zeichen, deren upper() bzw. lower() ASCII-Buchstaben enthält ("ı" → "I", "ﬁ" → "FI",
+# "K" → "k"): mit ihnen findet classify() bzw. die Suche ein Wort, das so nicht in den
+# Bytes steht. Enthalten die Bytes eines davon, muss es als Literal mitgesucht werden.
+_CASE_TO_ASCII = "\u00df\u0130\u0131\u0149\u017f\u01f0\u1e96\u1e97\u1e98\u1e99\u1e9a" \
+                 "\u212a\ufb00\ufb01\ufb02\ufb03\ufb04\ufb05\ufb06"
+
+def _case_specials(words):
+    """Zeichen aus _CASE_TO_ASCII (als Bytes), die einen Buchstaben von words liefern können."""
+    letters = set("".join(words).lower())
+    return [c.encode() for c in _CASE_TO_ASCII if letters & set(c.upper().lower() + c.lower())]
+
+DEFAULT_LEVEL_KEYWORDS = {
+    "error": "ERROR,CRITICAL",
+    "warn":  "WARN,WARNING",
+    "info":  "INFO",
+    "debug": "DEBUG",
+}
+
+class LevelClassifier:
+    def __init__(self, keywords):
+        """keywords = {"error": "ERROR,[Fatal]", "warn": ..., ...} (kommagetrennt wie in profiles)"""
+        checks = []
+        for level in ("error", "warn", "info", "debug"):
+            kws = {kw.strip().upper() for kw in (keywords.get(level) or "").split(",") if kw.strip()}
+            kws = [kw for kw in kws if not any(o != kw and o in kw for o in kws)]
+            checks += [(kw, level) for kw in sorted(kws, key=len)]
+        self.checks = tuple(checks)
+        self._literals = {}
+
+    def _bytes_literals(self, levels):
+        """(Keywords der levels klein als Bytes, Sonderzeichen-Literale) – None bei Nicht-ASCII-Keywords."""
+        cached = self._literals.get(levels, False)
+        if cached is False:
+            kws = [kw for kw, level in self.checks if level in levels]
+            if all(kw.isascii() for kw in kws):
+                cached = ([kw.lower().encode() for kw in kws], _case_specials(kws))
+            else:
+                cached = None
+            self._literals[levels] = cached
+        return cached
+
+    def candidates(self, data, levels, pos=0):
+        """
+        Anfänge der Zeilen in data[pos:] (Bytes), die ein Keyword der levels enthalten
+        könnten – nur diese muss classify() noch sehen, alle anderen haben sicher ein
+        anderes Level. None, wenn ein Keyword kein ASCII ist (dann Zeile für Zeile).
+        """
+        literals = self._bytes_literals(levels)
+        if literals is None:
+            return None
+        kws, specials = literals
+        if specials and not data.isascii():
+            kws = kws + specials
+        if not kws:
+            return []
+        search, starts = _literal_search(data.lower(), kws), []
+        i = search(pos)
+        while i >= 0:
+            starts.append(data.rfind(b"\n", pos, i) + 1 or pos)
+            end = data.find(b"\n", i)
+            if end < 0:
+                break
+            i = search(end)
+        return starts
+
+    def classify(self, line):
+        u = line.upper()
+        for kw, level in self.checks:
+            if kw in u:
+                return level
+        return "default"
+
+DEFAULT_CLASSIFIER = LevelClassifier(DEFAULT_LEVEL_KEYWORDS)
+
+def _literal_search(data, literals):
+    """
+    search(at) → Position des nächsten der literals in data ab at (oder -1). Pro
+    Literal ein bytes.find, dessen Ergebnis gemerkt wird, bis at darüber hinaus ist –
+    deutlich schneller als ein Regex mit Alternation.
+    """
+    if len(literals) == 1:
+        return functools.partial(data.find, literals[0])
+    found = [data.find(lit) for lit in literals]
+    def search(at):
+        best = -1
+        for k, lit in enumerate(literals):
+            i = found[k]
+            if 0 <= i < at:
+                i = found[k] = data.find(lit, at)
+            if i >= 0 and (best < 0 or i < best):
+                best = i
+        return best
+    return search
+
+_classifiers      = {}    # profile_id → LevelClassifier
+_classifier_lock  = threading.Lock()
+
+def get_classifier(filename):
+    """Klassifizierer für das zugewiesene Profil einer Datei (rotierte Generationen: Profil der aktuellen Datei)."""
+    assigned   = get_file_profiles()
+    profile_id = assigned.get(filename)
+    if profile_id is None:
+        profile_id = assigned.get(rotation_base(filename)[0])
+    if profile_id is None:
+        return DEFAULT_CLASSIFIER  # Standard-Keywords
+    with _classifier_lock:
+        classifier = _classifiers.get(profile_id)
+        if classifier is None:
+            row = get_profiles().get(profile_id)
+            classifier = DEFAULT_CLASSIFIER
+            if row:
+                classifier = LevelClassifier({"error": row["level_error"], "warn":  row["level_warn"],
+                                              "info":  row["level_info"],  "debug": row["level_debug"]})
+            _classifiers[profile_id] = classifier
+        return classifier
+
+def invalidate_classifiers():
+    """Wird von invalidate_profiles() aufgerufen."""
+    with _classifier_lock:
+        _classifiers.clear()
+        _ts_parsers.clear()
+        _event_rules.clear()
+    # Gecachte Zeilen tragen die alten Levels
+    with _file_states_lock:
+        _file_states.clear()
+
+def read_log_file(filename, search=None, lines=200, before=None, since=None, until=None):
+    """
+    Letzte `lines` Zeilen des logischen Logs (bzw. die davor liegenden ab Cursor
+    before), bei Bedarf aus älteren Generationen aufgefüllt und zu Events
+    zusammengefasst (siehe EVENTS). Beginnt die Seite mitten in einem Event, wird
+    bis zu dessen Kopfzeile nachgeladen, damit kein Stacktrace zerrissen wird.
+    since/until (Sekunden, siehe parse_timestamp) begrenzen auf ein Zeitfenster:
+    until setzt den Start per Zeilenindex (ohne die Blöcke dahinter zu lesen),
+    an since endet das Blättern.
+    Gibt (events, cursor_für_ältere) zurück; (None, None) bei ungültigem Cursor.
+    Mit until LineIndexPending, solange ein nötiger Zeilenindex noch gebaut wird.
+    """
+    if until is not None and before is None:
+        gen, _line, offset = find_time(filename, until)
+        try:
+            before = f"{os.stat(os.path.join(LOG_DIR, gen)).st_ino}:{offset}"
+        except OSError:
+            return [], None
+    page, cursor = chain_page(filename, min(lines, CHAIN_PAGE_MAX), before)
+    if page is None:
+        return None, None
+    rules = get_event_rules(filename)
+    extra = 0
+    while rules.enabled and page and cursor and extra < EVENT_MAX_LINES and \
+            rules.may_continue(page[0][2].decode("utf-8", errors="replace").rstrip()):
+        more, more_cursor = chain_page(filename, EVENT_BACKFILL, cursor)
+        if not more:
+            break
+        start = _event_start([raw for _gen, _offset, raw in more], rules)
+        if start is None:
+            page[:0], cursor = more, more_cursor
+            extra += len(more)
+            continue
+        page[:0] = more[start:]
+        if start > 0:
+            gen, offset, _raw = more[start]
+            cursor = f"{os.stat(os.path.join(LOG_DIR, gen)).st_ino}:{offset}"
+        else:
+            cursor = more_cursor
+        break
+    classifier = get_classifier(filename)
+    matcher    = get_matcher(filename, search)
+    parser     = get_timestamp_parser(filename) if since is not None else None
+    current    = None  # Zeitstempel des letzten Events mit Zeitstempel (gilt für die folgenden)
+    rows = ((raw.decode("utf-8", errors="replace").rstrip(), {"file": gen, "offset": offset})
+            for gen, offset, raw in page)
+    result = []
+    for event in assemble_events([row for row in rows if row[0]], rules, classifier):
+        if parser is not None:
+            current = parser.parse(event["text"][:LINE_INDEX_HEAD]) or current
+            if current is not None and current < since:
+                cursor = None  # Anfang des Zeitfensters erreicht
+                continue
+        if matcher and not matcher.accepts(event["text"], event["level"]):
+            continue
+        result.append(event)
+    return result, cursor
+
+def read_log_page(filename, search=None, limit=200, offset=0, source=None, at=None, until=None):
+    """
+    Vorwärts-Seite: limit Zeilen ab Zeile offset der Generation source (Standard:
+    filename selbst) oder ab dem Zeitpunkt at (Sekunden, siehe parse_timestamp)
+    im logischen Log von filename, zu Events zusammengefasst; ein Event am
+    Seitenende wird um seine Folgezeilen verlängert. "next" zeigt auf die folgende
+    Seite, am Ende einer Generation auf den Anfang der nächstneueren; None am Ende
+    der aktuellen Datei oder sobald ein Event ab until erreicht ist.
+    LineIndexPending, solange der Zeilenindex von source noch gebaut wird.
+    """
+    if at is not None:
+        source, offset, _pos = find_time(filename, at)
+    source   = source or filename
+    filepath = os.path.join(LOG_DIR, source)
+    result   = {"lines": [], "file": filename, "source": source, "offset": offset,
+                "total": 0, "before": None, "next": None}
+    if not os.path.exists(filepath):
+        return result
+    index = get_line_index(filepath)
+    if index is None:
+        raise LineIndexPending(source)  # Zeilennummern gibt es erst mit Index
+    size  = log_size(filepath)
+    limit = min(limit, CHAIN_PAGE_MAX)
+    classifier = get_classifier(filename)
+    rules      = get_event_rules(filename)
+    with open_log(filepath) as f:
+        page = index.page_at(f, offset, limit, size)
+        full = len(page) == limit
+        if rules.enabled and full:
+            probe = EventAssembler(rules, classifier)
+            for _pos, _no, raw in page:
+                line = raw.decode("utf-8", errors="replace").rstrip()
+                if line:
+                    probe.head(line)
+            extra = 0
+            while extra < EVENT_MAX_LINES:
+                more = index.page_at(f, page[-1][1] + 1, EVENT_BACKFILL, size)
+                cont = list(itertools.takewhile(
+                    lambda row: probe.head(row[2].decode("utf-8", errors="replace").rstrip() or " ") is None,
+                    more))
+                page  += cont
+                extra += len(cont)
+                if len(cont) < len(more) or len(more) < EVENT_BACKFILL:
+                    full = len(more) > len(cont)
+                    break
+    matcher = get_matcher(filename, search)
+    parser  = get_timestamp_parser(filename) if until is not None else None
+    ended   = False
+    rows    = ((raw.decode("utf-8", errors="replace").rstrip(), {"file": source, "line": no, "offset": pos})
+               for pos, no, raw in page)
+    for event in assemble_events([row for row in rows if row[0]], rules, classifier):
+        if parser is not None:
+            ts = parser.parse(event["text"][:LINE_INDEX_HEAD])
+            if ts is not None and ts >= until:
+                ended = True  # Ende des Zeitfensters
+                break
+        if matcher and not matcher.accepts(event["text"], event["level"]):
+            continue
+        result["lines"].append(event)
+    inode = os.stat(filepath).st_ino
+    result["total"]  = index.total
+    result["before"] = f"{inode}:{page[0][0] if page else size}"
+    if not ended:  # am Ende des Zeitfensters bleibt next None
+        if full:
+            result["next"] = {"file": source, "offset": page[-1][1] + 1}
+        else:
+            newer = newer_generation(source)
+            result["next"] = {"file": newer, "offset": 0} if newer else None
+    return result
+
+# ─── FILE STATE CACHE ────────────────────────────────────────
+# Prozessweiter Zustand pro Log-Datei, damit das Dashboard-Polling nur die
+# seit dem letzten Poll angehängten Bytes liest. Schlüssel ist (inode, size, mtime);
+# Inode-Wechsel oder schrumpfende Datei (Rotation/Truncate) setzen den Eintrag zurück.
+# Der Ring arbeitet auf Events (Stacktrace = ein Eintrag mit dem Level der Kopfzeile).
+# Level-Zähler führt nur der MetricsCollector (pro Minute, siehe METRIKEN).
+SUMMARY_LINES  = 50
+RESEED_BYTES   = 16 * 1024 * 1024  # mehr neue Bytes → einfach neu vom Ende lesen
+LEVELS         = ("error", "warn", "info", "debug", "default")
+
+class FileState:
+    def __init__(self, inode, classifier, rules=NO_EVENT_RULES):
+        self.inode   = inode
+        self.classifier = classifier
+        self.rules   = rules
+        self.events  = EventAssembler(rules, classifier)
+        self.key     = None
+        self.size    = 0
+        self.offset  = 0      # bis hierhin gelesen
+        self.pending = b""    # unvollständige letzte Zeile
+        self.ring    = deque(maxlen=SUMMARY_LINES)
+        self.lock    = threading.Lock()
+
+    def _add_line(self, raw):
+        line = raw.decode("utf-8", errors="replace").rstrip()
+        if not line:
+            return
+        done = self.events.push(line)
+        if done:
+            self.ring.append(done)
+
+    def seed(self, filepath, size):
+        """Initialer Zustand aus den letzten SUMMARY_LINES Zeilen."""
+        tail = tail_lines(filepath, SUMMARY_LINES + 1, end=size)
+        if tail and size > 0:
+            with open(filepath, "rb") as f:
+                f.seek(size - 1)
+                if f.read(1) != b"\n":
+                    self.pending = tail.pop()[1]
+        for _offset, raw in tail:
+            self._add_line(raw)
+        self.offset = size
+
+    def consume(self, filepath, size):
+        """Liest nur die Bytes zwischen offset und size."""
+        with open(filepath, "rb") as f:
+            f.seek(self.offset)
+            data = self.pending + f.read(size - self.offset)
+        parts = data.split(b"\n")
+        self.pending = parts.pop()
+        for raw in parts:
+            self._add_line(raw)
+        self.offset = size
+
+    def recent(self):
+        lines = list(self.ring)
+        open_event = self.events.pending()
+        if open_event:
+            lines.append(open_event)
+        if self.pending.strip():
+            line = self.pending.decode("utf-8", errors="replace").rstrip()
+            lines.append({"text": line, "level": self.classifier.classify(line)})
+        return lines[-SUMMARY_LINES:]
+
+_file_states      = {}
+_file_states_lock = threading.Lock()
+
+def get_file_state(filename):
+    """Aktualisiert und liefert den FileState einer Datei (None wenn nicht vorhanden)."""
+    filepath = os.path.join(LOG_DIR, filename)
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        with _file_states_lock:
+            _file_states.pop(filename, None)
+        return None
+    key = (st.st_ino, st.st_size, st.st_mtime_ns)
+    classifier = get_classifier(filename)
+    with _file_states_lock:
+        state = _file_states.get(filename)
+        if state is None or state.inode != st.st_ino or st.st_size < state.offset:
+            state = FileState(st.st_ino, classifier, get_event_rules(filename))
+            _file_states[filename] = state
+    if state.key == key:
+        return state  # unverändert – kein Disk-I/O
+    with state.lock:
+        if state.key != key:
+            try:
+                if state.key is None or st.st_size - state.offset > RESEED_BYTES:
+                    fresh = FileState(st.st_ino, state.classifier, state.rules)
+                    fresh.seed(filepath, st.st_size)
+                    state.ring, state.pending, state.offset = fresh.ring, fresh.pending, fresh.offset
+                    state.events = fresh.events
+                elif st.st_size > state.offset:
+                    state.consume(filepath, st.st_size)
+            except OSError:
+                return None
+            state.size = st.st_size
+            state.key  = key
+    return state
+
+# ─── SCAN EXECUTOR ───────────────────────────────────────────
+# Verteilt Arbeit pro Datei auf gemeinsame Thread-Pools: I/O-lastiges (Tail lesen,
+# File-State-Cache) und CPU-lastiges (Zeilen matchen) getrennt, damit eine große
+# Suche das Dashboard nicht aushungert. Kein Prozess-Pool: fork() aus einem Prozess
+# mit Watchdog-, Sampler- und Server-Threads erbt deren gehaltene Sperren, und
+# bytes.find/mmap geben beim Scannen ohnehin das GIL frei.
+# Abbruch (Zeitlimit, Client weg) setzt ein Stop-Flag, das laufende Scans zwischen
+# zwei Fenstern/Blöcken über check_scan() prüfen.
+SCAN_THREADS        = int(os.environ.get("LOVI_SCAN_THREADS", min(32, (os.cpu_count() or 1) * 4)))
+SCAN_SEARCH_THREADS = int(os.environ.get("LOVI_SEARCH_THREADS", os.cpu_count() or 1))
+SCAN_TIMEOUT        = int(os.environ.get("LOVI_SCAN_TIMEOUT", 30))  # Sekunden pro Request
+
+_scan_pools      = {}
+_scan_pools_lock = threading.Lock()
+_scan_local      = threading.local()
+
+class ScanCancelled(Exception):
+    """Die Aufgabe wurde von scan_files abgebrochen (Zeitlimit oder Client weg)."""
+
+def check_scan():
+    """In Scan-Schleifen aufrufen: wirft ScanCancelled, sobald die Aufgabe gestoppt ist."""
+    stop = getattr(_scan_local, "stop", None)
+    if stop is not None and stop.is_set():
+        raise ScanCancelled()
+
+def _run_scan(stop, fn, args):
+    _scan_local.stop = stop
+    try:
+        check_scan()
+        return fn(*args)
+    finally:
+        _scan_local.stop = None
+
+def get_scan_pool(kind):
+    """kind = "io" (Tails, File-State) oder "cpu" (Zeilen matchen) – je ein eigener Thread-Pool."""
+    with _scan_pools_lock:
+        pool = _scan_pools.get(kind)
+        if pool is None:
+            workers = SCAN_SEARCH_THREADS if kind == "cpu" else SCAN_THREADS
+            pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix=f"lovi-scan-{kind}")
+            _scan_pools[kind] = pool
+        return pool
+
+def scan_files(jobs, kind="io", timeout=SCAN_TIMEOUT):
+    """
+    jobs = [(key, fn, args), ...] – führt fn(*args) parallel aus und liefert
+    (key, ergebnis) in der Reihenfolge der jobs. Fehler werden übersprungen.
+    Läuft das Zeitlimit ab oder wird der Generator vorzeitig geschlossen
+    (Client weg), werden wartende Aufgaben verworfen und laufende gestoppt.
+    """
+    pool     = get_scan_pool(kind)
+    stop     = threading.Event()
+    futures  = [(key, pool.submit(_run_scan, stop, fn, args)) for key, fn, args in jobs]
+    deadline = time.monotonic() + timeout
+    try:
+        for key, future in futures:
+            try:
+                result = future.result(timeout=max(0, deadline - time.monotonic()))
+            except FuturesTimeout:
+                app.logger.warning(f"Scan timeout after {timeout}s ({len(futures)} files)")
+                return
+            except Exception as e:
+                app.logger.error(f"Scan error in {key}: {e}")
+                continue
+            yield key, result
+    finally:
+        stop.set()
+        for _key, future in futures:
+            future.cancel()
+
+# ─── SUCHANFRAGEN ────────────────────────────────────────────
+# Kleine Abfragesprache für die globale Suche und den Filter im Log-Fenster:
+#   timeout refused          beide Begriffe (UND ist implizit, "AND" geht auch)
+#   "connection refused"     Phrase
+#   error OR warn            eines von beiden
+#   NOT debug, -debug        ausschließen; Klammern gruppieren
+#   level:error              Level laut Profil der Datei (error/warn/info/debug/default)
+#   file:radarr*             Dateiname oder -pfad (Glob)
+#   /time(d)?out/            regulärer Ausdruck
+# Alles ohne Groß/Klein. Eine Anfrage wird einmal geparst (LRU) und pro Datei
+# gebunden: file:-Terme werden dabei zu Konstanten, Level-Terme laufen vor dem
+# Textvergleich, und die Literale, von denen jede Treffer-Zeile eines enthalten
+# muss, filtern beim Scannen schon auf Byte-Ebene vor.
+QUERY_CACHE = 256
+
+_QUERY_TOKEN = re.compile(r'''\s*(?:
+      (?P<paren>[()])
+    | (?P<neg>-)?(?: "(?P<phrase>(?:[^"\\]|\\.)*)"?
+                   | /(?P<regex>(?:[^/\\]|\\.)+)/(?=[\s()]|$)
+                   | (?P<word>[^\s()]+) )
+    )''', re.X)
+
+class _Const:
+    cost = 0
+    def __init__(self, value):
+        self.value = value
+    def test(self, line, lower, level):
+        return self.value
+    def bind(self, filename):
+        return self
+    def literals(self, classifier):
+        return None if self.value else set()
+
+_TRUE, _FALSE = _Const(True), _Const(False)
+
+class _Text:
+    cost = 1
+    def __init__(self, text):
+        self.text = text.lower()
+    def test(self, line, lower, level):
+        return self.text in lower
+    def bind(self, filename):
+        return self
+    def literals(self, classifier):
+        return {self.text}
+
+class _Regex:
+    cost = 3
+    def __init__(self, source):
+        try:
+            self.regex = re.compile(source, re.I)
+        except re.error as e:
+            raise ValueError(f"/{source}/: {e}")
+    def test(self, line, lower, level):
+        return self.regex.search(line) is not None
+    def bind(self, filename):
+        return self
+    def literals(self, classifier):
+        return None
+
+class _Level:
+    cost = 0
+    def __init__(self, level):
+        if level not in LEVELS:
+            raise ValueError(f"level:{level} (erlaubt: {', '.join(LEVELS)})")
+        self.level = level
+    def test(self, line, lower, level):
+        return level == self.level
+    def bind(self, filename):
+        return self
+    def literals(self, classifier):
+        # Ein Level kann nur vorliegen, wenn eines seiner Keywords in der Zeile steht
+        if self.level == "default":
+            return None
+        return {kw.lower() for kw, level in classifier.checks if level == self.level}
+
+class _File:
+    cost = 0
+    def __init__(self, pattern):
+        self.pattern = pattern.lower()
+    def bind(self, filename):
+        name = filename.lower()
+        hit  = fnmatch.fnmatchcase(name, self.pattern) or \
+            fnmatch.fnmatchcase(os.path.basename(name), self.pattern)
+        return _TRUE if hit else _FALSE
+
+class _Not:
+    cost = 2
+    def __init__(self, child):
+        self.child = child
+    def test(self, line, lower, level):
+        return not self.child.test(line, lower, level)
+    def bind(self, filename):
+        child = self.child.bind(filename)
+        if isinstance(child, _Const):
+            return _FALSE if child.value else _TRUE
+        return _Not(child)
+    def literals(self, classifier):
+        return None
+
+class _And:
+    cost = 2
+    def __init__(self, children):
+        self.children = sorted(children, key=lambda c: c.cost)  # Level vor Text vor Regex
+    def test(self, line, lower, level):
+        for child in self.children:
+            if not child.test(line, lower, level):
+                return False
+        return True
+    def bind(self, filename):
+        children = [c.bind(filename) for c in self.children]
+        if _FALSE in children:
+            return _FALSE
+        children = [c for c in children if c is not _TRUE]
+        return _And(children) if len(children) > 1 else (children[0] if children else _TRUE)
+    def literals(self, classifier):
+        # Jedes Kind ist notwendig – das mit den längsten Literalen filtert am schärfsten
+        best = None
+        for child in self.children:
+            lits = child.literals(classifier)
+            if lits is not None and (best is None or min(map(len, lits), default=99) > min(map(len, best), default=99)):
+                best = lits
+        return best
+
+class _Or:
+    cost = 2
+    def __init__(self, children):
+        self.children = sorted(children, key=lambda c: c.cost)
+    def test(self, line, lower, level):
+        for child in self.children:
+            if child.test(line, lower, level):
+                return True
+        return False
+    def bind(self, filename):
+        children = [c.bind(filename) for c in self.children]
+        if _TRUE in children:
+            return _TRUE
+        children = [c for c in children if c is not _FALSE]
+        return _Or(children) if len(children) > 1 else (children[0] if children else _FALSE)
+    def literals(self, classifier):
+        result = set()
+        for child in self.children:
+            lits = child.literals(classifier)
+            if lits is None:
+                return None
+            result |= lits
+        return result
+
+class _QueryParser:
+    """Rekursiver Abstieg: or := and ("OR" and)* ; and := unary (["AND"] unary)* ; unary := ("NOT"|-) unary | term"""
+    def __init__(self, text):
+        self.tokens = []
+        pos = 0
+        text = text.strip()
+        while pos < len(text):
+            m = _QUERY_TOKEN.match(text, pos)
+            pos = m.end()
+            if m["paren"]:
+                self.tokens.append((m["paren"], None))
+                continue
+            if m["neg"]:
+                self.tokens.append(("NOT", None))
+            if m["phrase"] is not None:
+                self.tokens.append(("term", _Text(re.sub(r"\\(.)", r"\1", m["phrase"]))))
+            elif m["regex"] is not None:
+                self.tokens.append(("term", _Regex(m["regex"].replace("\\/", "/"))))
+            elif m["word"] in ("AND", "OR", "NOT"):
+                self.tokens.append((m["word"], None))
+            else:
+                self.tokens.append(("term", self._word(m["word"])))
+        self.pos = 0
+
+    @staticmethod
+    def _word(word):
+        field, sep, value = word.partition(":")
+        if sep and value and field.lower() == "level":
+            return _Level(value.lower())
+        if sep and value and field.lower() == "file":
+            return _File(value)
+        return _Text(word)
+
+    def _peek(self):
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def parse(self):
+        if not self.tokens:
+            return _TRUE
+        node = self._or()
+        if self.pos < len(self.tokens):
+            raise ValueError("Unerwartete Klammer ')'")
+        return node
+
+    def _or(self):
+        children = [self._and()]
+        while self._peek() == "OR":
+            self.pos += 1
+            children.append(self._and())
+        return _Or(children) if len(children) > 1 else children[0]
+
+    def _and(self):
+        children = [self._unary()]
+        while self._peek() not in (None, ")", "OR"):
+            if self._peek() == "AND":
+                self.pos += 1
+            children.append(self._unary())
+        return _And(children) if len(children) > 1 else children[0]
+
+    def _unary(self):
+        kind = self._peek()
+        if kind == "NOT":
+            self.pos += 1
+            return _Not(self._unary())
+        if kind == "(":
+            self.pos += 1
+            node = self._or()
+            if self._peek() != ")":
+                raise ValueError("Fehlende Klammer ')'")
+            self.pos += 1
+            return node
+        if kind == "term":
+            self.pos += 1
+            return self.tokens[self.pos - 1][1]
+        raise ValueError(f"Unerwartet: {kind or 'Ende der Anfrage'}")
+
+def _fts_query(node):
+    """
+    Übersetzt den Text-Anteil in einen FTS5-Ausdruck, der mindestens alle Treffer
+    findet (Rest prüft der Matcher). None = mit dem Trigram-Index nicht eingrenzbar.
+    """
+    if isinstance(node, _Text):
+        return f"text : {_fts_phrase(node.text)}" if len(node.text) >= 3 else None
+    if isinstance(node, _And):
+        parts = [p for p in map(_fts_query, node.children) if p]
+        return "(" + " AND ".join(parts) + ")" if parts else None
+    if isinstance(node, _Or):
+        parts = [_fts_query(c) for c in node.children]
+        return None if None in parts else "(" + " OR ".join(parts) + ")"
+    return None
+
+def _highlights(node, negated=False):
+    """Positive Text- und Regex-Terme (für die Hervorhebung im Frontend)."""
+    if isinstance(node, (_And, _Or)):
+        return [t for c in node.children for t in _highlights(c, negated)]
+    if isinstance(node, _Not):
+        return _highlights(node.child, not negated)
+    if negated:
+        return []
+    if isinstance(node, _Text):
+        return [{"text": node.text}]
+    if isinstance(node, _Regex):
+        return [{"regex": node.regex.pattern}]
+    return []
+
+class LineMatcher:
+    """
+    An eine Datei gebundene Anfrage; wird von mehreren Scan-Threads gleichzeitig benutzt.
+    prefilter: ASCII-Literale (Bytes, klein), von denen jede Treffer-Zeile eines
+    enthält – oder None, wenn jede Zeile geprüft werden muss; specials: Zeichen, die
+    in Nicht-ASCII-Daten zusätzlich eines davon ergeben können (_CASE_TO_ASCII).
+    exact: die Anfrage ist nichts anderes als "eines dieser Literale", ein
+    Vorfilter-Treffer in ASCII genügt.
+    """
+    def __init__(self, root, classifier):
+        self.root       = root
+        self.classifier = classifier
+        self.never      = root is _FALSE
+        self.uses_level = _uses_level(root)
+        self.fts        = _fts_query(root)
+        lits = root.literals(classifier)
+        if lits is not None and all(lit.isascii() for lit in lits):
+            self.prefilter = sorted(lit.encode() for lit in lits)
+            self.specials  = _case_specials(lits)
+        else:
+            self.prefilter = self.specials = None
+        self.exact = self.prefilter is not None and (
+            isinstance(root, _Text) or
+            isinstance(root, _Or) and all(isinstance(c, _Text) for c in root.children))
 
-    builtin_profiles = [
-        ("Standard",
-         "General format – detects INFO/WARN/ERROR",
-         "LoVi", "1.1", "builtin",
-         "ERROR,CRITICAL,FATAL", "WARN,WARNING", "INFO", "DEBUG,TRACE",
-         "/logs/myapp/app.log",
-         "Compatible with: Most Python, Node.js, Java apps\nVersion hint: Universal – works with almost any structured log.\n\nStep 1 – Find your log path:\nMost apps write to /config/logs/ inside the container.\nCheck your app docs or run: docker exec CONTAINERNAME find /config -name '*.log'\n\nStep 2 – Add volume to the APP's docker-compose.yml:\n  volumes:\n    - /opt/docker/APPNAME/config:/config        # already exists\n    - /opt/docker/APPNAME/config/logs:/logs/APPNAME  # ADD THIS\n\nStep 3 – Add the same path to LOVI's docker-compose.yml:\n  services:\n    lovi:\n      volumes:\n        - /opt/logs:/logs                              # already exists\n        - /opt/docker/APPNAME/config/logs:/logs/APPNAME  # ADD THIS\n\nStep 4 – Recreate BOTH containers (not just restart!):\n  cd /opt/docker/YOURSTACK && docker-compose up -d APPNAME\n  cd /opt/docker/logviewer && docker-compose up -d lovi\n\nStep 5 – Assign in LoVi:\n  Settings -> Assign -> select log file -> Profile: Standard\n\n⚠ A recreate causes ~5s downtime. App config and data are NOT affected.",
-         "-v /opt/docker/APPNAME/config/logs:/logs/APPNAME"),
-    ]
+    def accepts(self, text, level):
+        """Trifft die Anfrage auf text mit bekanntem Level zu (Events: Level der Kopfzeile)?"""
+        return self.root.test(text, text.lower(), level)
 
-    for p in builtin_profiles:
-        c.execute('''INSERT INTO profiles
-            (name, description, author, version, source,
-             level_error, level_warn, level_info, level_debug,
-             log_path_hint, help_setup, help_mount)
-            VALUES (?,?,?,?,?,?,?,?,?,?,?,?)''', p)
+    def match(self, line):
+        """Level der Zeile bei Treffer, sonst None."""
+        if self.uses_level:
+            level = self.classifier.classify(line)
+            return level if self.root.test(line, line.lower(), level) else None
+        if self.root.test(line, line.lower(), None):
+            return self.classifier.classify(line)
+        return None
 
-    conn.commit()
-    conn.close()
+def _uses_level(node):
+    if isinstance(node, _Level):
+        return True
+    if isinstance(node, _Not):
+        return _uses_level(node.child)
+    return any(_uses_level(c) for c in getattr(node, "children", ()))
 
-def hash_password(pw):
-    return hashlib.sha256(pw.encode()).hexdigest()
+class Query:
+    """Geparste Anfrage; ValueError bei Syntaxfehlern (Klammern, Regex, Level)."""
+    def __init__(self, text):
+        self.text  = text
+        self.root  = _QueryParser(text).parse()
+        self.terms = _highlights(self.root)
 
-# ─── FLASK-LOGIN ─────────────────────────────────────────────
-login_manager = LoginManager()
-login_manager.init_app(app)
-login_manager.login_view = "login"
-login_manager.login_message = ""
-login_manager.login_message_category = "info"
+    def bind(self, filename, classifier=None):
+        return LineMatcher(self.root.bind(filename), classifier or get_classifier(filename))
 
-class User(UserMixin):
-    def __init__(self, id, username, is_admin, must_change_pw):
-        self.id             = id
-        self.username       = username
-        self.is_admin       = is_admin
-        self.must_change_pw = must_change_pw
+_queries      = OrderedDict()   # text → Query, LRU
+_queries_lock = threading.Lock()
 
-@login_manager.user_loader
-def load_user(user_id):
-    conn = get_db()
-    row = conn.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
-    conn.close()
-    if row:
-        return User(row["id"], row["username"], row["is_admin"], row["must_change_pw"])
-    return None
+def compile_query(text):
+    """Query aus dem Cache (bzw. neu geparst)."""
+    with _queries_lock:
+        query = _queries.get(text)
+        if query is not None:
+            _queries.move_to_end(text)
+            return query
+    query = Query(text)
+    with _queries_lock:
+        _queries[text] = query
+        while len(_queries) > QUERY_CACHE:
+            _queries.popitem(last=False)
+    return query
 
-# ─── LOG FUNKTIONEN ──────────────────────────────────────────
+def get_matcher(filename, search):
+    """Matcher für den Suchfilter einer Datei; None ohne Suchbegriff."""
+    return compile_query(search).bind(filename) if search else None
 
-def get_hidden_files():
-    conn = get_db()
-    return {row["filename"] for row in conn.execute("SELECT filename FROM log_hidden").fetchall()}
+# ─── SUCHINDEX ───────────────────────────────────────────────
+# Trigram-Volltextindex (SQLite FTS5) über die komplette Historie aller Logs,
+# in einer eigenen DB neben lovi.db. Ein Hintergrund-Thread indexiert nur die
+# seit dem letzten Lauf angehängten Bytes; Rotation/Truncate baut die Datei neu auf.
+SEARCH_DB_PATH      = os.path.join(os.path.dirname(DB_PATH), "lovi-search.db")
+SEARCH_CHUNK        = 4 * 1024 * 1024    # Bytes pro Insert-Batch
+SEARCH_FILE_BUDGET  = 64 * 1024 * 1024   # max. Bytes pro Datei und Durchlauf
+SEARCH_FILE_LIMIT   = 1000               # max. Treffer pro Datei und Seite ("more"-Cursor für ältere)
+SEARCH_MAX_MATCHES  = 5000               # max. Treffer pro Suche über alle Dateien
+SEARCH_LIVE_SCAN    = 8 * 1024 * 1024    # noch nicht indexierter Rest wird direkt gescannt
+SEARCH_RANGE_SCAN   = 64 * 1024 * 1024   # Zeitfenster bis zu dieser Größe direkt scannen
+SCAN_WINDOW         = 4 * 1024 * 1024    # Bytes pro mmap-Fenster beim direkten Scan
+SEARCH_SCHEMA       = 2                  # bei Änderung wird der Index neu aufgebaut
+SEARCH_DB_TIMEOUT   = 30                 # Indexer schreibt in großen Batches
 
-def get_log_files(include_hidden=False, include_rotating=False):
+_search_pool = DBPool(DB_POOL_SIZE, timeout=SEARCH_DB_TIMEOUT)
+
+def get_search_db():
     """
-    Gibt alle Log-Dateien zurück.
-    include_hidden=False  → ausgeblendete Dateien weglassen
-    include_rotating=False → rotierende Logs (z.B. radarr.debug.0.txt) weglassen
+    Verbindung zu lovi-search.db aus einem eigenen Pool (WAL wie lovi.db). Nicht an
+    den Request gebunden: Such-Streams lesen auch nach dem Teardown noch weiter.
     """
-    files = []
-    if os.path.exists(LOG_DIR):
-        for root, dirs, filenames in os.walk(LOG_DIR):
-            for f in filenames:
-                if f.endswith(".log") or f.endswith(".txt"):
-                    rel_path = os.path.relpath(os.path.join(root, f), LOG_DIR)
-                    files.append(rel_path)
+    return PooledConnection(_search_pool.acquire(SEARCH_DB_PATH), _search_pool)
 
-    if not include_rotating:
-        files = [f for f in files if not is_rotating_log(f)]
+def init_line_index_db():
+    """Tabellen des Zeilenindex (siehe ZEILENINDEX) – unabhängig von FTS5, daher pro Prozess beim Start."""
+    os.makedirs(os.path.dirname(SEARCH_DB_PATH), exist_ok=True)
+    conn = get_search_db()
+    try:
+        columns = {r[1] for r in conn.execute("PRAGMA table_info(line_index_files)")}
+        if columns and not {"pattern", "dev"} <= columns:
+            # Zeilenindex ohne Zeitstempel-Format oder Gerät: ist nur ein Cache, neu aufbauen
+            conn.execute("DROP TABLE line_index_files")
+            conn.execute("DROP TABLE IF EXISTS line_index")
+        conn.execute('''CREATE TABLE IF NOT EXISTS line_index_files (
+            dev        INTEGER NOT NULL,
+            inode      INTEGER NOT NULL,
+            head       INTEGER,
+            end_offset INTEGER,
+            total      INTEGER,
+            pattern    TEXT DEFAULT '',
+            PRIMARY KEY (dev, inode)
+        )''')
+        conn.execute('''CREATE TABLE IF NOT EXISTS line_index (
+            dev    INTEGER NOT NULL,
+            inode  INTEGER NOT NULL,
+            offset INTEGER NOT NULL,
+            line   INTEGER NOT NULL,
+            ts     REAL,
+            PRIMARY KEY (dev, inode, offset)
+        ) WITHOUT ROWID''')
+        conn.commit()
+    except sqlite3.OperationalError as e:
+        app.logger.warning(f"Line index not persisted: {e}")
+    finally:
+        conn.close()
 
-    if not include_hidden:
-        conn = get_db()
-        hidden = {row["filename"] for row in conn.execute("SELECT filename FROM log_hidden").fetchall()}
+def init_search_db():
+    """Legt den Suchindex an. False wenn SQLite kein FTS5/trigram kann."""
+    os.makedirs(os.path.dirname(SEARCH_DB_PATH), exist_ok=True)
+    conn = get_search_db()
+    try:
+        if conn.execute("PRAGMA user_version").fetchone()[0] != SEARCH_SCHEMA:
+            # Index ist nur ein Cache der Log-Dateien – bei Schemawechsel neu aufbauen
+            for table in ("search_lines", "search_files", "search_batches"):
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.execute(f"PRAGMA user_version = {SEARCH_SCHEMA}")
+        # file ist mitindexiert, damit Abfragen pro Datei nicht alle Treffer durchgehen
+        conn.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS search_lines USING fts5(
+            text, file, offset UNINDEXED, level UNINDEXED,
+            tokenize='trigram'
+        )''')
+        conn.execute('''CREATE TABLE IF NOT EXISTS search_files (
+            filename TEXT PRIMARY KEY,
+            inode    INTEGER,
+            offset   INTEGER DEFAULT 0
+        )''')
+        # rowid-Bereiche pro Datei, damit Löschen ohne Scan über den FTS-Index geht
+        conn.execute('''CREATE TABLE IF NOT EXISTS search_batches (
+            filename  TEXT NOT NULL,
+            first_row INTEGER NOT NULL,
+            last_row  INTEGER NOT NULL
+        )''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_search_batches ON search_batches(filename)")
+        conn.commit()
+        return True
+    except sqlite3.OperationalError as e:
+        app.logger.warning(f"Search index disabled: {e}")
+        return False
+    finally:
         conn.close()
-        files = [f for f in files if f not in hidden]
 
-    return sorted(files)
+def _drop_search_file(conn, filename):
+    for b in conn.execute("SELECT first_row, last_row FROM search_batches WHERE filename=?",
+                          (filename,)).fetchall():
+        conn.execute("DELETE FROM search_lines WHERE rowid BETWEEN ? AND ?",
+                     (b["first_row"], b["last_row"]))
+    conn.execute("DELETE FROM search_batches WHERE filename=?", (filename,))
+    conn.execute("DELETE FROM search_files WHERE filename=?", (filename,))
 
-def send_alert_mail(settings, alerts):
-    """Sendet eine zusammengefasste Alert-Mail. alerts = [(filename, error_count), ...]"""
-    import smtplib
-    from email.mime.text import MIMEText
-    from email.mime.multipart import MIMEMultipart
-    count = len(alerts)
-    subject = f"[LoVi Alert] {count} log file{'s' if count > 1 else ''} with new ERRORs"
-    body = "LoVi detected new ERROR entries:\n\n"
-    for filename, error_count in alerts:
-        body += f"  {filename:<40} -> {error_count} new ERRORs\n"
-    body += f"\nCheck interval: last {settings['threshold_mins']} minutes"
-    body += "\n\n-- LoVi Log Viewer"
-    msg = MIMEMultipart("alternative")
-    msg["Subject"] = subject
-    msg["From"]    = settings["smtp_from"]
-    msg["To"]      = settings["smtp_to"]
-    msg.attach(MIMEText(body, "plain"))
-    with smtplib.SMTP(settings["smtp_host"], settings["smtp_port"]) as server:
-        server.starttls()
-        server.login(settings["smtp_user"], settings["smtp_pass"])
-        server.sendmail(settings["smtp_from"], settings["smtp_to"], msg.as_string())
+def _index_search_file(conn, filename):
+    """Indexiert die neuen Bytes einer Datei. True wenn das Budget nicht gereicht hat."""
+    filepath = os.path.join(LOG_DIR, filename)
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        _drop_search_file(conn, filename)
+        conn.commit()
+        return False
+    cur = conn.execute("SELECT inode, offset FROM search_files WHERE filename=?",
+                       (filename,)).fetchone()
+    if cur is None or cur["inode"] != st.st_ino or st.st_size < cur["offset"]:
+        _drop_search_file(conn, filename)
+        conn.execute("INSERT INTO search_files (filename, inode, offset) VALUES (?,?,0)",
+                     (filename, st.st_ino))
+        conn.commit()
+        offset = 0
+    else:
+        offset = cur["offset"]
+    budget     = SEARCH_FILE_BUDGET
+    classifier = get_classifier(filename)
+    with open(filepath, "rb") as f:
+        while offset < st.st_size and budget > 0:
+            f.seek(offset)
+            chunk = f.read(min(SEARCH_CHUNK, st.st_size - offset))
+            end = chunk.rfind(b"\n")
+            if end >= 0:
+                advance = end + 1
+            elif len(chunk) < SEARCH_CHUNK:
+                break  # unvollständige letzte Zeile – beim nächsten Lauf
+            else:
+                end = advance = len(chunk)  # Riesenzeile ohne Umbruch
+            rows = []
+            pos  = offset
+            for raw in chunk[:end].split(b"\n"):
+                line = raw.decode("utf-8", errors="replace").rstrip()
+                if line:
+                    rows.append((line, filename, pos, classifier.classify(line)))
+                pos += len(raw) + 1
+            if rows:
+                first = conn.execute("SELECT COALESCE(MAX(rowid), 0) + 1 FROM search_lines").fetchone()[0]
+                conn.executemany(
+                    "INSERT INTO search_lines (rowid, text, file, offset, level) VALUES (?,?,?,?,?)",
+                    [(first + i,) + r for i, r in enumerate(rows)])
+                conn.execute("INSERT INTO search_batches (filename, first_row, last_row) VALUES (?,?,?)",
+                             (filename, first, first + len(rows) - 1))
+            offset += advance
+            budget -= advance
+            conn.execute("UPDATE search_files SET offset=? WHERE filename=?", (offset, filename))
+            conn.commit()
+    return offset < st.st_size and budget <= 0
 
-def check_notifications():
-    """Prüft nur assigned Log-Dateien – nur NEUE ERRORs seit letztem Alert – eine zusammengefasste Mail."""
-    import datetime
-    conn = get_db()
-    row = conn.execute("SELECT * FROM notification_settings WHERE id=1").fetchone()
-    if not row or not row["enabled"]:
-        conn.close()
+def search_index_worker():
+    """Background Thread – hält den Suchindex aktuell."""
+    if not init_search_db():
         return
-    settings = dict(row)
-    threshold_count = settings["threshold_count"]
-    threshold_mins  = settings["threshold_mins"]
-    cooldown_mins   = settings["cooldown_mins"]
-    assigned = {r["filename"] for r in conn.execute("SELECT filename FROM log_assignments").fetchall()}
-    files = [f for f in get_log_files() if f in assigned]
-    now = datetime.datetime.utcnow()
-    alerts = []  # Liste der betroffenen Dateien für zusammengefasste Mail
-
-    for filename in files:
-        # Letzten Alert für diese Datei holen
-        last = conn.execute(
-            "SELECT sent_at FROM notification_log WHERE filename=? ORDER BY sent_at DESC LIMIT 1",
-            (filename,)
-        ).fetchone()
-
-        # Cooldown prüfen
-        if last:
-            last_dt = datetime.datetime.fromisoformat(last["sent_at"])
-            diff = (now - last_dt).total_seconds() / 60
-            if diff < cooldown_mins:
-                continue
-
-        # Lookback: entweder seit letztem Alert oder threshold_mins – was kürzer ist
-        if last:
-            last_dt = datetime.datetime.fromisoformat(last["sent_at"])
-            lookback = max(last_dt, now - datetime.timedelta(minutes=threshold_mins))
+    while True:
+        more = False
+        try:
+            _cache_sync.poll()
+            conn  = get_search_db()
+            files = get_log_files()
+            known = {r["filename"] for r in conn.execute("SELECT filename FROM search_files").fetchall()}
+            for filename in known - set(files):
+                _drop_search_file(conn, filename)
+            conn.commit()
+            for filename in files:
+                more = _index_search_file(conn, filename) or more
+            conn.close()
+        except Exception as e:
+            app.logger.error(f"Search index error: {e}")
+        if more:
+            continue
+        index = get_log_index()
+        if index is not None:
+            index.wait_for_activity(timeout=30)
+            time.sleep(2)  # Schreib-Bursts bündeln
         else:
-            lookback = now - datetime.timedelta(minutes=threshold_mins)
+            time.sleep(30)
 
-        # Nur neue ERRORs seit lookback zählen
-        lines = read_log_file(filename, lines=500)
-        error_count = sum(1 for l in lines if l["level"] == "error")
+def _match_lines(data, pos, matcher):
+    matches = []
+    for raw in data.split(b"\n"):
+        line = raw.decode("utf-8", errors="replace").rstrip()
+        level = matcher.match(line) if line else None
+        if level:
+            matches.append({"text": line, "level": level, "offset": pos})
+        pos += len(raw) + 1
+    return matches
 
-        if error_count >= threshold_count:
-            alerts.append((filename, error_count))
+def _find_lines(data, pos, matcher):
+    """
+    Wie _match_lines, sucht aber mit dem Vorfilter des Matchers (ASCII-Literale)
+    direkt in den Bytes und dekodiert nur Zeilen, die eines davon enthalten.
+    """
+    literals = matcher.prefilter
+    if literals is None:
+        return _match_lines(data, pos, matcher)
+    if not literals:
+        return []
+    # ASCII-Literal in den Bytes ⇒ auch im dekodierten Text: bei exact entfällt die Prüfung
+    check = matcher.classifier.classify if matcher.exact else matcher.match
+    if matcher.specials and not data.isascii():
+        literals, check = literals + matcher.specials, matcher.match
+    search = _literal_search(data.lower(), literals)
+    matches = []
+    i = search(0)
+    while i >= 0:
+        start = data.rfind(b"\n", 0, i) + 1
+        end   = data.find(b"\n", i)
+        if end < 0:
+            end = len(data)
+        line  = data[start:end].decode("utf-8", errors="replace").rstrip()
+        level = check(line) if line else None
+        if level:
+            matches.append({"text": line, "level": level, "offset": pos + start})
+        i = search(end)
+    return matches
 
-    if alerts:
+def scan_file_range(filepath, matcher, start, end):
+    """
+    Scan-Worker: durchsucht den Byte-Bereich start..end. Klartext wird per mmap
+    in Fenstern von SCAN_WINDOW an Zeilengrenzen gelesen – der Speicher pro
+    Aufgabe bleibt klein, zwischen zwei Fenstern wird auf Abbruch geprüft.
+    """
+    if archive_ext(filepath):
+        with open_log(filepath) as f:
+            f.seek(start)
+            data = f.read(end - start)
+        return _find_lines(data, start, matcher)
+    with open(filepath, "rb") as f:
         try:
-            send_alert_mail(settings, alerts)
-            for filename, error_count in alerts:
-                conn.execute(
-                    "INSERT INTO notification_log (filename, error_count) VALUES (?,?)",
-                    (filename, error_count)
-                )
-            conn.commit()
-        except Exception as e:
-            app.logger.error(f"Mail error: {e}")
-    conn.close()
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return []  # leere Datei
+    with mm:
+        end, matches = min(end, len(mm)), []
+        while start < end:
+            check_scan()
+            stop = min(end, start + SCAN_WINDOW)
+            if stop < end:
+                cut = mm.rfind(b"\n", start, stop)
+                if cut < 0:
+                    cut = mm.find(b"\n", stop, end)  # Riesenzeile: bis zu ihrem Ende
+                stop = end if cut < 0 else cut
+            matches += _find_lines(mm[start:stop], start, matcher)
+            start = stop + 1
+    return matches
 
-def auto_assign_by_hint(conn):
-    """Weist Log-Dateien automatisch einem Profil zu wenn log_path_hint passt."""
-    profiles = conn.execute(
-        "SELECT id, name, log_path_hint FROM profiles WHERE log_path_hint != ''"
-    ).fetchall()
-    if not profiles:
-        return
-    log_files = get_log_files(include_hidden=True, include_rotating=False)
-    for filename in log_files:
-        # Bereits assigned?
-        existing = conn.execute(
-            "SELECT profile_id FROM log_assignments WHERE filename = ?", (filename,)
-        ).fetchone()
-        if existing:
-            continue
-        # Gegen alle Profile testen
-        for profile in profiles:
-            hint = profile["log_path_hint"].strip()
-            if not hint:
-                continue
-            # Matche am Ende des Pfades (basename oder Teilpfad)
-            hint_parts = hint.replace("\\", "/").split("/")
-            file_parts = filename.replace("\\", "/").split("/")
-            # Prüfe ob hint-Dateiname mit file-Dateiname übereinstimmt
-            hint_name = hint_parts[-1]
-            file_name = file_parts[-1]
-            # Auch Verzeichnis prüfen wenn vorhanden
-            hint_dir = hint_parts[-2] if len(hint_parts) >= 2 else ""
-            file_dir = file_parts[-2] if len(file_parts) >= 2 else ""
-            if hint_name == file_name and (not hint_dir or hint_dir in file_dir):
-                conn.execute("""INSERT INTO log_assignments (filename, profile_id, label)
-                    VALUES (?, ?, ?)
-                    ON CONFLICT(filename) DO NOTHING""",
-                    (filename, profile["id"], profile["name"]))
+def scan_archive_range(filepath, matcher, start, end, limit):
+    """
+    Scan-Worker (Threads, Archive): Treffer in Zeilen, die in start..end beginnen.
+    Liefert nur die letzten limit Treffer; vorgefiltert wird blockweise auf Bytes.
+    """
+    matches = deque(maxlen=limit)
+    with open_log(filepath) as f:
+        base  = max(0, start - 1)
+        f.seek(base)
+        carry = b""
+        first = start > 0   # angeschnittene erste Zeile gehört zum vorigen Segment
+        while True:
+            check_scan()
+            block = f.read(ARCHIVE_READ * 4)
+            data  = carry + block
+            if block:
+                cut = data.rfind(b"\n")
+                if cut < 0:
+                    carry = data
+                    continue
+                body, carry = data[:cut], data[cut + 1:]
+            else:
+                body, carry = data, b""
+            if first:
+                skip  = body.find(b"\n")
+                skip  = len(body) if skip < 0 else skip
+                body  = body[skip + 1:]
+                base += skip + 1
+                first = False
+            for match in _find_lines(body, base, matcher):
+                if match["offset"] >= end:
+                    break
+                matches.append(match)
+            base += len(body) + 1
+            if not block or base >= end:
                 break
+    return list(matches)
 
-def sample_log_stats():
-    """Stündlich ERRORs/WARNs pro Log-Datei samplen und in DB speichern."""
-    conn = get_db()
-    files = get_log_files()
-    for filename in files:
-        lines = read_log_file(filename, lines=500)
-        error_count = sum(1 for l in lines if l["level"] == "error")
-        warn_count  = sum(1 for l in lines if l["level"] == "warn")
-        conn.execute(
-            "INSERT INTO log_stats (filename, error_count, warn_count) VALUES (?,?,?)",
-            (filename, error_count, warn_count)
-        )
-        # Nur letzte 96 Einträge pro Datei behalten (96 x 15min = 24h)
-        conn.execute("""DELETE FROM log_stats WHERE filename=? AND id NOT IN (
-            SELECT id FROM log_stats WHERE filename=? ORDER BY id DESC LIMIT 96
-        )""", (filename, filename))
-    conn.commit()
-    conn.close()
+def _fts_phrase(text):
+    return '"' + text.replace('"', '""') + '"'
 
-def notification_worker():
-    """Background Thread – Notifications alle 5 Min, Stats stündlich."""
-    import time as time_mod
-    last_sample = 0
-    while True:
-        try:
-            check_notifications()
-            now = time_mod.time()
-            if now - last_sample >= 900:
-                sample_log_stats()
-                last_sample = now
-        except Exception as e:
-            app.logger.error(f"Notification worker error: {e}")
-        time_mod.sleep(300)
-
-def parse_log_level(line):
-    u = line.upper()
-    if "ERROR" in u or "CRITICAL" in u: return "error"
-    elif "WARN" in u or "WARNING" in u:  return "warn"
-    elif "INFO" in u:                    return "info"
-    elif "DEBUG" in u:                   return "debug"
-    return "default"
-
-def read_log_file(filename, search=None, lines=200):
-    filepath = os.path.join(LOG_DIR, filename)
-    result = []
-    if not os.path.exists(filepath):
-        return result
-    with open(filepath, "r", errors="replace") as f:
-        all_lines = f.readlines()
-    for line in all_lines[-lines:]:
-        line = line.rstrip()
-        if not line:
+def _search_index_page(conn, filename, matcher, limit, before_row=None, lo=None, hi=None):
+    """
+    Neueste Index-Treffer einer Datei (vor before_row, optional nur Zeilen im
+    Byte-Bereich lo..hi). Der FTS-Ausdruck grenzt ein, der Matcher prüft jede
+    Zeile nach (Level, NOT, Regex). Gibt (treffer, mehr_vorhanden) zurück.
+    """
+    sql  = "SELECT rowid, file, offset, level, text FROM search_lines WHERE search_lines MATCH ?"
+    args = [f"{matcher.fts} AND file : {_fts_phrase(filename)}"]
+    if before_row is not None:
+        sql += " AND rowid < ?"
+        args.append(before_row)
+    if lo is not None:
+        sql += " AND offset >= ? AND offset < ?"
+        args += [lo, hi]
+    sql += " ORDER BY rowid DESC"
+    matches = []
+    for r in conn.execute(sql, args):
+        if r["file"] != filename:
+            continue  # Trigram-Treffer auf einem ähnlichen Dateinamen
+        level = matcher.match(r["text"])
+        if not level:
             continue
-        if search and search.lower() not in line.lower():
+        if len(matches) == limit:
+            return matches, True
+        matches.append({"text": r["text"], "level": level, "offset": r["offset"], "row": r["rowid"]})
+    return matches, False
+
+def _page_result(filename, scanned, indexed, has_more, limit, window_start=None):
+    """Setzt eine Ergebnis-Seite zusammen: aufsteigend sortiert, neueste `limit` Treffer."""
+    lines = list(reversed(indexed)) + scanned
+    more  = None
+    if len(lines) > limit:
+        lines = lines[-limit:]
+        first = lines[0]
+        more  = f"i{first['row']}" if "row" in first else f"t{first['offset']}"
+    elif has_more and indexed:
+        more = f"i{indexed[-1]['row']}"
+    elif window_start:
+        more = f"t{window_start}"
+    for line in lines:
+        line.pop("row", None)
+    return {"file": filename, "count": len(lines), "lines": lines, "more": more}
+
+def scan_file_window(filepath, matcher, lines, end):
+    """Scan-Worker: durchsucht `lines` Zeilen vor Byte-Offset end."""
+    tail = tail_lines(filepath, lines, end=end)
+    if not tail:
+        return [], 0
+    # Zeilen liegen lückenlos hintereinander → als ein Block durch den Vorfilter
+    return _find_lines(b"\n".join(raw for _off, raw in tail), tail[0][0], matcher), tail[0][0]
+
+def _archive_jobs(filename, filepath, matcher, limit, start, end):
+    """Zerlegt start..end eines Archivs an seinen Einstiegspunkten in Segmente für parallele Scans."""
+    index  = get_archive(filepath)
+    bounds = [start] + [o for o in index.offsets[::ARCHIVE_SEGMENT_POINTS] if start < o < end] + [end]
+    return [((filename, i), scan_archive_range, (filepath, matcher, lo, hi, limit + 1))
+            for i, (lo, hi) in enumerate(zip(bounds, bounds[1:]))]
+
+def iter_search(q, files, limit=SEARCH_FILE_LIMIT, cursor=None, since=None, until=None):
+    """
+    Sucht q (Abfragesprache, siehe SUCHANFRAGEN) und liefert pro Datei eine
+    Ergebnis-Seite, sobald die Datei fertig ist – in der Reihenfolge von files.
+    Dateien, die ein file:-Term ausschließt, werden gar nicht erst geöffnet.
+    Indexierte Historie kommt aus dem FTS-Index, der noch nicht indexierte Rest am
+    Dateiende wird parallel direkt gescannt. Ohne Index (oder für noch nie indexierte
+    Dateien) werden Fenster von 1000 Zeilen vom Ende her durchsucht. Archive (.gz usw.)
+    werden komplett in parallelen Segmenten durchsucht.
+    cursor ("i<rowid>" = weiter im Index, "t<offset>" = weiter per Scan) gilt für
+    Folgeseiten einer einzelnen Datei.
+    since/until (Sekunden) beschränken auf ein Zeitfenster: der Zeilenindex liefert
+    dafür den Byte-Bereich, alles davor und danach wird nicht gelesen.
+    """
+    query    = compile_query(q)
+    matchers = {f: query.bind(f) for f in files}
+    files    = [f for f in files if not matchers[f].never]
+    try:
+        conn = get_search_db()
+        cursors = {r["filename"]: r["offset"] for r in
+                   conn.execute("SELECT filename, offset FROM search_files").fetchall()}
+    except sqlite3.OperationalError:
+        conn, cursors = None, {}
+
+    # Archiv-Indizes, die noch fehlen, parallel aufbauen (einmaliges Entpacken)
+    archives = [f for f in files if archive_ext(f)]
+    for _ in scan_files([(f, get_archive, (os.path.join(LOG_DIR, f),)) for f in archives], kind="io"):
+        pass
+    ranges = {}  # filename → (lo, hi) bei Zeitfenster
+    if since is not None or until is not None:
+        ranges = dict(scan_files([(f, byte_range, (f, since, until)) for f in files], kind="io"))
+
+    plans   = {}  # filename → "index" | "window" | "range" | "archive"
+    jobs    = []  # Klartext-Scans (Pool "cpu")
+    io_jobs = []  # Archive (Pool "io")
+    for filename in files:
+        filepath = os.path.join(LOG_DIR, filename)
+        try:
+            size = log_size(filepath)
+        except OSError:
             continue
-        result.append({"text": line, "level": parse_log_level(line)})
-    return result
+        start   = cursors.get(filename)
+        matcher = matchers[filename]
+        ranged  = filename in ranges
+        lo, hi = ranges.get(filename, (0, size))
+        if cursor and cursor.startswith("t"):
+            hi = min(hi, int(cursor[1:]))
+        if archive_ext(filename):
+            plans[filename] = "archive"
+            io_jobs += _archive_jobs(filename, filepath, matcher, limit, lo, hi)
+        elif cursor and cursor.startswith("i") and conn is not None:
+            plans[filename] = "index"
+        elif ranged and hi - lo <= SEARCH_RANGE_SCAN:
+            plans[filename] = "range"
+            jobs.append(((filename, 0), scan_file_range, (filepath, matcher, lo, hi)))
+        elif cursor and cursor.startswith("t") or conn is None or start is None \
+                or size - start > SEARCH_LIVE_SCAN or matcher.fts is None:
+            plans[filename] = "window"
+            jobs.append(((filename, 0), scan_file_window, (filepath, matcher, 1000, hi)))
+        else:
+            plans[filename] = "index"
+            if hi > max(start, lo):
+                jobs.append(((filename, 0), scan_file_range, (filepath, matcher, max(start, lo), hi)))
+
+    # Beide Generatoren liefern in Datei-Reihenfolge; pro Datei alle Teilergebnisse abholen
+    streams = [[scan_files(jobs, kind="cpu"), None], [scan_files(io_jobs, kind="io"), None]]
+    def take(stream, filename):
+        gen, peek = stream
+        if peek is None:
+            peek = next(gen, False)
+        out = []
+        while peek and peek[0][0] == filename:
+            out.append(peek[1])
+            peek = next(gen, False)
+        stream[1] = peek
+        return out
+
+    try:
+        for filename in files:
+            plan = plans.get(filename)
+            if plan is None:
+                continue
+            if plan == "archive":
+                matches = [m for part in take(streams[1], filename) for m in part]
+                yield _page_result(filename, matches, [], False, limit)
+                continue
+            parts  = take(streams[0], filename)
+            result = parts[0] if parts else None
+            lo, hi = ranges.get(filename, (None, None))
+            if plan == "range":
+                yield _page_result(filename, result or [], [], False, limit)
+                continue
+            if plan == "window":
+                matches, window_start = result if result else ([], 0)
+                if lo is not None:
+                    matches = [m for m in matches if m["offset"] >= lo]
+                    if window_start <= lo:
+                        window_start = None  # Anfang des Zeitfensters erreicht
+                yield _page_result(filename, matches, [], False, limit, window_start)
+                continue
+            before_row = int(cursor[1:]) if cursor and cursor.startswith("i") else None
+            try:
+                indexed, has_more = _search_index_page(conn, filename, matchers[filename], limit,
+                                                       before_row, lo, hi)
+            except sqlite3.OperationalError:
+                indexed, has_more = [], False
+            yield _page_result(filename, result or [], indexed, has_more, limit)
+    finally:
+        for gen, _peek in streams:
+            gen.close()
+        if conn is not None:
+            conn.close()
+
+# ─── KOMPRESSION ─────────────────────────────────────────────
+# API-Antworten werden je nach Accept-Encoding mit Brotli (falls das Paket
+# installiert ist) oder gzip komprimiert. Streams (NDJSON-Suche, SSE) werden
+# stückweise komprimiert und nach jedem Stück geflusht, damit jede Nachricht
+# sofort beim Browser ankommt.
+COMPRESS_MIN     = 1024   # Bytes; kleinere Antworten lohnen den Aufwand nicht
+COMPRESS_GZIP    = 5      # gzip-Level: kaum größer als 9, aber deutlich schneller
+COMPRESS_BROTLI  = 4      # Brotli-Qualität (0–11)
+COMPRESS_TYPES   = {"application/json"}
+COMPRESS_STREAMS = {"application/x-ndjson", "text/event-stream"}
+
+def _packer(encoding):
+    """(compress, flush, finish) für eine Kodierung; flush leert den Puffer, ohne den Stream zu beenden."""
+    if encoding == "br":
+        packer = brotli.Compressor(quality=COMPRESS_BROTLI)
+        return packer.process, packer.flush, packer.finish
+    packer = zlib.compressobj(COMPRESS_GZIP, zlib.DEFLATED, 31)  # 31 = gzip-Header
+    return packer.compress, lambda: packer.flush(zlib.Z_SYNC_FLUSH), packer.flush
+
+def _compressed_stream(chunks, encoding):
+    compress, flush, finish = _packer(encoding)
+    try:
+        for chunk in chunks:
+            data = compress(chunk.encode() if isinstance(chunk, str) else chunk) + flush()
+            if data:
+                yield data
+        yield finish()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()  # Client weg → auch den inneren Generator beenden
+
+@app.after_request
+def compress_response(response):
+    streamed = response.is_streamed
+    if (response.status_code != 200 or response.direct_passthrough
+            or response.mimetype not in (COMPRESS_STREAMS if streamed else COMPRESS_TYPES)
+            or "Content-Encoding" in response.headers):
+        return response
+    response.vary.add("Accept-Encoding")
+    accepted = request.accept_encodings
+    encoding = "br" if brotli is not None and accepted["br"] else "gzip" if accepted["gzip"] else None
+    if encoding is None:
+        return response
+    if streamed:
+        response.response = _compressed_stream(response.response, encoding)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN:
+            return response
+        compress, _flush, finish = _packer(encoding)
+        response.set_data(compress(data) + finish())
+    response.headers["Content-Encoding"] = encoding
+    return response
 
 # ─── ROUTEN: AUTH ────────────────────────────────────────────
 @app.route("/login", methods=["GET", "POST"])
@@ -429,6 +3442,7 @@ def change_password():
                          (hash_password(new_pw), current_user.id))
             conn.commit()
             conn.close()
+            invalidate_user(current_user.id)
             flash("Passwort geändert!", "info")
             return redirect(url_for("index"))
     return render_template("change_password.html", t=load_translation(get_user_lang()))
@@ -479,6 +3493,7 @@ def delete_user(user_id):
     conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
     conn.commit()
     conn.close()
+    invalidate_user(user_id)
     flash("User gelöscht!", "info")
     return redirect(url_for("users"))
 
@@ -488,15 +3503,15 @@ def delete_user(user_id):
 def settings():
     if not current_user.is_admin:
         return redirect(url_for("index"))
+    profiles = sorted(get_profiles().values(), key=lambda p: (p["source"], p["name"]))
     conn = get_db()
-    profiles = conn.execute("SELECT * FROM profiles ORDER BY source, name").fetchall()
     assignments = conn.execute("""
         SELECT la.*, p.name as profile_name
         FROM log_assignments la
         LEFT JOIN profiles p ON la.profile_id = p.id
     """).fetchall()
-    hidden_set = {row["filename"] for row in conn.execute("SELECT filename FROM log_hidden").fetchall()}
     conn.close()
+    hidden_set = get_hidden_files()
 
     # Alle Dateien inkl. rotating und hidden für die Verwaltung
     all_files = get_log_files(include_hidden=True, include_rotating=True)
@@ -541,6 +3556,7 @@ def hide_logfile():
         flash(f"'{filename}' visible again.", "info")
     conn.commit()
     conn.close()
+    invalidate_hidden()
     return redirect(url_for("settings") + "#logfiles")
 
 @app.route("/settings/logfiles/hide-rotating", methods=["POST"])
@@ -556,6 +3572,7 @@ def hide_rotating():
         conn.execute("INSERT OR IGNORE INTO log_hidden (filename) VALUES (?)", (f,))
     conn.commit()
     conn.close()
+    invalidate_hidden()
     flash(f"{len(rotating)} rotating log(s) hidden.", "info")
     return redirect(url_for("settings") + "#logfiles")
 
@@ -568,6 +3585,8 @@ def settings_logfiles_show_all():
     count = conn.execute("SELECT COUNT(*) FROM log_hidden").fetchone()[0]
     conn.execute("DELETE FROM log_hidden")
     conn.commit()
+    conn.close()
+    invalidate_hidden()
     flash(f"{count} file(s) made visible again.", "info")
     return redirect(url_for("settings") + "#logfiles")
 
@@ -585,21 +3604,34 @@ def add_profile():
     log_path_hint = request.form.get("log_path_hint", "")
     help_setup    = request.form.get("help_setup", "")
     help_mount    = request.form.get("help_mount", "")
+    timestamp_pattern = request.form.get("timestamp_pattern", "").strip()
+    continuation  = request.form.get("continuation", "")
     if not name:
         flash("Name ist erforderlich!", "error")
         return redirect(url_for("settings"))
+    try:
+        TimestampParser(timestamp_pattern)
+    except ValueError as e:
+        flash(f"Zeitstempel-Muster: {e}", "error")
+        return redirect(url_for("settings"))
+    try:
+        EventRules(continuation, AUTO_TIMESTAMPS)
+    except ValueError as e:
+        flash(f"Folgezeilen: {e}", "error")
+        return redirect(url_for("settings"))
     try:
         conn = get_db()
         conn.execute("""INSERT INTO profiles
             (name, description, author, version, source,
              level_error, level_warn, level_info, level_debug,
-             log_path_hint, help_setup, help_mount)
-            VALUES (?,?,?,?,?,?,?,?,?,?,?,?)""",
+             log_path_hint, help_setup, help_mount, timestamp_pattern, continuation)
+            VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
             (name, description, current_user.username, "1.0", "local",
              level_error, level_warn, level_info, level_debug,
-             log_path_hint, help_setup, help_mount))
+             log_path_hint, help_setup, help_mount, timestamp_pattern, continuation))
         conn.commit()
         conn.close()
+        invalidate_profiles()
         flash(f"Profil '{name}' angelegt!", "info")
     except Exception as e:
         flash(f"Fehler: {str(e)}", "error")
@@ -619,6 +3651,7 @@ def delete_profile(profile_id):
     conn.execute("DELETE FROM profiles WHERE id = ?", (profile_id,))
     conn.commit()
     conn.close()
+    invalidate_profiles()
     flash("Profil gelöscht!", "info")
     return redirect(url_for("settings"))
 
@@ -642,6 +3675,7 @@ def assign_profile():
         (filename, profile_id, label))
     conn.commit()
     conn.close()
+    invalidate_profiles()
     flash(f"Profil für '{filename}' gespeichert!", "info")
     return redirect(url_for("settings"))
 
@@ -656,15 +3690,14 @@ def change_language():
                  (lang, current_user.id))
     conn.commit()
     conn.close()
+    invalidate_user(current_user.id)
     return redirect(request.referrer or url_for("index"))
 
 @app.route("/api/profiles")
 @login_required
 def api_profiles():
-    conn = get_db()
-    rows = conn.execute("SELECT * FROM profiles ORDER BY name").fetchall()
-    conn.close()
-    return jsonify({"profiles": [dict(r) for r in rows]})
+    rows = sorted(get_profiles().values(), key=lambda p: p["name"])
+    return jsonify({"profiles": rows})
 
 @app.route("/api/profile/detect", methods=["POST"])
 @login_required
@@ -672,9 +3705,7 @@ def detect_profile():
     sample = request.json.get("sample", "")
     if not sample:
         return jsonify({"error": "Keine Beispielzeile"}), 400
-    conn = get_db()
-    profiles = conn.execute("SELECT * FROM profiles").fetchall()
-    conn.close()
+    profiles = get_profiles().values()
     sample_upper = sample.upper()
     best_match = None
     best_score = 0
@@ -720,82 +3751,116 @@ def github_install():
         conn.execute("""INSERT INTO profiles
             (name, description, author, version, source,
              level_error, level_warn, level_info, level_debug,
-             log_path_hint, help_setup, help_mount)
-            VALUES (?,?,?,?,?,?,?,?,?,?,?,?)
+             log_path_hint, help_setup, help_mount, timestamp_pattern, continuation)
+            VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)
             ON CONFLICT(name) DO UPDATE SET
             description=excluded.description, version=excluded.version,
             level_error=excluded.level_error, level_warn=excluded.level_warn,
             level_info=excluded.level_info,   level_debug=excluded.level_debug,
             log_path_hint=excluded.log_path_hint,
-            help_setup=excluded.help_setup,   help_mount=excluded.help_mount""",
+            help_setup=excluded.help_setup,   help_mount=excluded.help_mount,
+            timestamp_pattern=excluded.timestamp_pattern, continuation=excluded.continuation""",
             (p["name"], p.get("description",""), p.get("author","community"),
              p.get("version","1.0"), "github",
              p.get("level_error","ERROR"), p.get("level_warn","WARN"),
              p.get("level_info","INFO"),   p.get("level_debug","DEBUG"),
              p.get("log_path_hint",""),    p.get("help_setup",""),
-             p.get("help_mount","")))
-        auto_assign_by_hint(conn)
+             p.get("help_mount",""),       p.get("timestamp_pattern",""),
+             p.get("continuation","")))
         conn.commit()
         conn.close()
+        invalidate_profiles()
+        auto_assign_if_changed()  # erst nach commit + invalidate kennt get_profiles() das neue Profil
         return jsonify({"success": True, "name": p["name"], "help_mount": p.get("help_mount",""), "help_setup": p.get("help_setup","")})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route("/api/system")
-@login_required
-def api_system():
-    cpu = psutil.cpu_percent(interval=0.5)
+# ─── SYSTEM SAMPLER ──────────────────────────────────────────
+SYSTEM_INTERVAL = int(os.environ.get("LOVI_SYSTEM_INTERVAL", 10))  # Sekunden zwischen Messungen
+SYSTEM_HISTORY  = 90      # Messpunkte im Ringpuffer (90 x 10s = 15 Min)
+DISK_REFRESH    = 300     # Partitionsliste so oft neu einlesen
 
-    ram = psutil.virtual_memory()
-    ram_pct   = ram.percent
-    ram_used  = round(ram.used  / (1024**3), 1)
-    ram_total = round(ram.total / (1024**3), 1)
+# Docker sieht LVM-Volumes mehrfach gemountet – pro Device nur EINMAL zählen
+IGNORE_FS = {"tmpfs", "devtmpfs", "overlay", "squashfs", "vfat", "efivarfs", ""}
 
-    uptime_sec = int(time.time() - psutil.boot_time())
+def _format_uptime(uptime_sec):
     days    = uptime_sec // 86400
     hours   = (uptime_sec % 86400) // 3600
     minutes = (uptime_sec % 3600) // 60
-    uptime_str = f"{days}d {hours}h" if days > 0 else (f"{hours}h {minutes}m" if hours > 0 else f"{minutes}m")
+    return f"{days}d {hours}h" if days > 0 else (f"{hours}h {minutes}m" if hours > 0 else f"{minutes}m")
 
-    # Disks: pro einzigartigem Device nur EINMAL zählen
-    # (Docker sieht LVM-Volumes mehrfach gemountet – wir deduplizieren)
-    IGNORE_FS = {"tmpfs", "devtmpfs", "overlay", "squashfs", "vfat", "efivarfs", ""}
-    seen_devices = {}  # device → (used, total)
+class SystemSampler:
+    """Misst CPU, RAM, Uptime und Disks im Hintergrund; /api/system liest nur den letzten Stand."""
+    def __init__(self, history):
+        self.history    = deque(maxlen=history)
+        self.latest     = None
+        self.mounts     = []    # [(device, mountpoint)], dedupliziert
+        self.mounts_at  = 0
+        self.boot_time  = psutil.boot_time()
+        psutil.cpu_percent(interval=None)  # erster Aufruf liefert immer 0.0
 
-    for part in psutil.disk_partitions(all=False):
-        if part.fstype in IGNORE_FS:
-            continue
-        if part.device in seen_devices:
-            continue  # gleiche physische Disk – überspringen
-        try:
-            usage = psutil.disk_usage(part.mountpoint)
-            seen_devices[part.device] = {
+    def _refresh_mounts(self, now):
+        seen = {}
+        for part in psutil.disk_partitions(all=False):
+            if part.fstype in IGNORE_FS or part.device in seen:
+                continue
+            seen[part.device] = part.mountpoint
+        self.mounts, self.mounts_at = list(seen.items()), now
+
+    def sample(self):
+        now = time.time()
+        if now - self.mounts_at >= DISK_REFRESH:
+            self._refresh_mounts(now)
+        disks = []
+        for _device, mount in self.mounts:
+            try:
+                usage = psutil.disk_usage(mount)
+            except (PermissionError, OSError):
+                continue
+            disks.append({
+                "mount":    mount,
                 "pct":      usage.percent,
                 "used_gb":  round(usage.used  / (1024**3), 1),
                 "total_gb": round(usage.total / (1024**3), 1),
-            }
-        except (PermissionError, OSError):
-            continue
+            })
+        ram = psutil.virtual_memory()
+        snap = {
+            "ts":        int(now),
+            "cpu":       psutil.cpu_percent(interval=None),  # Mittel seit der letzten Messung
+            "ram_pct":   ram.percent,
+            "ram_used":  round(ram.used  / (1024**3), 1),
+            "ram_total": round(ram.total / (1024**3), 1),
+            "uptime":    _format_uptime(int(now - self.boot_time)),
+            "disks":     disks,
+        }
+        self.history.append({"ts": snap["ts"], "cpu": snap["cpu"], "ram_pct": snap["ram_pct"]})
+        self.latest = snap
+        return snap
 
-    disks = list(seen_devices.values())
+    def run(self):
+        while True:
+            try:
+                self.sample()
+            except Exception as e:
+                app.logger.error(f"System sampler error: {e}")
+            time.sleep(SYSTEM_INTERVAL)
 
-    return jsonify({
-        "cpu":       cpu,
-        "ram_pct":   ram_pct,
-        "ram_used":  ram_used,
-        "ram_total": ram_total,
-        "uptime":    uptime_str,
-        "disks":     disks
-    })
+_system_sampler = SystemSampler(SYSTEM_HISTORY)
+
+@app.route("/api/system")
+@login_required
+def api_system():
+    """Letzter Messwert des Samplers; ?history=1 hängt die Verlaufspunkte an."""
+    snap = _system_sampler.latest or _system_sampler.sample()
+    if request.args.get("history"):
+        snap = dict(snap, history=list(_system_sampler.history))
+    return jsonify(snap)
 
 # ─── ROUTEN: MAIN ────────────────────────────────────────────
 @app.route("/")
 @login_required
 def index():
-    conn = get_db()
-    auto_assign_by_hint(conn)
-    conn.commit()
-    conn.close()
+    auto_assign_if_changed()
     files = get_log_files()
     return render_template("index.html",
                        log_files=files,
@@ -807,49 +3872,329 @@ def index():
 def api_logs():
     filename = request.args.get("file", "")
     search   = request.args.get("search", "")
-    lines    = int(request.args.get("lines", 200))
+    lines    = int(request.args.get("limit", request.args.get("lines", 200)))
+    before   = request.args.get("before") or None
+    offset   = request.args.get("offset", type=int)
+    source   = request.args.get("source") or None
+    if not filename:
+        return jsonify({"error": "Keine Datei angegeben"}), 400
+    if ".." in filename or (source and ".." in source):
+        return jsonify({"error": "Ungültiger Dateiname"}), 400
+    try:
+        compile_query(search)
+    except ValueError as e:
+        return jsonify({"error": f"Ungültige Suche: {e}"}), 400
+    # Zeitangaben wie "2026-10-17 03:14" (Wanduhrzeit der Logs)
+    times = {}
+    for key in ("at", "since", "until"):
+        value = request.args.get(key)
+        if value:
+            times[key] = parse_timestamp(value)
+            if times[key] is None:
+                return jsonify({"error": f"Ungültige Zeitangabe: {key}"}), 400
+    forward = offset is not None or "at" in times  # Vorwärts-Seite ab Zeilennummer oder ab Zeitpunkt
+    try:
+        if forward:
+            result = read_log_page(filename, search=search, limit=lines, offset=offset or 0,
+                                   source=source, at=times.get("at"), until=times.get("until"))
+        else:
+            data, cursor = read_log_file(filename, search=search, lines=lines, before=before,
+                                         since=times.get("since"), until=times.get("until"))
+    except LineIndexPending as e:
+        # Großer Index wird noch im Hintergrund gebaut – der Client versucht es gleich wieder
+        return jsonify({"error": f"Index wird aufgebaut: {e}", "indexing": True, "retry": LINE_INDEX_RETRY}), \
+            503, {"Retry-After": str(LINE_INDEX_RETRY)}
+    if not forward:
+        if data is None:
+            # Generation inzwischen gelöscht oder neu geschrieben (z.B. beim Komprimieren)
+            return jsonify({"error": "Cursor abgelaufen", "lines": [], "before": None}), 410
+        result = {"lines": data, "file": filename, "before": cursor}
+    if request.args.get("format") == "compact":
+        result.update(compact_lines(result.pop("lines")))
+    return jsonify(result)
+
+LEVEL_CODES = {level: i for i, level in enumerate(LEVELS)}
+
+def compact_lines(lines):
+    """
+    Zeilen als parallele Spalten statt als Objekte (?format=compact) – Schlüssel
+    und Level-Namen stehen nicht mehr in jeder Zeile. level und file sind Indizes
+    in "levels" bzw. "files"; line und skipped gibt es nur, wenn eine Zeile sie hat.
+    """
+    files, codes = [], {}
+    text, level, file, offset, line, skipped = [], [], [], [], [], []
+    for l in lines:
+        name = l.get("file")
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(files)
+            files.append(name)
+        text.append(l["text"])
+        level.append(LEVEL_CODES[l["level"]])
+        file.append(code)
+        offset.append(l.get("offset"))
+        line.append(l.get("line"))
+        skipped.append(l.get("skipped", 0))
+    columns = {"text": text, "level": level, "file": file, "offset": offset}
+    if any(n is not None for n in line):
+        columns["line"] = line
+    if any(skipped):
+        columns["skipped"] = skipped
+    return {"levels": LEVELS, "files": files, "columns": columns}
+
+SSE_HEARTBEAT   = 15               # Sekunden zwischen Keep-Alive-Kommentaren
+SSE_MAX_CHUNK   = 1024 * 1024      # max. Bytes pro Delta-Event
+SSE_MAX_RESUME  = 8 * 1024 * 1024  # größere Lücken → neu vom Ende lesen
+# Jeder offene Stream belegt einen Server-Thread (gunicorn gthread: LOVI_THREADS pro Worker).
+# Darüber hinaus gibt es 503 und der Client pollt /api/logs, damit Dashboard und Login frei bleiben.
+SSE_MAX_STREAMS = int(os.environ.get("LOVI_MAX_STREAMS", max(1, int(os.environ.get("LOVI_THREADS", 16)) // 2)))
+SSE_BUSY_RETRY  = 30               # Sekunden, bis ein abgewiesener Client es erneut versuchen soll
+
+_sse_slots = threading.BoundedSemaphore(SSE_MAX_STREAMS)
+
+def _sse(data, event=None, event_id=None):
+    msg = ""
+    if event_id is not None:
+        msg += f"id: {event_id}\n"
+    if event:
+        msg += f"event: {event}\n"
+    return msg + f"data: {json.dumps(data)}\n\n"
+
+def _parse_event_id(value):
+    """Last-Event-ID und Ketten-Cursor haben die Form '<inode>:<offset>'."""
+    try:
+        inode, offset = value.split(":", 1)
+        return int(inode), int(offset)
+    except (AttributeError, ValueError):
+        return None, None
+
+@app.route("/api/logs/stream")
+@login_required
+def api_logs_stream():
+    """Live-Tail per Server-Sent Events: erst die letzten N Zeilen, danach nur neue Zeilen."""
+    filename = request.args.get("file", "")
+    search   = request.args.get("search", "")
     if not filename:
         return jsonify({"error": "Keine Datei angegeben"}), 400
+    try:
+        lines = max(0, min(int(request.args.get("lines", 200)), CHAIN_PAGE_MAX))  # wie /api/logs
+    except ValueError:
+        return jsonify({"error": "Ungültige Zeilenanzahl"}), 400
     if ".." in filename:
         return jsonify({"error": "Ungültiger Dateiname"}), 400
-    data = read_log_file(filename, search=search, lines=lines)
-    return jsonify({"lines": data, "file": filename})
+    filepath = os.path.join(LOG_DIR, filename)
+    resume_inode, resume_offset = _parse_event_id(
+        request.headers.get("Last-Event-ID") or request.args.get("last_id"))
+    classifier = get_classifier(filename)
+    rules      = get_event_rules(filename)
+    try:
+        matcher = get_matcher(filename, search)
+    except ValueError as e:
+        return jsonify({"error": f"Ungültige Suche: {e}"}), 400
+    if not _sse_slots.acquire(blocking=False):
+        return Response(f"retry: {SSE_BUSY_RETRY * 1000}\n\n", status=503, mimetype="text/event-stream",
+                        headers={"Retry-After": str(SSE_BUSY_RETRY), "Cache-Control": "no-cache"})
+
+    def keep(events):
+        """Suchfilter auf fertige Events; der interne Offset geht nicht an den Client."""
+        out = []
+        for event in events:
+            event.pop("offset", None)
+            if not matcher or matcher.accepts(event["text"], event["level"]):
+                out.append(event)
+        return out
+
+    def feed(asm, raws, pos):
+        """Zeilen ab Byte pos in den Assembler; liefert die dadurch abgeschlossenen Events."""
+        done = []
+        for raw in raws:
+            line = raw.decode("utf-8", errors="replace").rstrip()
+            if line:
+                event = asm.push(line, offset=pos)
+                if event:
+                    done.append(event)
+            pos += len(raw) + 1
+        return keep(done)
+
+    def drain(asm):
+        event = asm.flush()
+        return keep([event]) if event else []
+
+    def initial(st, asm):
+        """
+        Letzte N vollständige Zeilen (nach vorne bis zur Kopfzeile des ersten Events
+        erweitert) als Events; Offset zeigt hinter die letzte Zeile, der Cursor (für
+        /api/logs?before=) auf den Anfang der ersten.
+        """
+        tail = tail_lines(filepath, lines + 1, end=st.st_size)
+        offset = st.st_size
+        if tail and st.st_size > 0:
+            with open(filepath, "rb") as f:
+                f.seek(st.st_size - 1)
+                if f.read(1) != b"\n":
+                    offset = tail.pop()[0]
+        tail = tail[-lines:]
+        if tail and tail[0][0] > 0 and rules.may_continue(tail[0][1].decode("utf-8", errors="replace").rstrip()):
+            more  = tail_lines(filepath, EVENT_MAX_LINES, end=tail[0][0])
+            start = _event_start([raw for _o, raw in more], rules)
+            if start is not None:
+                tail[:0] = more[start:]
+        before = f"{st.st_ino}:{tail[0][0] if tail else offset}"
+        data = []
+        for pos, raw in tail:
+            data += feed(asm, [raw], pos)
+        return offset, data + drain(asm), before
+
+    def generate():
+        if archive_ext(filepath):
+            # Archive ändern sich nicht – einmal senden, danach nur Keep-Alive
+            try:
+                st = os.stat(filepath)
+            except OSError:
+                st = None
+            tail = tail_lines(filepath, lines) if st else []
+            before = f"{st.st_ino}:{tail[0][0] if tail else 0}" if st else None
+            rows   = [(raw.decode("utf-8", errors="replace").rstrip(), {}) for _o, raw in tail]
+            events = keep(assemble_events([row for row in rows if row[0]], rules, classifier))
+            yield _sse({"lines": events, "file": filename, "before": before}, event="init")
+            while True:
+                time.sleep(SSE_HEARTBEAT)
+                yield ": ping\n\n"
+        index  = get_log_index()
+        inode  = offset = None
+        asm    = EventAssembler(rules, classifier)
+        if resume_inode is not None:
+            try:
+                st = os.stat(filepath)
+                if st.st_ino == resume_inode and resume_offset <= st.st_size \
+                        and st.st_size - resume_offset <= SSE_MAX_RESUME:
+                    inode, offset = resume_inode, resume_offset
+            except OSError:
+                pass
+        yield "retry: 3000\n\n"
+        last_beat = last_data = time.time()
+        # Event-ID zeigt bei zurückgehaltenem Event auf dessen Anfang → Resume liest es erneut
+        event_id = lambda: f"{inode}:{asm.event['offset'] if asm.event else offset}"
+        while True:
+            try:
+                st = os.stat(filepath)
+            except OSError:
+                st = None
+            if st is not None and (offset is None or st.st_ino != inode or st.st_size < offset):
+                # Erster Durchlauf oder Rotation/Truncate → Fenster neu senden
+                event = "init" if offset is None else "reset"
+                inode = st.st_ino
+                asm   = EventAssembler(rules, classifier)
+                offset, data, before = initial(st, asm)
+                yield _sse({"lines": data, "file": filename, "before": before}, event=event,
+                           event_id=event_id())
+                last_beat = time.time()
+            elif st is not None and st.st_size > offset:
+                with open(filepath, "rb") as f:
+                    f.seek(offset)
+                    chunk = f.read(min(st.st_size - offset, SSE_MAX_CHUNK))
+                end = chunk.rfind(b"\n")
+                if end >= 0:
+                    data = feed(asm, chunk[:end].split(b"\n"), offset)
+                    offset += end + 1
+                    if not rules.enabled:
+                        data += drain(asm)
+                    if data:
+                        yield _sse({"lines": data}, event_id=event_id())
+                        last_beat = time.time()
+                    last_data = time.time()
+                    continue  # evtl. liegt noch mehr an
+                if len(chunk) == SSE_MAX_CHUNK:
+                    offset += len(chunk)  # Zeile ohne Umbruch > SSE_MAX_CHUNK überspringen
+                    continue
+            if asm.event is not None and time.time() - last_data >= EVENT_HOLD:
+                # Keine Folgezeilen mehr gekommen → offenes Event ausgeben
+                data = drain(asm)
+                if data:
+                    yield _sse({"lines": data}, event_id=event_id())
+                    last_beat = time.time()
+            if time.time() - last_beat >= SSE_HEARTBEAT:
+                yield ": ping\n\n"
+                last_beat = time.time()
+            wait = EVENT_HOLD if asm.event is not None else min(SSE_HEARTBEAT, LOG_POLL_INTERVAL)
+            if index is not None:
+                index.wait_for_activity(timeout=wait)
+            else:
+                time.sleep(min(wait, 1))
+
+    response = Response(generate(), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    response.call_on_close(_sse_slots.release)  # auch wenn generate() nie gestartet wurde
+    return response
+
+_summary_seen      = {}    # filename → ((state, key, stats), Kachel als JSON, Version der letzten Änderung, MD5)
+_summary_seen_lock = threading.Lock()
+
+def _summary_tile(filename, state, stats):
+    """Eine Dashboard-Kachel als JSON-Text."""
+    lines = state.recent()
+    last3 = lines[-3:] if len(lines) >= 3 else lines
+    last10 = lines[-10:]
+    health = "ok"
+    for line in last10:
+        if line["level"] == "error":
+            health = "error"; break
+        elif line["level"] == "warn":
+            health = "warn"
+    size = state.size
+    size_str = f"{size/1024/1024:.1f} MB" if size > 1024*1024 else f"{size/1024:.1f} KB"
+    return json.dumps({"file": filename, "lines": last3,
+                       "health": health, "size": size_str, "total": len(lines),
+                       "stats": stats}, separators=(",", ":"))
 
 @app.route("/api/summary")
 @login_required
 def api_summary():
-    conn = get_db()
-    assigned = {row["filename"] for row in conn.execute("SELECT filename FROM log_assignments").fetchall()}
+    """
+    Dashboard-Kacheln. version ist die Serverzeit (ms) der Abfrage; mit
+    ?since=<version> enthält files nur Kacheln, die sich seitdem geändert haben,
+    names listet immer alle Dateien (in Reihenfolge). Ein Worker, der eine Kachel
+    zum ersten Mal sieht, zählt sie als geändert – since aus einem anderen Prozess
+    liefert also schlimmstenfalls zu viel. Der ETag deckt den ganzen Stand ab:
+    ein ruhendes Dashboard bekommt 304.
+    """
+    version = int(time.time() * 1000)
+    since   = request.args.get("since", type=int)
+    auto_assign_if_changed()  # neue Dateien ohne Seiten-Reload zuweisen
+    assigned = get_file_profiles()
     files  = get_log_files()
     files  = [f for f in files if f in assigned]
-    result = []
-    for filename in files:
-        lines = read_log_file(filename, lines=50)
-        last3 = lines[-3:] if len(lines) >= 3 else lines
-        last10 = lines[-10:]
-        health = "ok"
-        for line in last10:
-            if line["level"] == "error":
-                health = "error"; break
-            elif line["level"] == "warn":
-                health = "warn"
-        filepath = os.path.join(LOG_DIR, filename)
-        try:
-            size = os.path.getsize(filepath)
-            size_str = f"{size/1024/1024:.1f} MB" if size > 1024*1024 else f"{size/1024:.1f} KB"
-        except:
-            size_str = "?"
-        # 24h Stats laden
-        stats_rows = conn.execute(
-            "SELECT error_count, warn_count FROM log_stats WHERE filename=? ORDER BY id DESC LIMIT 96",
-            (filename,)
-        ).fetchall()
-        stats = [{"e": r["error_count"], "w": r["warn_count"]} for r in reversed(stats_rows)]
-        result.append({"file": filename, "lines": last3,
-                        "health": health, "size": size_str, "total": len(lines),
-                        "stats": stats})
-    conn.close()
-    return jsonify({"files": result})
+
+    sparklines = get_sparklines()
+    states = scan_files([(f, get_file_state, (f,)) for f in files], kind="io")
+    names, tiles, digest = [], [], hashlib.md5()
+    with _summary_seen_lock:
+        for filename, state in states:
+            if state is None:
+                continue
+            stats  = sparklines.get(filename, EMPTY_SPARKLINE)
+            source = (state, state.key, stats)
+            seen   = _summary_seen.get(filename)
+            if seen is None or seen[0][0] is not state or seen[0][1] != source[1] or seen[0][2] is not stats:
+                # Datei gewachsen oder Sparklines neu geladen – Kachel neu bauen
+                tile = _summary_tile(filename, state, stats)
+                if seen is None or seen[1] != tile:
+                    seen = (source, tile, version, hashlib.md5(tile.encode()).digest())
+                else:
+                    seen = (source,) + seen[1:]
+                _summary_seen[filename] = seen
+            names.append(filename)
+            digest.update(seen[3])
+            if since is None or seen[2] > since:
+                tiles.append(seen[1])
+        for filename in set(_summary_seen) - set(names):
+            del _summary_seen[filename]
+    etag = digest.hexdigest()
+    headers = {"ETag": f'W/"{etag}"', "Cache-Control": "no-cache"}  # schwach: gilt auch komprimiert
+    if request.if_none_match.contains_weak(etag):
+        return Response(status=304, headers=headers)
+    body = '{"version":%d,"names":%s,"files":[%s]}' % (version, json.dumps(names), ",".join(tiles))
+    return Response(body, mimetype="application/json", headers=headers)
 
 # Dieser Block muss in app.py eingefügt werden
 # NACH dem bestehenden /api/summary Route
@@ -860,9 +4205,7 @@ def api_files_meta():
     """Alle Dateien mit hidden/rotating/assigned Status für den Explorer"""
     all_files  = get_log_files(include_hidden=True, include_rotating=True)
     hidden_set = get_hidden_files()
-    conn = get_db()
-    assigned_set = {row["filename"] for row in conn.execute("SELECT filename FROM log_assignments").fetchall()}
-    conn.close()
+    assigned_set = get_file_profiles()
     result = []
     for f in sorted(all_files):
         result.append({
@@ -895,6 +4238,7 @@ def api_files_assign_toggle():
         assigned = True
     conn.commit()
     conn.close()
+    invalidate_profiles()
     return jsonify({"success": True, "assigned": assigned})
 
 @app.route("/api/files/toggle", methods=["POST"])
@@ -914,6 +4258,8 @@ def api_files_toggle():
     else:
         db.execute("DELETE FROM log_hidden WHERE filename = ?", (filename,))
     db.commit()
+    db.close()
+    invalidate_hidden()
     return jsonify({"success": True, "filename": filename, "hidden": action == "hide"})
 
 # ── In app.py einfügen: NACH api_files_toggle Route ──
@@ -948,6 +4294,8 @@ def api_files_delete():
         db = get_db()
         db.execute("DELETE FROM log_hidden WHERE filename = ?", (filename,))
         db.commit()
+        db.close()
+        invalidate_hidden()
         return jsonify({"success": True, "filename": filename})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
@@ -955,17 +4303,75 @@ def api_files_delete():
 @app.route("/api/search")
 @login_required
 def api_search():
+    """
+    Globale Suche (Abfragesprache siehe SUCHANFRAGEN). ?stream=1 oder Accept:
+    application/x-ndjson liefert eine Zeile JSON pro Datei, sobald sie durchsucht
+    ist, und zum Schluss {"done": true, ...} mit den Termen zum Hervorheben.
+    Folgeseiten einer Datei: ?file=<datei>&cursor=<more-Wert aus dem Ergebnis>.
+    """
     q = request.args.get("q", "").strip()
     if len(q) < 4:
         return jsonify({"error": "min4", "results": []})
-    files   = get_log_files()
-    results = []
-    for filename in files:
-        lines   = read_log_file(filename, lines=1000)
-        matches = [l for l in lines if q.lower() in l["text"].lower()]
-        if matches:
-            results.append({"file": filename, "count": len(matches), "lines": matches})
-    return jsonify({"q": q, "results": results})
+    try:
+        query = compile_query(q)
+    except ValueError as e:
+        return jsonify({"error": "query", "message": str(e), "results": []}), 400
+    limit  = min(int(request.args.get("limit", SEARCH_FILE_LIMIT)), SEARCH_FILE_LIMIT)
+    cursor = request.args.get("cursor") or None
+    # Zeitfenster ?since=2026-10-17 03:00&until=… (Wanduhrzeit der Logs)
+    times  = {}
+    for key in ("since", "until"):
+        value = request.args.get(key)
+        if value:
+            times[key] = parse_timestamp(value)
+            if times[key] is None:
+                return jsonify({"error": f"Ungültige Zeitangabe: {key}", "results": []}), 400
+    single = request.args.get("file", "")
+    # ?rotated=1: auch rotierte und komprimierte Generationen durchsuchen
+    files  = get_log_files(include_rotating=request.args.get("rotated") == "1" or bool(single))
+    if single:
+        files = [f for f in files if f == single]
+    elif cursor:
+        return jsonify({"error": "cursor requires file", "results": []}), 400
+
+    def results():
+        total = 0
+        pages = iter_search(q, files, limit, cursor, times.get("since"), times.get("until"))
+        try:
+            for page in pages:
+                if not page["lines"]:
+                    continue
+                room = SEARCH_MAX_MATCHES - total
+                if page["count"] > room:
+                    page["lines"] = page["lines"][-room:]
+                    page["count"] = room
+                    page["more"]  = None
+                total += page["count"]
+                yield page
+                if total >= SEARCH_MAX_MATCHES:
+                    break
+        finally:
+            pages.close()  # Client weg → offene Scans abbrechen
+        yield {"done": True, "total": total, "truncated": total >= SEARCH_MAX_MATCHES,
+               "terms": query.terms}
+
+    stream = request.args.get("stream") == "1" or \
+        request.accept_mimetypes.best == "application/x-ndjson"
+    if stream:
+        def generate():
+            items = results()
+            try:
+                for item in items:
+                    yield json.dumps(item) + "\n"
+            finally:
+                items.close()
+        return Response(generate(), mimetype="application/x-ndjson",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    pages = list(results())
+    done  = pages.pop()
+    return jsonify({"q": q, "results": pages, "total": done["total"], "truncated": done["truncated"],
+                    "terms": done["terms"]})
 
 @app.route("/api/files")
 @login_required
@@ -980,6 +4386,10 @@ def api_backup_export():
         return jsonify({"error": "Kein Admin"}), 403
     import zipfile, io, datetime
     db_path = "/data/lovi.db"
+    # WAL-Inhalt in die Hauptdatei schreiben, sonst fehlen jüngste Änderungen im Backup
+    conn = get_db()
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M")
     zip_buffer = io.BytesIO()
     with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
@@ -1006,12 +4416,27 @@ def api_backup_import():
         with zipfile.ZipFile(zip_buffer, "r") as zf:
             if "lovi.db" not in zf.namelist():
                 return jsonify({"error": "Ungültiges Backup – lovi.db nicht gefunden"}), 400
+            # Offene Verbindungen verwerfen und WAL zurückschreiben, bevor die Datei ersetzt wird
+            conn = get_db()
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.close()
+            _db_pool.reset()
             # Backup der aktuellen DB
             shutil.copy("/data/lovi.db", "/data/lovi.db.bak")
             # Neue DB einspielen
             with zf.open("lovi.db") as src:
                 with open("/data/lovi.db", "wb") as dst:
                     dst.write(src.read())
+            for suffix in ("-wal", "-shm"):
+                if os.path.exists("/data/lovi.db" + suffix):
+                    os.remove("/data/lovi.db" + suffix)
+            invalidate_profiles()
+            invalidate_hidden()
+            invalidate_user()
+            _alert_engine.reset()
+            invalidate_sparklines()
+            _cache_sync.bump("db")      # andere Worker: Pool verwerfen
+            _cache_sync.bump("alerts")  # Leader: Cursor neu aus der DB
         return jsonify({"success": True})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1054,6 +4479,7 @@ def api_notifications_save():
          int(d.get("cooldown_mins",30))))
     conn.commit()
     conn.close()
+    notifications_changed()
     return jsonify({"success": True})
 
 @app.route("/api/notifications/test", methods=["POST"])
@@ -1072,10 +4498,109 @@ def api_notifications_test():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-import threading
-_notif_thread = threading.Thread(target=notification_worker, daemon=True)
-_notif_thread.start()
+# ─── BETRIEB ─────────────────────────────────────────────────
+# Unter gunicorn (gunicorn.conf.py) laufen mehrere Worker-Prozesse mit eigenem
+# Speicher. Requests bedient jeder; Metriken, Alerts und Suchindex laufen nur im
+# Prozess mit der Leader-Sperre – sonst gäbe es doppelte Mails und Zählungen.
+LEADER_FILE     = "lovi.leader"   # neben lovi.db
+LEADER_RETRY    = 5               # Sekunden zwischen Versuchen der übrigen Worker
+SECRET_KEY_FILE = "secret_key"    # gemeinsamer Session-Schlüssel aller Worker
+
+class LeaderLock:
+    """flock() auf LEADER_FILE; das System gibt sie frei, sobald der Prozess endet (auch bei Absturz)."""
+    def __init__(self):
+        self.held  = False
+        self._file = None
+
+    def try_acquire(self):
+        if self.held:
+            return True
+        if fcntl is None:
+            self.held = True  # ohne flock (Windows) gibt es nur einen Prozess
+            return True
+        f = open(os.path.join(os.path.dirname(DB_PATH), LEADER_FILE), "a")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._file, self.held = f, True
+        return True
+
+_leader = LeaderLock()
+
+_cache_sync.register("users",         invalidate_user)
+_cache_sync.register("profiles",      invalidate_profiles)
+_cache_sync.register("hidden",        invalidate_hidden)
+_cache_sync.register("sparklines",    invalidate_sparklines)
+_cache_sync.register("db",            _db_pool.reset)
+_cache_sync.register("alerts",        _alert_engine.reset)
+_cache_sync.register("notifications", notifications_changed)
+
+def load_secret_key():
+    """LOVI_SECRET_KEY oder der beim ersten Start erzeugte Schlüssel aus SECRET_KEY_FILE."""
+    key = os.environ.get("LOVI_SECRET_KEY")
+    if key:
+        return key
+    path = os.path.join(os.path.dirname(DB_PATH), SECRET_KEY_FILE)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        for _ in range(50):  # ein anderer Worker legt ihn gerade an
+            with open(path, "r", encoding="utf-8") as f:
+                key = f.read().strip()
+            if key:
+                return key
+            time.sleep(0.1)
+        raise RuntimeError(f"{path} ist leer")
+    key = secrets.token_hex(32)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(key)
+    return key
+
+def leader_worker():
+    """Background Thread – wartet auf die Leader-Sperre und startet dann die Jobs, die es nur einmal geben darf."""
+    while True:
+        try:
+            if _leader.try_acquire():
+                break
+        except OSError as e:
+            app.logger.error(f"Leader lock error: {e}")
+        time.sleep(LEADER_RETRY)
+    app.logger.info(f"Prozess {os.getpid()} übernimmt Metriken, Alerts, Such- und Zeilenindex")
+    for target in (metrics_worker, alert_worker, search_index_worker, line_index_worker):
+        threading.Thread(target=target, daemon=True).start()
+
+_started      = False
+_started_lock = threading.Lock()
+_db_ready     = False
+
+def setup_db():
+    """
+    Schema anlegen und migrieren – einmal pro Start. Unter gunicorn ruft der
+    Master das vor dem Fork auf (on_starting), Worker und Neustarts erben _db_ready.
+    """
+    global _db_ready
+    if not _db_ready:
+        init_db()
+        init_line_index_db()
+        _db_ready = True
+
+def create_app():
+    """
+    App-Factory – pro Prozess einmal: DB anlegen (falls nicht schon geschehen),
+    Session-Schlüssel laden, Hintergrund-Threads starten. Für gunicorn: "app:create_app()".
+    """
+    global _started
+    with _started_lock:
+        if not _started:
+            setup_db()
+            app.secret_key = load_secret_key()
+            threading.Thread(target=_system_sampler.run, daemon=True).start()  # misst pro Prozess
+            threading.Thread(target=leader_worker, daemon=True).start()
+            _started = True
+    return app
 
 if __name__ == "__main__":
-    init_db()
-    app.run(host="0.0.0.0", port=5000, debug=False)
+    # Entwicklungsserver mit einem Prozess; Produktion: gunicorn -c gunicorn.conf.py
+    create_app().run(host="0.0.0.0", port=5000, debug=False, threaded=True)
@@ -0,0 +1,78 @@
+"""
+Microbenchmark: Level-Klassifizierung in Zeilen pro Sekunde.
+
+    python benchmarks/bench_classifier.py [--lines 200000]
+
+Vergleicht die alte hartcodierte Prüfung (line.upper() + vier `in`-Checks),
+eine naive `in`-Kette über alle Keywords eines Profils und den vorkompilierten
+LevelClassifier (Profil- und Standard-Keywords).
+"""
+import argparse, os, random, sys, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from app import DEFAULT_LEVEL_KEYWORDS, LevelClassifier  # noqa: E402
+
+# Keywords wie im Radarr/Sonarr-Profil
+PROFILE = {
+    "error": "[Error],[Fatal],ERROR,CRITICAL",
+    "warn":  "[Warn],WARN,WARNING",
+    "info":  "[Info],INFO",
+    "debug": "[Debug],DEBUG,TRACE",
+}
+TEMPLATES = [
+    "2026-10-17 03:14:15.9|Info|RssSyncService|RSS Sync Completed. Reports found: {n}, Reports grabbed: 0",
+    "2026-10-17 03:14:16.1|Debug|DownloadDecisionMaker|Processing {n} releases",
+    "2026-10-17 03:14:16.4|Warn|IndexerStatusService|Indexer {n} is unavailable due to recent failures",
+    "2026-10-17 03:14:17.0|Error|DownloadClient|Connection refused after {n} retries",
+    "192.168.1.{n} - - [17/Oct/2026:03:14:17 +0200] \"GET /api/v3/queue HTTP/1.1\" 200 1532",
+]
+
+
+def old_parse_log_level(line):
+    u = line.upper()
+    if "ERROR" in u or "CRITICAL" in u: return "error"
+    elif "WARN" in u or "WARNING" in u:  return "warn"
+    elif "INFO" in u:                    return "info"
+    elif "DEBUG" in u:                   return "debug"
+    return "default"
+
+
+def keyword_chain(keywords):
+    order = [(kw.strip().upper(), level)
+             for level in ("error", "warn", "info", "debug")
+             for kw in keywords[level].split(",") if kw.strip()]
+    def classify(line):
+        u = line.upper()
+        for kw, level in order:
+            if kw in u:
+                return level
+        return "default"
+    return classify
+
+
+def rate(fn, lines):
+    t0 = time.perf_counter()
+    for line in lines:
+        fn(line)
+    return len(lines) / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, default=200000)
+    args = ap.parse_args()
+    random.seed(42)
+    lines = [random.choice(TEMPLATES).format(n=i) for i in range(args.lines)]
+
+    candidates = [
+        ("hardcoded (alt)",           old_parse_log_level),
+        ("in-Kette über Profil",      keyword_chain(PROFILE)),
+        ("LevelClassifier(Profil)",   LevelClassifier(PROFILE).classify),
+        ("LevelClassifier(Standard)", LevelClassifier(DEFAULT_LEVEL_KEYWORDS).classify),
+    ]
+    for name, fn in candidates:
+        print(f"{name:<26} {rate(fn, lines):>12,.0f} lines/s")
+
+
+if __name__ == "__main__":
+    main()
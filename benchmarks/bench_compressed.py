@@ -0,0 +1,99 @@
+"""
+Benchmark: Suche und Tail über eine gzip-Rotationskette.
+
+    python benchmarks/bench_compressed.py [--size-mb 2048] [--generations 8] [--query "connection refused"]
+
+Erzeugt app.log.1.gz … app.log.N.gz mit zusammen --size-mb MB entpacktem Inhalt
+und misst:
+  naive         – gzip.open() + Zeile für Zeile (so liest man Archive ohne Index)
+  lovi kalt     – iter_search inkl. einmaligem Aufbau der Archiv-Indizes
+  lovi warm     – iter_search mit vorhandenen Indizes (parallele Segmente)
+  tail kalt/warm – letzte 200 Zeilen jeder Generation (tail_lines)
+"""
+import argparse, gzip, os, random, sys, tempfile, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import app  # noqa: E402
+
+app.app.logger.disabled = True
+
+TEMPLATES = [
+    "2026-10-17 03:14:15.{n:03d}|Info|RssSyncService|RSS Sync Completed. Reports found: {n}, Reports grabbed: 0",
+    "2026-10-17 03:14:16.{n:03d}|Debug|DownloadDecisionMaker|Processing {n} releases",
+    "2026-10-17 03:14:16.{n:03d}|Warn|IndexerStatusService|Indexer {n} is unavailable due to recent failures",
+    "2026-10-17 03:14:17.{n:03d}|Error|DownloadClient|Connection refused after {n} retries",
+    "192.168.1.{n} - - [17/Oct/2026:03:14:17 +0200] \"GET /api/v3/queue HTTP/1.1\" 200 1532",
+]
+
+
+def generate(log_dir, size_mb, generations):
+    random.seed(42)
+    per_file = size_mb * 1024 * 1024 // generations
+    files = []
+    for gen in range(1, generations + 1):
+        name = f"app.log.{gen}.gz"
+        with gzip.open(os.path.join(log_dir, name), "wb", compresslevel=6) as f:
+            written = 0
+            while written < per_file:
+                block = "\n".join(random.choice(TEMPLATES).format(n=random.randint(0, 999))
+                                  for _ in range(10000)).encode() + b"\n"
+                f.write(block)
+                written += len(block)
+        files.append(name)
+    return files
+
+
+def naive_search(log_dir, files, needle):
+    hits = 0
+    for name in files:
+        with gzip.open(os.path.join(log_dir, name), "rt", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if needle in line.lower():
+                    hits += 1
+    return hits
+
+
+def lovi_search(files, query):
+    return sum(page["count"] for page in app.iter_search(query, files, limit=app.SEARCH_FILE_LIMIT))
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - t0, result
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size-mb", type=int, default=2048, help="entpackte Größe der ganzen Kette")
+    ap.add_argument("--generations", type=int, default=8)
+    ap.add_argument("--query", default="connection refused after 7")
+    args = ap.parse_args()
+
+    log_dir = tempfile.mkdtemp()
+    app.LOG_DIR = log_dir
+    app.DB_PATH = os.path.join(log_dir, "lovi.db")
+    app.SEARCH_DB_PATH = os.path.join(log_dir, "lovi-search.db")
+    app.init_db()
+    app.init_line_index_db()
+    t, files = timed(generate, log_dir, args.size_mb, args.generations)
+    packed = sum(os.path.getsize(os.path.join(log_dir, f)) for f in files)
+    print(f"{len(files)} Generationen, {args.size_mb} MB entpackt, {packed / 1024 / 1024:.0f} MB gz "
+          f"(erzeugt in {t:.1f}s)")
+
+    tail = lambda: [app.tail_lines(os.path.join(log_dir, f), 200) for f in files]
+    rows = []
+    rows.append(("naive (gzip.open)",) + timed(naive_search, log_dir, files, args.query.lower()))
+    rows.append(("tail kalt (Index-Aufbau)",) + timed(tail))
+    rows.append(("tail warm",) + timed(tail))
+    rows.append(("lovi Suche (warm)",) + timed(lovi_search, files, args.query))
+    app._archives.clear()
+    rows.append(("lovi Suche (kalt)",) + timed(lovi_search, files, args.query))
+    for name, seconds, result in rows:
+        hits = f"{result:>8} Treffer" if isinstance(result, int) else ""
+        print(f"{name:<26} {seconds:>8.2f}s  {args.size_mb / seconds:>8.0f} MB/s  {hits}")
+    print(f"(lovi liefert pro Datei höchstens {app.SEARCH_FILE_LIMIT} Treffer, naive zählt alle)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Lasttest: SQLite-Zugriffe beim gleichzeitigen Dashboard-Polling.
+
+    python benchmarks/bench_db.py [--clients 16] [--seconds 10] [--files 50]
+
+Simuliert pro Client einen Request wie beim Polling von /api/summary
+(load_user, 2x get_user_lang, Profil- und Sparkline-Abfragen), während ein
+Hintergrund-Thread wie MetricsCollector.flush laufend in metrics schreibt.
+
+Verglichen werden:
+  legacy  – neue Verbindung pro Abfrage, Rollback-Journal (altes get_db)
+  pool    – DBPool aus app.py (WAL, synchronous=NORMAL, Statement-Cache)
+
+Ausgegeben werden Requests/s, p50/p99 Latenz und "database is locked"-Fehler.
+"""
+import argparse, os, sqlite3, sys, tempfile, threading, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import app  # noqa: E402
+
+app.app.logger.disabled = True
+
+
+def legacy_connect(path, timeout):
+    conn = sqlite3.connect(path, timeout=timeout)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+class Legacy:
+    def __init__(self, path, timeout):
+        self.path, self.timeout = path, timeout
+
+    def get(self):
+        return legacy_connect(self.path, self.timeout)
+
+    def put(self, conn):
+        conn.close()
+
+
+class Pooled:
+    def __init__(self, path, timeout):
+        app.DB_TIMEOUT = timeout
+        self.path, self.pool = path, app.DBPool(app.DB_POOL_SIZE)
+
+    def get(self):
+        return self.pool.acquire(self.path)
+
+    def put(self, conn):
+        self.pool.release(conn)
+
+
+def dashboard_request(db, files):
+    """Die DB-Abfragen eines Dashboard-Requests, je mit eigener Verbindung wie in app.py."""
+    for sql, args in (
+        ("SELECT * FROM users WHERE id = ?", (1,)),                   # load_user
+        ("SELECT language FROM users WHERE id = ?", (1,)),            # get_user_lang
+        ("SELECT language FROM users WHERE id = ?", (1,)),
+        ("SELECT filename FROM log_hidden", ()),                      # get_log_files
+        ("SELECT filename, profile_id FROM log_assignments", ()),
+        ("SELECT errors, warns FROM metrics WHERE filename=? AND tier=900 "   # Sparkline eines Widgets
+         "ORDER BY bucket DESC LIMIT 96", (files[0],)),
+    ):
+        conn = db.get()
+        try:
+            conn.execute(sql, args).fetchall()
+        finally:
+            db.put(conn)
+
+
+def writer(db, files, stop):
+    while not stop.is_set():
+        conn = db.get()
+        try:
+            minute = int(time.time() // 60 * 60)
+            conn.executemany("""INSERT INTO metrics (filename, tier, bucket, errors, warns) VALUES (?,?,?,?,?)
+                ON CONFLICT(filename, tier, bucket) DO UPDATE SET
+                errors = errors + excluded.errors, warns = warns + excluded.warns""",
+                [(f, tier, minute // tier * tier, i % 7, i % 3)
+                 for i, f in enumerate(files) for tier in app.METRIC_TIERS])
+            conn.commit()
+        except sqlite3.OperationalError:
+            conn.rollback()
+        finally:
+            db.put(conn)
+        time.sleep(0.01)
+
+
+def run(db, clients, seconds, files):
+    stop = threading.Event()
+    latencies, locked = [], [0]
+    lock = threading.Lock()
+
+    def client():
+        local, errors = [], 0
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            try:
+                dashboard_request(db, files)
+                local.append(time.perf_counter() - t0)
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e):
+                    raise
+                errors += 1
+        with lock:
+            latencies.extend(local)
+            locked[0] += errors
+
+    threads = [threading.Thread(target=writer, args=(db, files, stop))]
+    threads += [threading.Thread(target=client) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0
+    return len(latencies) / seconds, pct(0.50), pct(0.99), locked[0]
+
+
+def prepare(path, files, journal_mode):
+    app.DB_PATH = path
+    app.init_db()
+    app._db_pool.reset()
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA journal_mode={journal_mode}")
+    now = int(time.time() // 900 * 900)
+    conn.executemany("INSERT INTO metrics (filename, tier, bucket, errors, warns) VALUES (?,?,?,?,?)",
+                     [(f, 900, now - i * 900, 1, 1) for f in files for i in range(96)])
+    conn.commit()
+    conn.close()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--clients", type=int, default=16)
+    ap.add_argument("--seconds", type=float, default=10)
+    ap.add_argument("--files", type=int, default=50)
+    ap.add_argument("--timeout", type=float, default=1.0, help="busy timeout in Sekunden (beide Varianten)")
+    args = ap.parse_args()
+    files = [f"app{i}/app.log" for i in range(args.files)]
+    tmp = tempfile.mkdtemp()
+
+    print(f"{args.clients} Clients, {args.seconds:g}s, {args.files} Dateien, busy timeout {args.timeout:g}s")
+    print(f"{'':<8} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'locked':>8}")
+    for name, journal, cls in (("legacy", "DELETE", Legacy), ("pool", "WAL", Pooled)):
+        path = os.path.join(tmp, f"{name}.db")
+        prepare(path, files, journal)
+        rps, p50, p99, locked = run(cls(path, args.timeout), args.clients, args.seconds, files)
+        print(f"{name:<8} {rps:>9,.0f} {p50:>9.2f} {p99:>9.2f} {locked:>8}")
+
+
+if __name__ == "__main__":
+    main()
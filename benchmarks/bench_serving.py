@@ -0,0 +1,195 @@
+"""
+Lasttest: Entwicklungsserver vs. gunicorn (mehrere Worker) für /api/summary und /api/logs.
+
+    python benchmarks/bench_serving.py [--files 50] [--clients 32] [--seconds 10] [--workers 4]
+
+Legt unter einem Temp-Verzeichnis --files Logs an, weist sie dem Standard-Profil
+zu und startet den Server als eigenen Prozess:
+  dev       – app.run(threaded=True), ein Prozess (bisheriges python app.py)
+  gunicorn  – create_app() in --workers Prozessen à --threads Threads (gunicorn.conf.py)
+Die Clients laufen in eigenen Prozessen (Keep-Alive, eingeloggte Session),
+damit der Lastgenerator nicht selbst am GIL hängt.
+"""
+import argparse, http.client, multiprocessing, os, socket, subprocess, sys, tempfile, time, urllib.parse
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+LINE = ("2026-10-17 03:14:{s:02d}.{n:03d}|{level}|RssSyncService|RSS Sync Completed. "
+        "Reports found: {n}, Reports grabbed: 0\n")
+
+
+def configure(app, log_dir):
+    app.LOG_DIR        = os.path.join(log_dir, "logs")
+    app.DB_PATH        = os.path.join(log_dir, "data", "lovi.db")
+    app.SEARCH_DB_PATH = os.path.join(log_dir, "data", "lovi-search.db")
+    app.app.logger.disabled = True
+
+
+def prepare(log_dir, files, size_kb):
+    import app
+    configure(app, log_dir)
+    names = []
+    for i in range(files):
+        name = f"app{i}/app.log"
+        os.makedirs(os.path.join(app.LOG_DIR, f"app{i}"), exist_ok=True)
+        with open(os.path.join(app.LOG_DIR, name), "w") as f:
+            n = 0
+            while f.tell() < size_kb * 1024:
+                level = ("Error", "Warn", "Info", "Info", "Debug")[n % 5]
+                f.write(LINE.format(s=n % 60, n=n % 1000, level=level))
+                n += 1
+        names.append(name)
+    app.init_db()
+    conn = app.get_db()
+    conn.executemany("INSERT INTO log_assignments (filename, profile_id, label) VALUES (?, 1, ?)",
+                     [(name, name) for name in names])
+    conn.commit()
+    conn.close()
+    return names
+
+
+def serve(kind, log_dir, port, workers, threads):
+    """Server-Prozess (wird über --serve von main() gestartet)."""
+    if kind == "dev":
+        import app
+        configure(app, log_dir)
+        app.create_app().run(host="127.0.0.1", port=port, debug=False, threaded=True)
+        return
+    from gunicorn.app.base import BaseApplication
+
+    class Server(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"127.0.0.1:{port}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("worker_class", "gthread")
+            self.cfg.set("threads", threads)
+            self.cfg.set("preload_app", False)
+
+        def load(self):  # läuft in jedem Worker nach dem fork
+            import app
+            configure(app, log_dir)
+            return app.create_app()
+
+    Server().run()
+
+
+def wait_port(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server auf Port {port} antwortet nicht")
+
+
+def login(port):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    body = urllib.parse.urlencode({"username": "admin", "password": "admin"})
+    conn.request("POST", "/login", body, {"Content-Type": "application/x-www-form-urlencoded"})
+    resp = conn.getresponse()
+    resp.read()
+    cookie = resp.getheader("Set-Cookie", "").split(";")[0]
+    conn.close()
+    if not cookie:
+        raise RuntimeError("Login fehlgeschlagen")
+    return cookie
+
+
+def client(args):
+    port, cookie, path, threads, seconds = args
+    import threading
+    latencies, errors, lock = [], [0], threading.Lock()
+    stop = time.time() + seconds
+
+    def loop():
+        local, failed = [], 0
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        while time.time() < stop:
+            t0 = time.perf_counter()
+            try:
+                conn.request("GET", path, headers={"Cookie": cookie})
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status != 200:
+                    failed += 1
+                    continue
+                local.append(time.perf_counter() - t0)
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port)
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    workers = [threading.Thread(target=loop) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return latencies, errors[0]
+
+
+def run_load(port, cookie, path, clients, seconds):
+    procs = max(1, min(clients, os.cpu_count() or 1))
+    per   = [clients // procs + (1 if i < clients % procs else 0) for i in range(procs)]
+    with multiprocessing.get_context("spawn").Pool(procs) as pool:
+        results = pool.map(client, [(port, cookie, path, n, seconds) for n in per])
+    latencies = sorted(l for lat, _ in results for l in lat)
+    errors    = sum(e for _, e in results)
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0
+    return len(latencies) / seconds, pct(0.50), pct(0.99), errors
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--files", type=int, default=50)
+    ap.add_argument("--size-kb", type=int, default=512, help="Größe jeder Log-Datei")
+    ap.add_argument("--clients", type=int, default=32, help="gleichzeitige Verbindungen")
+    ap.add_argument("--seconds", type=float, default=10)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    ap.add_argument("--threads", type=int, default=16)
+    ap.add_argument("--serve", choices=("dev", "gunicorn"), help=argparse.SUPPRESS)
+    ap.add_argument("--dir", help=argparse.SUPPRESS)
+    ap.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.serve:
+        serve(args.serve, args.dir, args.port, args.workers, args.threads)
+        return
+
+    log_dir = tempfile.mkdtemp()
+    names   = prepare(log_dir, args.files, args.size_kb)
+    paths   = (("/api/summary", "/api/summary"),
+               ("/api/logs",    f"/api/logs?file={urllib.parse.quote(names[0])}&lines=200"))
+    print(f"{args.files} Dateien à {args.size_kb} KB, {args.clients} Clients, {args.seconds:g}s je Messung, "
+          f"gunicorn: {args.workers} Worker x {args.threads} Threads")
+    print(f"{'':<10} {'Endpoint':<13} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'Fehler':>7}")
+    for kind in ("dev", "gunicorn"):
+        port = free_port()
+        server = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve", kind,
+                                   "--dir", log_dir, "--port", str(port),
+                                   "--workers", str(args.workers), "--threads", str(args.threads)],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_port(port)
+            cookie = login(port)
+            for label, path in paths:
+                run_load(port, cookie, path, args.clients, 1)  # aufwärmen (FileState, Sparklines)
+                rps, p50, p99, errors = run_load(port, cookie, path, args.clients, args.seconds)
+                print(f"{kind:<10} {label:<13} {rps:>9,.0f} {p50:>9.2f} {p99:>9.2f} {errors:>7}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
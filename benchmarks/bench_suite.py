@@ -0,0 +1,489 @@
+"""
+Benchmark-Suite: synthetischer Log-Baum, Dashboard/Suche/Logs über den Flask-Testclient,
+Ergebnis als JSON-Bericht zum Vergleich zwischen Commits.
+
+    python benchmarks/bench_suite.py [--files 1500] [--size 256K] [--rotations 3] [--error-rate 0.02]
+                                     [--dir /tmp/lovi-bench] [--out before.json] [--compare after.json]
+
+Erzeugt unter --dir (sonst Temp-Verzeichnis) --files aktuelle Logs, reihum in den
+Formaten Radarr, nginx (access), Traefik (JSON), Python-logging und syslog, jedes mit
+--rotations älteren Generationen (ab --compress-from als .gz). Inhalt und Zeitstempel
+hängen nur von --seed und den Generator-Optionen ab; ein Baum mit passendem
+bench-manifest.json wird wiederverwendet, die Datenbank wird bei jedem Lauf neu angelegt.
+Pro Format gibt es ein Profil mit log_path_hint, die Zuweisung läuft über auto_assign_by_hint.
+
+Gemessen wird in einem Prozess ohne Hintergrund-Threads (kein create_app()); der
+Metrik-Durchlauf wird explizit angestoßen. Pro Phase: Latenz-Perzentile, Peak-RSS des
+Prozesses nach der Phase (kumulativ), gelesene Bytes (/proc/self/io rchar – mmap-Zugriffe
+zählt der Kernel dort nicht) und ausgelieferte Bytes (gzip wie im Browser).
+--search-threads setzt LOVI_SEARCH_THREADS für die Suche.
+
+Vergleich: --compare <bericht.json> stellt den neuen Lauf einem alten gegenüber;
+mit --threshold <prozent> endet das Skript mit Code 1, wenn ein p50 stärker steigt.
+"""
+import argparse, gzip, importlib, json, os, platform, random, resource, shutil, subprocess, sys, tempfile, time
+from urllib.parse import quote, urlencode
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+app = None  # wird in main() nach dem Setzen von LOVI_SEARCH_THREADS importiert
+
+END      = 1792238400     # 2026-10-17 12:00:00 UTC – jüngste Zeile jeder aktuellen Datei
+MANIFEST = "bench-manifest.json"
+MONTHS   = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+QUERIES  = ('"connection refused"', "level:error timeout", "/ 50[234] / file:nginx*", "upstream OR traceback -debug")
+
+COMPONENTS = ("RssSyncService", "DownloadDecisionMaker", "IndexerStatusService", "DownloadClient", "DiskScanService")
+MESSAGES = {
+    "error": ("Connection refused after {n} retries", "Request timeout while contacting indexer {n}",
+              "Upstream returned invalid response for item {n}"),
+    "warn":  ("Indexer {n} is unavailable due to recent failures", "Slow response from upstream ({n} ms)"),
+    "info":  ("RSS Sync Completed. Reports found: {n}, Reports grabbed: 0", "Processing {n} releases",
+              "Scan for item {n} finished"),
+    "debug": ("Cache hit for key {n}", "Parsed {n} entries from feed"),
+}
+TRACE = ("   at NzbDrone.Common.Http.HttpClient.Execute(HttpRequest request)",
+         "   at NzbDrone.Core.Indexers.IndexerBase.FetchPage(IndexerPageableRequest request)",
+         "   at System.Net.Sockets.Socket.Connect(EndPoint remoteEP)")
+PY_TRACE = ("Traceback (most recent call last):",
+            '  File "/app/worker.py", line 42, in run',
+            "    conn.connect()",
+            "ConnectionRefusedError: [Errno 111] Connection refused")
+
+
+# ─── Formate ─────────────────────────────────────────────────
+def _radarr(ts, level, rnd):
+    t = time.gmtime(ts)
+    n = rnd.randrange(1000)
+    line = (f"{t.tm_year}-{t.tm_mon:02d}-{t.tm_mday:02d} {t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}.{n:03d}"
+            f"|{level.title()}|{rnd.choice(COMPONENTS)}|{rnd.choice(MESSAGES[level]).format(n=n)}")
+    if level == "error" and rnd.random() < 0.3:
+        return [line] + list(TRACE)
+    return [line]
+
+def _nginx(ts, level, rnd):
+    t = time.gmtime(ts)
+    status = {"error": rnd.choice((500, 502, 503, 504)), "warn": rnd.choice((403, 404, 429))}.get(
+        level, rnd.choice((200, 200, 200, 304)))
+    path = rnd.choice(("/api/v3/queue", "/api/v3/history", "/signalr/messages", "/static/app.js", "/upstream/feed"))
+    return [f'192.168.{rnd.randrange(4)}.{rnd.randrange(1, 255)} - - [{t.tm_mday:02d}/{MONTHS[t.tm_mon - 1]}/'
+            f'{t.tm_year}:{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d} +0000] "GET {path} HTTP/1.1" {status} '
+            f'{rnd.randrange(100, 90000)} "-" "Mozilla/5.0 (X11; Linux x86_64)"']
+
+def _traefik(ts, level, rnd):
+    t = time.gmtime(ts)
+    msg = rnd.choice(MESSAGES[level]).format(n=rnd.randrange(1000))
+    return [f'{{"level":"{level}","msg":"{msg}","entryPointName":"websecure","routerName":"app-{rnd.randrange(20)}@docker",'
+            f'"time":"{t.tm_year}-{t.tm_mon:02d}-{t.tm_mday:02d}T{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}Z"}}']
+
+def _python(ts, level, rnd):
+    t = time.gmtime(ts)
+    n = rnd.randrange(1000)
+    name = {"warn": "WARNING"}.get(level, level.upper())
+    line = (f"{t.tm_year}-{t.tm_mon:02d}-{t.tm_mday:02d} {t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d},{n:03d}"
+            f" - myapp.{rnd.choice(('worker', 'api', 'scheduler'))} - {name} - {rnd.choice(MESSAGES[level]).format(n=n)}")
+    if level == "error" and rnd.random() < 0.3:
+        return [line] + list(PY_TRACE)
+    return [line]
+
+def _syslog(ts, level, rnd):
+    t = time.gmtime(ts)
+    msg = rnd.choice(MESSAGES[level]).format(n=rnd.randrange(1000))
+    prefix = {"error": "error: ", "warn": "warning: ", "debug": "debug: "}.get(level, "")
+    return [f"{MONTHS[t.tm_mon - 1]} {t.tm_mday:2d} {t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d} nas "
+            f"{rnd.choice(('sshd', 'cron', 'dockerd', 'kernel'))}[{rnd.randrange(100, 30000)}]: {prefix}{msg}"]
+
+# name → (Zeilen-Funktion, Dateiname, Rotationsmuster, Profil-Keywords, continuation)
+FORMATS = {
+    "radarr":  (_radarr,  "radarr.txt", "radarr.{gen}.txt",
+                {"error": "|Error|,|Fatal|", "warn": "|Warn|", "info": "|Info|", "debug": "|Debug|,|Trace|"}, ""),
+    "nginx":   (_nginx,   "access.log", "access.log.{gen}",
+                {"error": '" 500 ," 502 ," 503 ," 504 ', "warn": '" 403 ," 404 ," 429 ', "info": '" 200 ," 304 ',
+                 "debug": ""}, ""),
+    "traefik": (_traefik, "traefik.log", "traefik.log.{gen}",
+                {"error": '"level":"error"', "warn": '"level":"warn"', "info": '"level":"info"',
+                 "debug": '"level":"debug"'}, ""),
+    "python":  (_python,  "app.log", "app.log.{gen}",
+                {"error": " - ERROR - , - CRITICAL - ", "warn": " - WARNING - ", "info": " - INFO - ",
+                 "debug": " - DEBUG - "}, "notimestamp"),
+    "syslog":  (_syslog,  "syslog.log", "syslog.log.{gen}",
+                {"error": "error:,failed", "warn": "warning:", "info": "", "debug": "debug:"}, ""),
+}
+
+
+# ─── Generator ───────────────────────────────────────────────
+def parse_size(text):
+    """'512', '256K', '10M', '2G' → Bytes (ohne Suffix: KB)."""
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    text  = text.strip().upper().rstrip("B")
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(float(text) * 1024)
+
+def write_generation(path, fmt, size, newest, rnd, args):
+    """Schreibt Zeilen bis size Bytes; Zeitstempel 1 s auseinander, die letzte Zeile bei newest."""
+    line_fn  = FORMATS[fmt][0]
+    events   = max(1, size // 100)  # Schätzung, nur für die Startzeit – bleibt monoton
+    ts       = newest - events
+    warn     = args.error_rate + args.warn_rate
+    opener   = gzip.open if path.endswith(".gz") else open
+    written  = 0
+    with opener(path, "wb") as f:
+        while written < size:
+            block = []
+            for _ in range(max(16, min(2000, (size - written) // 200))):
+                r = rnd.random()
+                level = "error" if r < args.error_rate else "warn" if r < warn else \
+                        "debug" if r < warn + 0.2 else "info"
+                block += line_fn(min(ts, newest), level, rnd)
+                ts += 1
+            data = ("\n".join(block) + "\n").encode()
+            f.write(data)
+            written += len(data)
+    return os.path.getsize(path)
+
+def generate(log_dir, args, formats):
+    """Legt den Baum an und gibt die Liste der aktuellen Dateien zurück."""
+    current, total = [], 0
+    for i in range(args.files):
+        fmt = formats[i % len(formats)]
+        _fn, basename, rotated, _kws, _cont = FORMATS[fmt]
+        rnd = random.Random(f"{args.seed}:{i}")
+        directory = f"{fmt}{i // len(formats)}"
+        os.makedirs(os.path.join(log_dir, directory), exist_ok=True)
+        span = args.size // 60 + 60  # Sekunden pro Generation (Zeilen sind > 60 Bytes)
+        for gen in range(args.rotations, -1, -1):  # älteste zuerst
+            if gen == 0:
+                name = basename
+            else:
+                # radarr.txt zählt ab .0, logrotate ab .1
+                name = rotated.format(gen=gen - 1 if fmt == "radarr" else gen)
+                if gen >= args.compress_from:
+                    name += ".gz"
+            total += write_generation(os.path.join(log_dir, directory, name), fmt, args.size,
+                                      END - gen * span, rnd, args)
+        current.append(f"{directory}/{basename}")
+    return current, total
+
+def prepare_tree(base, args, formats):
+    """
+    Erzeugt den Log-Baum – oder verwendet einen vorhandenen mit gleichen Parametern.
+    Der Metrik-Durchlauf hängt an die aktuellen Dateien an; beim Wiederverwenden
+    werden sie auf die erzeugte Größe zurückgeschnitten.
+    """
+    log_dir = os.path.join(base, "logs")
+    config  = {"files": args.files, "size": args.size, "rotations": args.rotations,
+               "compress_from": args.compress_from, "error_rate": args.error_rate,
+               "warn_rate": args.warn_rate, "formats": formats, "seed": args.seed}
+    manifest = os.path.join(base, MANIFEST)
+    try:
+        with open(manifest) as f:
+            saved = json.load(f)
+        if saved["config"] == config:
+            for filename, size in saved["sizes"].items():
+                os.truncate(os.path.join(log_dir, filename), size)
+            return log_dir, list(saved["sizes"]), saved["bytes"], 0.0, config
+    except (OSError, ValueError, KeyError):
+        pass
+    shutil.rmtree(log_dir, ignore_errors=True)
+    t0 = time.perf_counter()
+    current, total = generate(log_dir, args, formats)
+    elapsed = time.perf_counter() - t0
+    sizes = {f: os.path.getsize(os.path.join(log_dir, f)) for f in current}
+    with open(manifest, "w") as f:
+        json.dump({"config": config, "sizes": sizes, "bytes": total}, f)
+    return log_dir, current, total, elapsed, config
+
+
+# ─── Messung ─────────────────────────────────────────────────
+def rchar():
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+class Recorder:
+    """Sammelt pro Phase Latenzen, Antwort-Bytes und Fehler."""
+    def __init__(self):
+        self.phases = {}
+
+    def run(self, name, samples):
+        """samples: Iterable von Aufrufen, die jeweils (status, bytes) liefern – jeder wird einzeln gemessen."""
+        latencies, out, errors = [], 0, 0
+        read0 = rchar()
+        for call in samples:
+            t0 = time.perf_counter()
+            status, size = call()
+            latencies.append((time.perf_counter() - t0) * 1000)
+            out += size
+            errors += status not in (200, 304)
+        read1 = rchar()
+        latencies.sort()
+        pct = lambda p: round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 3)
+        self.phases[name] = {
+            "n": len(latencies), "p50_ms": pct(0.50), "p90_ms": pct(0.90), "p99_ms": pct(0.99),
+            "max_ms": round(latencies[-1], 3), "mean_ms": round(sum(latencies) / len(latencies), 3),
+            "bytes_read": None if read0 is None else read1 - read0, "bytes_out": out,
+            "errors": errors, "rss_peak_mb": peak_rss_mb(),
+        }
+        p = self.phases[name]
+        print(f"  {name:<48} n={p['n']:<5} p50 {p['p50_ms']:>9.2f} ms  p99 {p['p99_ms']:>9.2f} ms  "
+              f"RSS {p['rss_peak_mb']:>7.1f} MB  gelesen {fmt_bytes(p['bytes_read'])}")
+        return p
+
+def fmt_bytes(n):
+    if n is None:
+        return "–"
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+def get(client, url, headers=None):
+    """Aufruf für Recorder.run: GET über den Testclient, Antwort komplett lesen."""
+    def call():
+        resp = client.get(url, headers={"Accept-Encoding": "gzip", **(headers or {})})
+        size = len(resp.get_data())
+        resp.close()
+        return resp.status_code, size
+    return call
+
+def setup_app(base, log_dir, formats):
+    """Frische Datenbank, ein Profil pro Format (für auto_assign_by_hint), eingeloggter Testclient."""
+    data = os.path.join(base, "data")
+    shutil.rmtree(data, ignore_errors=True)
+    app.LOG_DIR        = log_dir
+    app.DB_PATH        = os.path.join(data, "lovi.db")
+    app.SEARCH_DB_PATH = os.path.join(data, "lovi-search.db")
+    app.app.logger.disabled = True
+    app.app.secret_key = "bench"
+    app.init_db()
+    app.init_line_index_db()
+    conn = app.get_db()
+    for fmt in formats:
+        _fn, basename, _rotated, kws, continuation = FORMATS[fmt]
+        conn.execute("""INSERT INTO profiles (name, description, author, version, source,
+                level_error, level_warn, level_info, level_debug, log_path_hint, continuation)
+            VALUES (?, 'bench', 'bench', '1.0', 'local', ?, ?, ?, ?, ?, ?)""",
+            (f"bench-{fmt}", kws["error"], kws["warn"], kws["info"], kws["debug"],
+             f"/logs/{fmt}/{basename}", continuation))
+    conn.commit()
+    conn.close()
+    app.invalidate_profiles()
+    client = app.app.test_client()
+    resp = client.post("/login", data={"username": "admin", "password": "admin"})
+    if resp.status_code != 302:
+        raise RuntimeError("Login fehlgeschlagen")
+    return client
+
+def auto_assign_sample():
+    """auto_assign_by_hint auf einer noch leeren Zuweisungstabelle (Rollback nach jeder Messung)."""
+    def call():
+        conn = app.get_db()
+        try:
+            added = app.auto_assign_by_hint(conn)
+        finally:
+            conn.rollback()
+            conn.close()
+        return 200 if added else 500, 0
+    return call
+
+def build_index():
+    """Suchindex für alle Dateien synchron aufbauen (sonst Aufgabe des Leader-Threads)."""
+    app.init_search_db()
+    conn = app.get_search_db()
+    for filename in app.get_log_files():
+        while app._index_search_file(conn, filename):
+            pass
+    conn.close()
+    return 200, 0
+
+def build_line_indexes(filename):
+    """Zeilenindizes einer Rotationskette synchron aufbauen (sonst Aufgabe des Leader-Threads)."""
+    def call():
+        for gen in app.rotation_chain(filename):
+            app.get_line_index(os.path.join(app.LOG_DIR, gen), build=True)
+        return 200, 0
+    return call
+
+def history_pages(client, filename, pages):
+    """Blättert per before-Cursor durch die Rotationskette – jede Seite ist eine Messung."""
+    state = {"before": None}
+    def call():
+        url = f"/api/logs?file={quote(filename)}&lines=1000"
+        if state["before"]:
+            url += f"&before={quote(state['before'])}"
+        resp = client.get(url, headers={"Accept-Encoding": "gzip"})
+        body = resp.get_data()
+        if resp.status_code == 200:
+            plain = gzip.decompress(body) if resp.headers.get("Content-Encoding") == "gzip" else body
+            state["before"] = json.loads(plain).get("before")
+        resp.close()
+        return resp.status_code, len(body)
+    for _ in range(pages):
+        yield call
+        if not state["before"]:
+            break
+
+def metric_rounds(log_dir, current, rounds, lines, rnd):
+    """Pro Runde neue Zeilen anhängen (ungemessen), dann collect() + flush() messen."""
+    def call():
+        app._metrics.collect()
+        app._metrics.flush()
+        return 200, 0
+    for _ in range(rounds):
+        append_lines(log_dir, current, lines, rnd)
+        yield call
+
+def append_lines(log_dir, current, lines, rnd):
+    """Hängt an jede aktuelle Datei lines neue Zeilen an (wie laufende Container)."""
+    for filename in current:
+        fmt = filename.split("/")[0].rstrip("0123456789")
+        block = []
+        for _ in range(lines):
+            level = "error" if rnd.random() < 0.1 else "info"
+            block += FORMATS[fmt][0](END, level, rnd)
+        with open(os.path.join(log_dir, filename), "a") as f:
+            f.write("\n".join(block) + "\n")
+
+def run_phases(client, log_dir, current, args):
+    rec = Recorder()
+    rnd = random.Random(args.seed)
+    picks = [rnd.choice(current) for _ in range(args.repeat)]
+
+    rec.run("get_log_files (Index kalt)", [get(client, "/api/files")])
+    rec.run("get_log_files", [get(client, "/api/files")] * args.repeat)
+    rec.run("auto_assign_by_hint", [auto_assign_sample()] * args.repeat)
+    # Zuweisen wie beim ersten Dashboard-Aufruf
+    assigned = app.auto_assign_if_changed()
+    if assigned != len(current):
+        print(f"  Warnung: {assigned} von {len(current)} Dateien zugewiesen")
+
+    rec.run("api_summary (kalt)", [get(client, "/api/summary")])
+    rec.run("api_summary", [get(client, "/api/summary")] * args.repeat)
+    etag = client.get("/api/summary").headers.get("ETag", "")
+    rec.run("api_summary (304)", [get(client, "/api/summary", {"If-None-Match": etag})] * args.repeat)
+
+    rec.run("read_log_file (200 Zeilen)", [get(client, f"/api/logs?file={quote(f)}&lines=200") for f in picks])
+    rec.run("line_index (Aufbau, eine Kette)", [build_line_indexes(picks[0])])
+    rec.run("read_log_file (Rotation, 1000/Seite)", history_pages(client, picks[0], args.repeat))
+
+    for q in args.queries:
+        rec.run(f"api_search {q}", [get(client, "/api/search?" + urlencode({"q": q}))] * args.repeat)
+
+    if args.index:
+        rec.run("search_index (Aufbau)", [build_index])
+        for q in args.queries:
+            rec.run(f"api_search {q} (Index)", [get(client, "/api/search?" + urlencode({"q": q}))] * args.repeat)
+
+    # Neue Zeilen: Metrik-Durchlauf (zählt ERRORs/WARNs) und Dashboard-Delta
+    app._metrics.collect()  # neue Dateien: Cursor ans Dateiende
+    version = json.loads(client.get("/api/summary").get_data())["version"]
+    rec.run("metrics collect+flush",
+            metric_rounds(log_dir, current, max(1, args.repeat // 5), args.append_lines, rnd))
+    rec.run("api_summary (Delta nach Anhängen)", [get(client, f"/api/summary?since={version}")] * args.repeat)
+    return rec.phases
+
+
+# ─── Bericht ─────────────────────────────────────────────────
+def git_info():
+    def git(*cmd):
+        try:
+            return subprocess.run(("git",) + cmd, cwd=ROOT, capture_output=True, text=True, timeout=10).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+    return {"commit": git("rev-parse", "HEAD") or None, "subject": git("log", "-1", "--format=%s") or None,
+            "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+def compare(old, new, threshold):
+    """Tabelle alt → neu; gibt die Phasen zurück, deren p50 um mehr als threshold % gestiegen ist."""
+    def delta(a, b):
+        return f"{(b - a) / a * 100:+6.1f}%" if a else "     –"
+    o_meta, n_meta = old.get("meta", {}), new.get("meta", {})
+    print(f"\nVergleich {(o_meta.get('commit') or '?')[:10]} → {(n_meta.get('commit') or '?')[:10]}")
+    if old.get("config") != new.get("config"):
+        print("  Achtung: unterschiedliche Generator-Parameter, Werte nur bedingt vergleichbar")
+    print(f"  {'Phase':<48} {'p50 alt':>9} {'neu':>9} {'Δ':>7}   {'p99 alt':>9} {'neu':>9} {'Δ':>7}   {'RSS Δ MB':>8}")
+    regressions = []
+    for name, n in new["phases"].items():
+        o = old["phases"].get(name)
+        if o is None:
+            continue
+        print(f"  {name:<48} {o['p50_ms']:>9.2f} {n['p50_ms']:>9.2f} {delta(o['p50_ms'], n['p50_ms'])}   "
+              f"{o['p99_ms']:>9.2f} {n['p99_ms']:>9.2f} {delta(o['p99_ms'], n['p99_ms'])}   "
+              f"{n['rss_peak_mb'] - o['rss_peak_mb']:>+8.1f}")
+        if threshold is not None and o["p50_ms"] and (n["p50_ms"] - o["p50_ms"]) / o["p50_ms"] * 100 > threshold:
+            regressions.append(name)
+    return regressions
+
+def main():
+    global app
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--files", type=int, default=100, help="aktuelle Log-Dateien (10 … 10000)")
+    ap.add_argument("--size", type=parse_size, default=parse_size("256K"),
+                    help="Größe jeder Generation, z.B. 64K, 10M, 1G (ohne Suffix: KB)")
+    ap.add_argument("--rotations", type=int, default=2, help="ältere Generationen pro Datei")
+    ap.add_argument("--compress-from", type=int, default=2, help="Generationen ab dieser Nummer als .gz")
+    ap.add_argument("--error-rate", type=float, default=0.02, help="Anteil ERROR-Events")
+    ap.add_argument("--warn-rate", type=float, default=0.05, help="Anteil WARN-Events")
+    ap.add_argument("--formats", default=",".join(FORMATS), help="kommagetrennt aus " + ", ".join(FORMATS))
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--repeat", type=int, default=20, help="Messungen pro Phase")
+    ap.add_argument("--query", dest="queries", action="append", help="Suchanfrage (mehrfach möglich)")
+    ap.add_argument("--index", action="store_true", help="zusätzlich Suchindex aufbauen und erneut suchen")
+    ap.add_argument("--append-lines", type=int, default=50, help="neue Zeilen pro Datei je Metrik-Runde")
+    ap.add_argument("--search-threads", type=int, default=os.cpu_count() or 1, help="LOVI_SEARCH_THREADS für die Suche")
+    ap.add_argument("--dir", help="Arbeitsverzeichnis (Baum wird bei gleichen Parametern wiederverwendet)")
+    ap.add_argument("--out", help="JSON-Bericht hierhin schreiben")
+    ap.add_argument("--compare", help="früheren JSON-Bericht gegenüberstellen")
+    ap.add_argument("--threshold", type=float, help="Exit-Code 1, wenn ein p50 um mehr als so viel %% steigt")
+    args = ap.parse_args()
+    args.queries = args.queries or list(QUERIES)
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    unknown = set(formats) - set(FORMATS)
+    if unknown or not formats:
+        ap.error(f"unbekannte Formate: {', '.join(sorted(unknown)) or '(leer)'}")
+
+    os.environ["LOVI_SEARCH_THREADS"] = str(args.search_threads)
+    app = importlib.import_module("app")
+
+    base = args.dir or tempfile.mkdtemp(prefix="lovi-bench-")
+    os.makedirs(base, exist_ok=True)
+    log_dir, current, total, gen_seconds, config = prepare_tree(base, args, formats)
+    print(f"{len(current)} Dateien × {args.rotations + 1} Generationen à {fmt_bytes(args.size)} "
+          f"({fmt_bytes(total)} auf Platte{f', erzeugt in {gen_seconds:.1f}s' if gen_seconds else ', wiederverwendet'})"
+          f" unter {base}")
+
+    client = setup_app(base, log_dir, formats)
+    phases = run_phases(client, log_dir, current, args)
+
+    report = {
+        "meta": {**git_info(), "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "python": platform.python_version(),
+                 "platform": platform.platform(), "cpus": os.cpu_count(), "argv": sys.argv[1:]},
+        "config": config,
+        "tree": {"current_files": len(current), "bytes": total},
+        "phases": phases,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Bericht: {args.out}")
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        if regressions:
+            print(f"p50 um mehr als {args.threshold:g} % gestiegen: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
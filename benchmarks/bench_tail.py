@@ -0,0 +1,69 @@
+"""
+Benchmark: tail_lines() vs. readlines() bei wachsender Dateigröße.
+
+    python benchmarks/bench_tail.py                 # 1 MB … 5 GB
+    python benchmarks/bench_tail.py --max-mb 1024   # schneller Durchlauf
+
+Die Latenz von tail_lines() soll unabhängig von der Dateigröße flach bleiben.
+readlines() wird nur bis --baseline-max-mb gemessen (liest alles in den RAM).
+"""
+import argparse, os, sys, tempfile, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from app import tail_lines  # noqa: E402
+
+SIZES_MB = [1, 10, 100, 1024, 5120]
+LINE = (b"2026-10-17 03:14:15.926|Info|RssSyncService|RSS Sync Completed. "
+        b"Reports found: 100, Reports grabbed: 0\n")
+
+
+def grow_file(path, size_mb):
+    """Füllt die Datei bis size_mb mit Log-Zeilen auf (in 1-MB-Blöcken)."""
+    chunk  = LINE * ((1024 * 1024) // len(LINE))
+    target = size_mb * 1024 * 1024
+    with open(path, "ab") as f:
+        while f.tell() < target:
+            f.write(chunk)
+
+
+def timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best * 1000
+
+
+def readlines_tail(path, n):
+    with open(path, "r", errors="replace") as f:
+        return f.readlines()[-n:]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, default=200)
+    ap.add_argument("--max-mb", type=int, default=SIZES_MB[-1])
+    ap.add_argument("--baseline-max-mb", type=int, default=100)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".log")
+    os.close(fd)
+    try:
+        print(f"{'size':>8}  {'tail_lines':>12}  {'readlines':>12}")
+        for size_mb in [s for s in SIZES_MB if s <= args.max_mb]:
+            grow_file(path, size_mb)
+            t_tail = timed(lambda: tail_lines(path, args.lines), args.repeat)
+            if size_mb <= args.baseline_max_mb:
+                t_base = f"{timed(lambda: readlines_tail(path, args.lines), args.repeat):10.2f}ms"
+            else:
+                t_base = "–"
+            print(f"{size_mb:>6}MB  {t_tail:10.2f}ms  {t_base:>12}")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
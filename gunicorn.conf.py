@@ -0,0 +1,22 @@
+# Produktionsbetrieb:  gunicorn -c gunicorn.conf.py
+# Mehrere Worker-Prozesse mit je einem Thread-Pool; die Hintergrund-Jobs
+# (Metriken, Alerts, Suchindex) startet nur der Worker mit der Leader-Sperre.
+import os
+
+wsgi_app     = "app:create_app()"
+bind         = "0.0.0.0:5000"
+workers      = int(os.environ.get("LOVI_WORKERS", 2))
+worker_class = "gthread"
+threads      = int(os.environ.get("LOVI_THREADS", 16))  # jeder offene Live-Stream (SSE) belegt einen Thread, max. LOVI_MAX_STREAMS
+timeout      = 120
+preload_app  = False   # Threads startet jeder Worker selbst – Threads überleben kein fork()
+accesslog    = None
+errorlog     = "-"
+
+
+def on_starting(server):
+    """Schema und Migrationen einmal im Master, nicht bei jedem Worker-(Neu-)Start."""
+    import app
+    app.setup_db()
+    app._db_pool.reset()  # keine offenen SQLite-Verbindungen in die Worker vererben
+    app._search_pool.reset()